@@ -0,0 +1,218 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 09:12:40 2026
+
+@author: carlo
+"""
+
+import asyncio
+import json
+import time
+
+import aiohttp
+
+import fetch_retry
+import metrics
+import rate_limiter
+import replay
+from rate_limiter import AdaptiveRateLimiter
+from base_logger import logger
+
+async def _fetch(session : aiohttp.ClientSession,
+                 limiter : AdaptiveRateLimiter,
+                 rate_per_host : float,
+                 job : dict,
+                 as_json : bool = True):
+    '''
+    Sends a single request described by job and returns the decoded json body
+    (or text body if not as_json) or the raised exception
+    '''
+    host = rate_limiter.get_host(job['url'])
+    await limiter.wait_async(host, rate_per_host)
+    start = time.monotonic()
+    ok = False
+    try:
+        async with session.request(job.get('method', 'POST'),
+                                   replay.url(job['url']),
+                                   headers = job.get('headers'),
+                                   json = job.get('json')) as response:
+            content = await response.read()
+            metrics.count('requests')
+            metrics.count('bytes', len(content))
+            replay.record(job.get('method', 'POST'), job['url'], job.get('json'),
+                          response.status, response.content_type,
+                          content.decode(response.get_encoding(), errors = 'replace'))
+            # throttling and server errors slow down the host
+            ok = rate_limiter.ok_status(response.status)
+            if as_json:
+                return json.loads(content)
+            
+            # error pages have no products to parse
+            response.raise_for_status()
+            return content.decode(response.get_encoding(), errors = 'replace')
+
+    except Exception as e:
+        logger.debug(f'Request to {job["url"]} failed: {e}')
+        metrics.count('request_errors')
+        return e
+    
+    finally:
+        limiter.record(host, time.monotonic() - start, ok = ok)
+
+async def _fetch_all(jobs : list,
+                     concurrency : int,
+                     rate_per_host : float,
+                     timeout : float,
+                     limiter : AdaptiveRateLimiter,
+                     as_json : bool = True,
+                     retrier : fetch_retry.Retrier = None,
+                     on_result = None) -> list:
+
+    # single keep-alive connection pool shared by all requests
+    connector = aiohttp.TCPConnector(limit = concurrency,
+                                     limit_per_host = concurrency)
+    client_timeout = aiohttp.ClientTimeout(total = timeout)
+    results = [None] * len(jobs)
+    # job indices shared by the workers
+    queue = iter(range(len(jobs)))
+    workers = []
+    stopped = False
+
+    async with aiohttp.ClientSession(connector = connector,
+                                     timeout = client_timeout) as session:
+        
+        async def worker():
+            nonlocal stopped
+            for ndx in queue:
+                if retrier is None:
+                    results[ndx] = await _fetch(session, limiter, rate_per_host, jobs[ndx], as_json)
+                else:
+                    # failed requests are retried by the same worker
+                    results[ndx] = await retrier.call_async(_fetch, session, limiter, 
+                                                            rate_per_host, jobs[ndx], as_json)
+                    if retrier.breaker.is_open and not stopped:
+                        # dead source: cancel requests in flight, skip the rest
+                        stopped = True
+                        for other in workers:
+                            if other is not asyncio.current_task():
+                                other.cancel()
+                if on_result is not None:
+                    on_result(ndx, results[ndx])
+        
+        # one worker per in-flight request
+        workers.extend(asyncio.ensure_future(worker()) 
+                       for _ in range(max(1, min(concurrency, len(jobs)))))
+        for outcome in await asyncio.gather(*workers, return_exceptions = True):
+            if isinstance(outcome, Exception):
+                # e.g. raised by on_result
+                raise outcome
+        
+        return results
+
+def fetch_json_all(jobs : list,
+                   concurrency : int = 8,
+                   rate_per_host : float = 4.0,
+                   timeout : float = 30,
+                   limiter : AdaptiveRateLimiter = None,
+                   retrier : fetch_retry.Retrier = None,
+                   on_result = None) -> list:
+    '''
+    Fetches a batch of json endpoints concurrently over a pooled session
+
+    Parameters
+    ----------
+        - jobs : list of dict
+            each dict has keys url, and optionally method (default POST),
+            headers and json (request body)
+        - concurrency : int, default 8
+            max number of in-flight requests
+        - rate_per_host : float, default 4.0
+            initial requests per second against a host not seen before; the
+            limiter adapts it to the host's responses
+        - timeout : float, default 30
+            total timeout per request in seconds
+        - limiter : AdaptiveRateLimiter, optional
+            defaults to the limiter shared by all scrapers
+        - retrier : fetch_retry.Retrier, optional
+            retries each failed job with backoff within the same session;
+            once its breaker trips, requests in flight are cancelled and the
+            remaining jobs are skipped (result None)
+        - on_result : function, optional
+            called with the index and result of each job as it completes
+            (e.g. to parse and journal it)
+
+    Returns
+    -------
+        - results : list
+            decoded json per job in the same order as jobs. Failed requests
+            return the raised exception instead (None if retried, see
+            fetch_retry.Retrier)
+
+    '''
+    if not len(jobs):
+        return []
+
+    limiter = rate_limiter.LIMITER if limiter is None else limiter
+    with metrics.span('fetch'):
+        return asyncio.run(_fetch_all(jobs,
+                                      concurrency,
+                                      rate_per_host,
+                                      timeout,
+                                      limiter,
+                                      retrier = retrier,
+                                      on_result = on_result))
+
+def fetch_text_all(jobs : list,
+                   concurrency : int = 4,
+                   rate_per_host : float = 2.0,
+                   timeout : float = 30,
+                   limiter : AdaptiveRateLimiter = None,
+                   retrier : fetch_retry.Retrier = None,
+                   on_result = None) -> list:
+    '''
+    Fetches a batch of pages (e.g. HTML) concurrently over a pooled session
+
+    Parameters
+    ----------
+        - jobs : list of dict
+            each dict has keys url, and optionally method (default GET) and
+            headers
+        - concurrency : int, default 4
+            max number of in-flight requests
+        - rate_per_host : float, default 2.0
+            initial requests per second against a host not seen before; the
+            limiter adapts it to the host's responses
+        - timeout : float, default 30
+            total timeout per request in seconds
+        - limiter : AdaptiveRateLimiter, optional
+            defaults to the limiter shared by all scrapers
+        - retrier : fetch_retry.Retrier, optional
+            retries each failed job with backoff within the same session;
+            once its breaker trips, requests in flight are cancelled and the
+            remaining jobs are skipped (result None)
+        - on_result : function, optional
+            called with the index and result of each job as it completes
+            (e.g. to parse and journal it)
+
+    Returns
+    -------
+        - results : list
+            decoded text body per job in the same order as jobs. Failed
+            requests (including HTTP error statuses) return the raised
+            exception instead (None if retried, see fetch_retry.Retrier)
+
+    '''
+    if not len(jobs):
+        return []
+
+    jobs = [{'method' : 'GET', **job} for job in jobs]
+    limiter = rate_limiter.LIMITER if limiter is None else limiter
+    with metrics.span('fetch'):
+        return asyncio.run(_fetch_all(jobs,
+                                      concurrency,
+                                      rate_per_host,
+                                      timeout,
+                                      limiter,
+                                      as_json = False,
+                                      retrier = retrier,
+                                      on_result = on_result))
@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmarks for the price scraper pipeline.
+
+Run from the repository root, e.g.:
+    python -m benchmarks.bench_fix_names
+"""
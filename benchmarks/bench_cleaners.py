@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 00:12:08 2026
+
+@author: carlo
+
+Micro-benchmarks of the public cleaners in cleaner_functions on synthetic
+catalogs (tire titles, makes, models, sizes, prices, years). Each cleaner
+is timed in scalar form (one call per row, on a sample of up to
+--scalar-rows rows) and in bulk form (map_unique over all rows, the
+vectorized *_series version where one exists, and memoized scalar calls for
+memoized cleaners). Bulk results are checked to be identical to the scalar
+results; the run exits with status 1 on any mismatch.
+
+    python -m benchmarks.bench_cleaners --rows 10000 100000 1000000
+    python -m benchmarks.bench_cleaners --rows 100000 --only clean_width combine_sku
+"""
+
+import argparse
+import json
+import time
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+
+import cleaner_functions
+from reference_catalog import ReferenceCatalog
+from benchmarks.bench_gulong_catalog import BRANDS, MODELS, WIDTHS, ASPECT_RATIOS, DIAMETERS
+
+SIZES = ['175/65R14', '185/65 R15', '195/55R16', '205/55ZR16', '215/60R17',
+         '225/45R18', '235/75R15', '265/65R17', '265/70 R16', 'LT235/75R15C',
+         'LT265/75R16', '31X10.50R15', '33X12.50 R15', '7.50R16', '7.50-16',
+         '215/70R15C', '235/65R17', '245/45ZR19', '155R12C', '285/70R17']
+LOAD_SPEED = ['91V', '94H', '104/101S', '112S', '116/114R', '', '88T', '121/120Q']
+SPEED_RATINGS = ['W XL', 'T/H', '118Q', '-', 'H', 'V', '0', 'Y', np.nan]
+PRICES = ['₱5,123.00', '₱ 12,500.00', 'PHP 3,200', '4,850', '₱1.2M', '₱ 21,990.50']
+YEARS = ['2023', "'22", '23', 2021, '2019', '0', np.nan]
+
+def make_catalog(n : int, seed : int = 0) -> pd.DataFrame:
+    '''
+    Synthetic scraped rows with the raw columns the cleaners read
+
+    DOCTESTS:
+    >>> df = make_catalog(5)
+    >>> len(df), df['title'].str.contains('/|X|-').all()
+    (5, True)
+    '''
+    rng = np.random.default_rng(seed)
+    pick = lambda pool: pd.Series(np.asarray(pool, dtype = object)[rng.integers(0, len(pool), n)])
+
+    brand = pick(BRANDS)
+    model = pick([m for m in MODELS if m != '-'])
+    size = pick(SIZES)
+    load_speed = pick(LOAD_SPEED)
+    # makes as typed by sellers: case, padding and a dropped letter
+    variant = rng.integers(0, 4, n)
+    make = brand.where(variant != 1, brand.str.lower())
+    make = make.where(variant != 2, ' ' + brand + ' ')
+    make = make.where(variant != 3, brand.str[:-1])
+    # titles in the word orders used by the sites
+    order = rng.integers(0, 3, n)
+    title = (brand + ' ' + model + ' ' + size + ' ' + load_speed)
+    title = title.where(order != 1, size + ' ' + brand + ' ' + model + ' ' + load_speed)
+    title = title.where(order != 2, brand + ' ' + size + ' ' + load_speed + ' ' + model.str.lower())
+    load_rating, speed_rating = load_speed.str[:-1], load_speed.str[-1:]
+
+    return pd.DataFrame({'title' : title.str.strip(),
+                         'make' : make,
+                         'brand' : brand,
+                         'model' : model.where(rng.random(n) > 0.3, model.str.lower() + ' xl'),
+                         'size' : size,
+                         'width' : pick(WIDTHS),
+                         'aspect_ratio' : pick(ASPECT_RATIOS),
+                         'diameter' : pick(DIAMETERS),
+                         'load_rating' : load_rating,
+                         'speed_rating' : speed_rating,
+                         'speed_raw' : pick(SPEED_RATINGS),
+                         'price' : pick(PRICES),
+                         'year' : pick(YEARS),
+                         'number' : pick([Decimal(x) for x in ['15.0', '7.50', '225', '10.50', '65.00', '12.5']])})
+
+def make_cases(df : pd.DataFrame) -> dict:
+    '''
+    Cleaners with their input columns, keyword arguments and vectorized
+    version (if any)
+    '''
+    models = [m for m in MODELS if m != '-']
+    catalog = ReferenceCatalog(pd.DataFrame({'name' : models,
+                                             'brand' : [BRANDS[i % len(BRANDS)] for i in range(len(models))]}))
+    makes = cleaner_functions.import_makes()
+    # combine_* take cleaned string columns
+    w = cleaner_functions.clean_width_series(df['width']).astype(str)
+    ar = cleaner_functions.clean_aspect_ratio_series(df['aspect_ratio']).astype(str)
+    d = cleaner_functions.clean_diameter_series(df['diameter']).astype(str)
+    cf = cleaner_functions
+
+    return {'fix_names' : (cf.fix_names, [df['model']], {'comp' : catalog},
+                           lambda: cf.fix_names_series(df['model'], comp = catalog)),
+            'clean_model' : (cf.clean_model, [df['title']], {'ref' : catalog}, None),
+            'clean_makes' : (cf.clean_makes, [df['make']], {'ref' : catalog}, None),
+            'clean_make' : (cf.clean_make, [df['make']], {'makes' : makes}, None),
+            'clean_specs' : (cf.clean_specs, [df['title']], {}, None),
+            'clean_tire_size' : (cf.clean_tire_size, [df['size']], {}, None),
+            'clean_width' : (cf.clean_width, [df['width']], {},
+                             lambda: cf.clean_width_series(df['width'])),
+            'clean_aspect_ratio' : (cf.clean_aspect_ratio, [df['aspect_ratio']], {},
+                                    lambda: cf.clean_aspect_ratio_series(df['aspect_ratio'])),
+            'clean_diameter' : (cf.clean_diameter, [df['diameter']], {},
+                                lambda: cf.clean_diameter_series(df['diameter'])),
+            'combine_specs' : (cf.combine_specs, [w, ar, d], {'mode' : 'SKU'},
+                               lambda: cf.combine_specs_series(w, ar, d, mode = 'SKU')),
+            'combine_specs_match' : (cf.combine_specs, [w, ar, d], {'mode' : 'MATCH'},
+                                     lambda: cf.combine_specs_series(w, ar, d, mode = 'MATCH')),
+            'combine_sku' : (cf.combine_sku, [df['brand'], w, ar, d, df['model'],
+                                              df['load_rating'], df['speed_rating']], {},
+                             lambda: cf.combine_sku_series(df['brand'], w, ar, d, df['model'],
+                                                           df['load_rating'], df['speed_rating'])),
+            'clean_speed_rating' : (cf.clean_speed_rating, [df['speed_raw']], {}, None),
+            'clean_load_speed_rating' : (cf.clean_load_speed_rating, [df['title']], {}, None),
+            'clean_price' : (cf.clean_price, [df['price']], {}, None),
+            'clean_year' : (cf.clean_year, [df['year']], {}, None),
+            'remove_trailing_zero' : (cf.remove_trailing_zero, [df['number']], {}, None)}
+
+def same(a, b) -> bool:
+    '''
+    Equality with NaN equal to NaN, element-wise for lists and tuples
+
+    DOCTESTS:
+    >>> same(['225', np.nan], ('225', float('nan')))
+    True
+    >>> same('R15', 'R15C')
+    False
+    '''
+    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+        return (len(a) == len(b)) and all(same(x, y) for x, y in zip(a, b))
+    try:
+        if pd.isna(a) and pd.isna(b):
+            return True
+    except (TypeError, ValueError):
+        pass
+    return (type(a) == type(b)) and (a == b)
+
+def mismatches(expected : list, result) -> list:
+    '''
+    (row, expected, result) of rows where result differs
+    '''
+    return [(ndx, e, r) for ndx, (e, r) in enumerate(zip(expected, list(result)))
+            if not same(e, r)]
+
+def timed(func):
+    t0 = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - t0
+
+def bench_cleaner(name : str,
+                  case : tuple,
+                  scalar_rows : int) -> dict:
+    func, columns, kwargs, series = case
+    n = len(columns[0])
+    m = min(n, scalar_rows)
+    sample = [col.iloc[:m] for col in columns]
+
+    expected, t_scalar = timed(lambda: [func(*args, **kwargs) for args in zip(*sample)])
+    forms = {}
+    unique, t_unique = timed(lambda: cleaner_functions.map_unique(func, *columns, name = f'bench_{name}', **kwargs))
+    forms['map_unique'] = (t_unique, mismatches(expected, unique.iloc[:m]))
+    if series is not None:
+        vector, t_vector = timed(series)
+        forms['series'] = (t_vector, mismatches(expected, vector.iloc[:m]))
+    if hasattr(func, 'memo'):
+        cleaner_functions.enable_memoization()
+        try:
+            memo, t_memo = timed(lambda: [func(*args, **kwargs) for args in zip(*sample)])
+        finally:
+            cleaner_functions.disable_memoization()
+        # memoized calls are timed on the scalar sample
+        forms['memoized'] = (t_memo * n / m, mismatches(expected, memo))
+
+    result = {'cleaner' : name,
+              'rows' : n,
+              'scalar_rows' : m,
+              'scalar_us_per_row' : round(1e6 * t_scalar / m, 2),
+              'scalar_secs_est' : round(t_scalar * n / m, 4)}
+    for form, (secs, bad) in forms.items():
+        result[f'{form}_secs'] = round(secs, 4)
+        result[f'{form}_speedup'] = round(t_scalar * n / m / max(secs, 1e-9), 1)
+        result[f'{form}_mismatches'] = len(bad)
+        if len(bad):
+            result[f'{form}_example'] = repr(bad[0])
+    return result
+
+def run(rows : list = [10000, 100000],
+        scalar_rows : int = 20000,
+        only : list = None,
+        seed : int = 0) -> list:
+    # scalar timings without cached results
+    cleaner_functions.disable_memoization()
+    results = []
+    for n in rows:
+        df = make_catalog(n, seed)
+        for name, case in make_cases(df).items():
+            if (only is None) or (name in only):
+                results.append(bench_cleaner(name, case, scalar_rows))
+                r = results[-1]
+                bulk = ', '.join(f"{form} {r[f'{form}_secs']:.3f}s ({r[f'{form}_speedup']}x)"
+                                 + (f" MISMATCH {r[f'{form}_mismatches']}" if r[f'{form}_mismatches'] else '')
+                                 for form in ['map_unique', 'series', 'memoized'] if f'{form}_secs' in r)
+                print(f"{n:>8} {name:>24}: scalar {r['scalar_us_per_row']:8.2f}us/row, {bulk}")
+    return results
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type = int, nargs = '+', default = [10000, 100000])
+    parser.add_argument('--scalar-rows', type = int, default = 20000,
+                        help = 'rows timed with one call per row')
+    parser.add_argument('--only', nargs = '+', default = None)
+    parser.add_argument('--output', default = None, help = 'JSON file for the results')
+    args = parser.parse_args()
+
+    results = run(args.rows, args.scalar_rows, args.only)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent = 2)
+    if any(v for r in results for k, v in r.items() if k.endswith('_mismatches')):
+        raise SystemExit(1)
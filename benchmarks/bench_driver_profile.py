@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 21:14:27 2026
+
+@author: carlo
+
+Benchmark of get_chromedriver.create_driver profiles on local fixture
+pages: 'default' vs 'scrape' (blocked images/fonts/trackers, eager page
+load). Reports page time (driver.get + tile extraction) and peak RSS of
+the chromedriver process tree. Requires Chrome and chromedriver.
+
+    python -m benchmarks.bench_driver_profile --pages 20
+"""
+
+import argparse
+import http.server
+import os
+import socketserver
+import threading
+import time
+
+import get_chromedriver
+import tiremanila_scraper
+
+TILES = 24
+IMAGE_BYTES = 200 * 1024
+# third-party script latency in seconds
+TRACKER_DELAY = 0.5
+
+def tile_html(page : int, i : int) -> str:
+    return f'''<div class="sv-tile sv-list-view sv-size-big">
+<img src="/img/{page}-{i}.png">
+<h3 class="sv-tile__title sv-text-reset sv-link-reset">BRIDGESTONE DUELER H/T {page}-{i} 265/65R17</h3>
+<div class="sv-badge-list"><span>HT</span><span>2023</span></div>
+<p class="sv-tile__price sv-text-reset">&#8369; 5,{i:03d}</p>
+<div class="sv-tile__table sv-no-border"><div>Index:</div><div>112S</div><div>Qty:</div><div>4</div></div>
+</div>'''
+
+def page_html(page : int) -> str:
+    tiles = '\n'.join(tile_html(page, i) for i in range(TILES))
+    return f'''<html><head>
+<link rel="stylesheet" href="/static/site.css">
+<style>@font-face {{font-family: f; src: url(/static/font.woff2);}} body {{font-family: f;}}</style>
+<script async src="/tracker/collect.js"></script>
+</head><body>{tiles}
+<iframe src="/tracker/frame.html"></iframe>
+</body></html>'''
+
+class FixtureHandler(http.server.BaseHTTPRequestHandler):
+    def do_GET(self):
+        path = self.path.split('?')[0]
+        if path.startswith('/tracker/'):
+            time.sleep(TRACKER_DELAY)
+            body, content_type = b'', 'text/javascript'
+        elif path.startswith('/img/') or path.endswith('.woff2'):
+            body, content_type = os.urandom(IMAGE_BYTES), 'application/octet-stream'
+        elif path.endswith('.css'):
+            body, content_type = b'.sv-tile {display: block;}', 'text/css'
+        else:
+            page = int(self.path.split('page=')[-1]) if 'page=' in self.path else 1
+            body, content_type = page_html(page).encode(), 'text/html; charset=utf-8'
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def process_tree_rss(pid : int) -> int:
+    '''
+    Resident memory in bytes of a process and its descendants
+    '''
+    try:
+        import psutil
+        root = psutil.Process(pid)
+        return sum(p.memory_info().rss for p in [root] + root.children(recursive = True))
+    except ImportError:
+        pass
+
+    # linux without psutil
+    children = {}
+    for entry in os.listdir('/proc'):
+        if entry.isdigit():
+            try:
+                with open(f'/proc/{entry}/stat') as f:
+                    ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+                children.setdefault(ppid, []).append(int(entry))
+            except:
+                continue
+
+    rss, stack = 0, [pid]
+    while stack:
+        p = stack.pop()
+        stack.extend(children.get(p, []))
+        try:
+            with open(f'/proc/{p}/status') as f:
+                rss += int([line for line in f if line.startswith('VmRSS')][0].split()[1]) * 1024
+        except:
+            continue
+    return rss
+
+def run_profile(profile : str, base_url : str, pages : int) -> dict:
+    driver = get_chromedriver.create_driver(profile = profile)
+    if profile == 'scrape':
+        # fixture tracker is served locally
+        get_chromedriver.apply_scrape_profile(driver,
+                                              get_chromedriver.SCRAPE_BLOCKED_URLS + ['*/tracker/*'])
+    pid = driver.service.process.pid
+    times, peak_rss, items = [], 0, 0
+    try:
+        for page in range(1, pages + 1):
+            start = time.perf_counter()
+            driver.get(f'{base_url}/?page={page}')
+            items += len(tiremanila_scraper.extract_tiles(driver))
+            times.append(time.perf_counter() - start)
+            peak_rss = max(peak_rss, process_tree_rss(pid))
+    finally:
+        driver.quit()
+
+    times.sort()
+    return {'profile' : profile,
+            'pages' : pages,
+            'items' : items,
+            'mean_page_secs' : round(sum(times) / len(times), 3),
+            'p90_page_secs' : round(times[int(0.9 * (len(times) - 1))], 3),
+            'peak_rss_mb' : round(peak_rss / 2**20, 1)}
+
+def run(pages : int = 20) -> list:
+    server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), FixtureHandler)
+    server.daemon_threads = True
+    threading.Thread(target = server.serve_forever, daemon = True).start()
+    base_url = f'http://127.0.0.1:{server.server_address[1]}'
+    try:
+        results = [run_profile(profile, base_url, pages) for profile in ['default', 'scrape']]
+    finally:
+        server.shutdown()
+
+    for r in results:
+        print(f"{r['profile']:>8}: {r['mean_page_secs']:.3f}s/page (p90 {r['p90_page_secs']:.3f}s), "
+              f"peak RSS {r['peak_rss_mb']} MB, {r['items']} items")
+    return results
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pages', type = int, default = 20)
+    args = parser.parse_args()
+    run(args.pages)
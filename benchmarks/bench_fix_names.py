@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 13:42:51 2026
+
+@author: carlo
+
+Benchmark of reference-model matching in cleaner_functions.fix_names:
+per-model re.search loop (comp as list) vs ReferenceCatalog automaton.
+
+    python -m benchmarks.bench_fix_names --models 500 --rows 2000
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+import pandas as pd
+
+import cleaner_functions
+from reference_catalog import ReferenceCatalog
+
+WORDS = ['OPEN', 'COUNTRY', 'DUELER', 'H/T', 'A/T', 'M/T', 'PRIMACY', 'ENERGY',
+         'BLUEARTH', 'ADVAN', 'SPORT', 'MAXX', 'WRANGLER', 'GEOLANDAR', 'TURANZA',
+         'ECOPIA', 'POTENZA', 'PROXES', 'ASSURANCE', 'EAGLE', 'TRAIL-TERRAIN']
+
+def make_models(n : int, seed : int = 0) -> list:
+    '''
+    Synthetic reference model names without regex metacharacters
+    '''
+    rng = random.Random(seed)
+    models = set()
+    while len(models) < n:
+        words = rng.sample(WORDS, rng.randint(1, 3))
+        if rng.random() < 0.6:
+            words.append(rng.choice(['', 'AE', 'RE', 'EC', 'G']) + str(rng.randint(1, 999)))
+        models.add(' '.join(words))
+    return sorted(models)
+
+def make_names(models : list, n : int, seed : int = 1) -> list:
+    '''
+    Synthetic competitor model strings; most contain a reference model
+    '''
+    rng = random.Random(seed)
+    names = []
+    for _ in range(n):
+        if rng.random() < 0.8:
+            name = rng.choice(models)
+            name = ' '.join([name, rng.choice(['', 'RBT', 'XL', 'II', 'PLUS'])]).strip()
+        else:
+            name = ' '.join(rng.sample(WORDS, 2))
+        names.append(name.lower() if rng.random() < 0.3 else name)
+    return names
+
+def run(n_models : int = 500, n_rows : int = 2000) -> dict:
+    models = make_models(n_models)
+    names = make_names(models, n_rows)
+    catalog = ReferenceCatalog(pd.DataFrame({'name' : models,
+                                             'brand' : ['X'] * len(models)}))
+    comp = catalog.model_names
+
+    t0 = time.perf_counter()
+    loop_result = [cleaner_functions.fix_names(n, comp = comp) for n in names]
+    t_loop = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    catalog_result = [cleaner_functions.fix_names(n, comp = catalog) for n in names]
+    t_catalog = time.perf_counter() - t0
+
+    mismatches = int(np.sum([a != b for a, b in zip(loop_result, catalog_result)]))
+
+    return {'models' : n_models,
+            'rows' : n_rows,
+            'loop_secs' : round(t_loop, 4),
+            'automaton_secs' : round(t_catalog, 4),
+            'speedup' : round(t_loop / t_catalog, 1),
+            'mismatches' : mismatches}
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--models', type = int, default = 500)
+    parser.add_argument('--rows', type = int, default = 2000)
+    args = parser.parse_args()
+    print(run(args.models, args.rows))
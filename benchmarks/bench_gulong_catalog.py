@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 15:02:17 2026
+
+@author: carlo
+
+Benchmark of gulong catalog cleaning in main_price_scraper.normalize_gulong_data:
+row-wise apply (vectorized=False) vs vectorized column cleaners.
+
+    python -m benchmarks.bench_gulong_catalog --rows 50000
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+import pandas as pd
+
+from main_price_scraper import normalize_gulong_data
+
+BRANDS = ['BRIDGESTONE', 'MICHELIN', 'YOKOHAMA', 'TOYO', 'GOODYEAR', 'DUNLOP',
+          'ARIVO', 'FIRESTONE', 'BFGOODRICH', 'GT RADIAL']
+MODELS = ['DUELER H/T 684', 'PRIMACY 4', 'BLUEARTH AE01', 'OPEN COUNTRY A/T',
+          'ASSURANCE TRIPLEMAX', 'SP SPORT MAXX', 'PREMIO ARZ1', 'DESTINATION LE2',
+          'ALL-TERRAIN T/A KO2', 'CHAMPIRO ECO', 'AGILIS 3', 'XM2+', '-']
+WIDTHS = ['175', '185', '195', '205', '215', '225', '235', '265', '31', '33',
+          '7.5', '10.5', 'LT235', '27', '265.0']
+ASPECT_RATIOS = ['65', '70', '60', '55', '50', '75', '80', 'R', '0', '10.5',
+                 '12.5', '.5', '13', '9.5', '65.0']
+DIAMETERS = ['14', '15', '16', '17', '18', 'R15', '15C', 'R16C', '17.5', '16.0', '20']
+
+def make_catalog(n : int, seed : int = 0) -> pd.DataFrame:
+    '''
+    Synthetic gulong backend data (after column renaming) with the messy
+    width, aspect_ratio and diameter values seen in the live catalog
+    '''
+    rng = random.Random(seed)
+    return pd.DataFrame({'brand' : [rng.choice(BRANDS) for _ in range(n)],
+                         'name' : [rng.choice(MODELS) for _ in range(n)],
+                         'width' : [rng.choice(WIDTHS) for _ in range(n)],
+                         'aspect_ratio' : [rng.choice(ASPECT_RATIOS) for _ in range(n)],
+                         'diameter' : [rng.choice(DIAMETERS) for _ in range(n)],
+                         'load_rating' : [rng.choice(['91', '104/101', np.NaN]) for _ in range(n)],
+                         'speed_rating' : [rng.choice(['H', 'V', 'S', np.NaN]) for _ in range(n)],
+                         'price_gulong' : [rng.randint(2000, 20000) for _ in range(n)]})
+
+def run(n_rows : int = 50000) -> dict:
+    df = make_catalog(n_rows)
+    cols = ['sku_name', 'raw_specs', 'name', 'width', 'aspect_ratio',
+            'diameter', 'correct_specs']
+
+    t0 = time.perf_counter()
+    apply_result = normalize_gulong_data(df.copy(), vectorized = False)
+    t_apply = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    vector_result = normalize_gulong_data(df.copy(), vectorized = True)
+    t_vector = time.perf_counter() - t0
+
+    mismatches = {c : int((apply_result[c].astype(str) != vector_result[c].astype(str)).sum())
+                  for c in cols}
+
+    return {'rows' : n_rows,
+            'apply_secs' : round(t_apply, 4),
+            'vectorized_secs' : round(t_vector, 4),
+            'speedup' : round(t_apply / t_vector, 1),
+            'mismatches' : mismatches}
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type = int, default = 50000)
+    args = parser.parse_args()
+    print(run(args.rows))
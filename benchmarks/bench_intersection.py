@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:48:02 2026
+
+@author: carlo
+
+Benchmark of main_price_scraper.get_intersection: chained outer pd.merge
+(engine='merge') vs integer-keyed join (engine='keyed').
+
+    python -m benchmarks.bench_intersection --scale 10
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+import pandas as pd
+
+from main_price_scraper import get_intersection
+
+# approximate rows per source in a daily run
+BASE_ROWS = {'gulong' : 5000,
+             'gogulong' : 2500,
+             'tiremanila' : 1500,
+             'partspro' : 1000}
+
+BRANDS = ['BRIDGESTONE', 'MICHELIN', 'YOKOHAMA', 'TOYO', 'GOODYEAR', 'DUNLOP',
+          'ARIVO', 'FIRESTONE', 'BFGOODRICH', 'GT RADIAL', 'COOPER', 'KUMHO']
+
+def make_keys(n : int, seed : int = 0) -> list:
+    '''
+    Synthetic (name, brand, correct_specs, raw_specs) products
+    '''
+    rng = random.Random(seed)
+    keys = []
+    for i in range(n):
+        w, ar, d = rng.choice(range(155, 330, 10)), rng.choice(range(30, 85, 5)), rng.choice(range(13, 23))
+        keys.append((f'MODEL {rng.randint(1, n // 4 + 1)}', rng.choice(BRANDS),
+                     f'{w}/{ar}/{d}', f'{w}/{ar}/R{d}'))
+    return keys
+
+def make_source(keys : list, n : int, suffix : str, seed : int) -> pd.DataFrame:
+    '''
+    Source dataframe sampling products from keys (with repeats), with some
+    missing prices and empty strings
+    '''
+    rng = random.Random(seed)
+    rows = [rng.choice(keys) for _ in range(n)]
+    price = [np.nan if rng.random() < 0.05 else float(rng.randint(2000, 20000)) for _ in range(n)]
+    return pd.DataFrame({'sku_name' : [' '.join([r[1], r[3], r[0]]) if rng.random() > 0.02 else np.nan for r in rows],
+                         'name' : [r[0] for r in rows],
+                         'brand' : [r[1] for r in rows],
+                         'raw_specs' : [r[3] for r in rows],
+                         'correct_specs' : [r[2] for r in rows],
+                         f'price_{suffix}' : price})
+
+def make_sources(scale : float = 1, seed : int = 0) -> tuple:
+    n = {k : int(v * scale) for k, v in BASE_ROWS.items()}
+    keys = make_keys(n['gulong'], seed)
+    df_gulong = make_source(keys, n['gulong'], 'gulong', seed + 1)
+    df_gogulong = make_source(keys, n['gogulong'], 'gogulong', seed + 2)
+    df_tiremanila = make_source(keys, n['tiremanila'], 'tiremanila', seed + 3)
+    rng = random.Random(seed + 4)
+    df_tiremanila['qty_tiremanila'] = [rng.choice(['4', '12', '']) for _ in range(len(df_tiremanila))]
+    df_tiremanila['year'] = [rng.choice(['2022', '2023', np.nan]) for _ in range(len(df_tiremanila))]
+    df_partspro = make_source(keys, n['partspro'], 'partspro', seed + 5)
+    # partspro prices are kept as cleaned strings
+    df_partspro['price_partspro'] = df_partspro['price_partspro'].map(lambda x: x if pd.isna(x) else str(int(x)))
+    return df_gulong, df_gogulong, df_tiremanila, df_partspro
+
+def canonical(df : pd.DataFrame) -> pd.DataFrame:
+    '''
+    Rows in a fixed order for comparison (tie order within raw_specs may differ)
+    '''
+    df = df.astype(str)
+    return df.sort_values(list(df.columns)).reset_index(drop = True)
+
+def run(scale : float = 10) -> dict:
+    sources = make_sources(scale)
+
+    t0 = time.perf_counter()
+    merge_result = get_intersection(*sources, engine = 'merge')
+    t_merge = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    keyed_result = get_intersection(*sources, engine = 'keyed')
+    t_keyed = time.perf_counter() - t0
+
+    return {'scale' : scale,
+            'rows_in' : sum(len(s) for s in sources),
+            'rows_out' : len(keyed_result),
+            'merge_secs' : round(t_merge, 4),
+            'keyed_secs' : round(t_keyed, 4),
+            'speedup' : round(t_merge / t_keyed, 1),
+            'same_rows' : canonical(merge_result).equals(canonical(keyed_result)),
+            'same_dtypes' : merge_result.dtypes.equals(keyed_result.dtypes)}
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scale', type = float, default = 10)
+    args = parser.parse_args()
+    print(run(args.scale))
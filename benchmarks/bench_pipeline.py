@@ -0,0 +1,451 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 23:31:45 2026
+
+@author: carlo
+
+End-to-end benchmark of main_price_scraper.main against recorded fixtures.
+Builds a synthetic replay archive (Gulong catalog CSV, GoGulong search JSON,
+TireManila and PartsPro listing pages) at each catalog scale, serves it with
+replay.ReplayServer and runs main once per scale in a fresh process.
+
+Reports per stage (Gulong import, each scraper, each construct step,
+get_intersection, output) wall time, CPU time, peak RSS, items/s and
+pages/s, and saves the results as JSON to compare commits:
+
+    python -m benchmarks.bench_pipeline --scales 1 5 20
+    python -m benchmarks.bench_pipeline --compare benchmarks/results/old.json
+
+Scraper stages include their construct step. Requests are not paced unless
+--paced is given (then the shared rate limiter's production rates apply).
+Each run keeps its response cache, checkpoint journals and metrics in a
+temporary folder, so production state is never read or written.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import subprocess
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime as dt
+
+import pandas as pd
+
+import replay
+import rate_limiter
+import checkpoint
+import cleaner_functions
+import main_price_scraper
+import gogulong_scraper
+import tiremanila_scraper
+import partspro_scraper
+from main_price_scraper import GULONG_URL
+from response_cache import ResponseCache
+
+# approximate rows per source in a daily run (1x)
+BASE_ROWS = {'gulong' : 1500,
+             'tiremanila' : 500,
+             'partspro' : 300}
+
+SIZES_PER_SCALE = 150
+TILES_PER_PAGE = 24
+
+BRANDS = ['BRIDGESTONE', 'MICHELIN', 'YOKOHAMA', 'TOYO', 'GOODYEAR', 'DUNLOP',
+          'ARIVO', 'FIRESTONE', 'BFGOODRICH', 'GT RADIAL', 'COOPER', 'KUMHO']
+MODELS = ['DUELER H/T 684', 'PRIMACY 4', 'BLUEARTH AE01', 'OPEN COUNTRY A/T',
+          'ASSURANCE TRIPLEMAX', 'SP SPORT MAXX', 'PREMIO ARZ1', 'DESTINATION LE2',
+          'ALL-TERRAIN T/A KO2', 'CHAMPIRO ECO', 'AGILIS 3', 'ECOPIA EP150']
+
+HOSTS = {'gulong' : rate_limiter.get_host(GULONG_URL),
+         'gogulong' : rate_limiter.get_host(gogulong_scraper.GOGULONG_API_URL),
+         'tiremanila' : rate_limiter.get_host(tiremanila_scraper.PAGE_URL),
+         'partspro' : rate_limiter.get_host(partspro_scraper.PAGE_URL)}
+
+def make_sizes(n : int, seed : int = 0) -> list:
+    '''
+    n distinct (width, aspect ratio, diameter) tire sizes
+    '''
+    rng = random.Random(seed)
+    sizes = [(w, ar, d) for w in range(155, 325, 10)
+             for ar in range(30, 85, 5) for d in range(13, 23)]
+    rng.shuffle(sizes)
+    return sizes[:n]
+
+def make_products(sizes : list, n : int, seed : int) -> list:
+    '''
+    n distinct (brand, model, size) products
+    '''
+    rng = random.Random(seed)
+    products = set()
+    while len(products) < min(n, len(sizes) * len(BRANDS) * len(MODELS)):
+        products.add((rng.choice(BRANDS), rng.choice(MODELS), rng.choice(sizes)))
+    return sorted(products)
+
+def gulong_csv(products : list, seed : int) -> str:
+    '''
+    Gulong backend export (redash query 131) of products
+    '''
+    rng = random.Random(seed)
+    rows = []
+    for n, (brand, model, (w, ar, d)) in enumerate(products):
+        srp = rng.randint(2000, 20000)
+        rows.append({'model' : f'{brand} {w}/{ar}/R{d} {model}',
+                     'name' : rng.choice(['SUPPLIER A', 'SUPPLIER B']),
+                     'pattern' : model,
+                     'make' : brand,
+                     'section_width' : w,
+                     'aspect_ratio' : ar,
+                     'rim_size' : d,
+                     'load_rating' : rng.choice(['91', '104/101', '']),
+                     'speed_rating' : rng.choice(['H', 'V', 'S', '']),
+                     'srp' : srp,
+                     'promo' : srp - rng.randint(0, 500),
+                     'sale_tag' : rng.choice([0, 1]),
+                     'activity' : 0 if rng.random() < 0.05 else 1,
+                     'supplier_price_date_updated' : '10/01/26 08:00',
+                     'product_price_date_updated' : '10/01/26 08:00'})
+    return pd.DataFrame(rows).to_csv(index = False)
+
+def gogulong_response(spec : str, rng : random.Random) -> dict:
+    '''
+    GoGulong search response with a few products of size spec
+    '''
+    w, ar, d = spec.split('/')
+    result = []
+    for i in range(rng.randint(0, 4)):
+        brand, model = rng.choice(BRANDS), rng.choice(MODELS)
+        result.append({'sellingPrice' : rng.randint(2000, 20000),
+                       'tire' : {'tire_id' : f'{spec}-{i}',
+                                 'size' : f'{w}/{ar} R{d}',
+                                 'slug' : f'{brand}-{model}-{w}-{ar}-{d}'.lower(),
+                                 'plyRating' : rng.choice([None, 8, 10]),
+                                 'width' : w,
+                                 'aspectRatio' : ar,
+                                 'rimDiameter' : d,
+                                 'tireDesign' : {'tireBrand' : brand,
+                                                 'designName' : model}}})
+    return {'result' : {'result' : result}}
+
+def tiremanila_page(products : list, page : int, last_page : int) -> str:
+    tiles = []
+    for i, (brand, model, (w, ar, d)) in enumerate(products):
+        tiles.append(f'''<div class="sv-tile sv-list-view sv-size-big">
+<h3 class="sv-tile__title sv-text-reset sv-link-reset">{w}/{ar}R{d} {brand} {model}</h3>
+<div class="sv-badge-list"><div>HT</div><div>{2022 + i % 3}</div><div>On Stock</div></div>
+<p class="sv-tile__price sv-text-reset">&#8369;{5000 + 37 * i:,}.00</p>
+<div class="sv-tile__table sv-no-border"><div>Index:</div><div>{90 + i % 20}V</div><div>Qty:</div><div>{4 * (1 + i % 3)}</div></div>
+</div>''')
+    pagination = ''.join(f'<a tabindex="0">{p}</a>' for p in sorted({1, page, last_page}))
+    return f'<html><body>{"".join(tiles)}<nav>{pagination}</nav></body></html>'
+
+def partspro_page(products : list, page : int, last_page : int) -> str:
+    items = []
+    for i, (brand, model, (w, ar, d)) in enumerate(products):
+        items.append(f'''<div class="product-item__info-inner">
+<a class="product-item__vendor link">{brand}</a>
+<a class="product-item__title text--strong link">{brand} {model} {w}/{ar}R{d} {90 + i % 20}V</a>
+<div class="product-item__price-list"><span class="price">&#8369;{4000 + 29 * i:,}.00</span></div>
+</div>''')
+    pagination = ''.join(f'<a class="pagination__nav-item link">{p}</a>' for p in sorted({1, page, last_page}))
+    return f'<html><body>{"".join(items)}<div class="pagination">{pagination}</div></body></html>'
+
+def add_pages(archive : replay.ResponseArchive,
+              page_url : str,
+              products : list,
+              render) -> int:
+    pages = [products[i:i + TILES_PER_PAGE] for i in range(0, len(products), TILES_PER_PAGE)]
+    for page, page_products in enumerate(pages, start = 1):
+        archive.add('GET', page_url.format(page = page), None, 200,
+                    'text/html; charset=utf-8', render(page_products, page, len(pages)))
+    return len(pages)
+
+def make_archive(path : str,
+                 scale : float = 1,
+                 seed : int = 0) -> dict:
+    '''
+    Writes the replay archive of a run at catalog scale
+
+    Returns
+    -------
+        - counts : dict
+            catalog rows, GoGulong specs and pages per source
+    '''
+    sizes = make_sizes(int(SIZES_PER_SCALE * scale), seed)
+    archive = replay.ResponseArchive(path)
+    archive.add('GET', GULONG_URL, None, 200, 'text/csv',
+                gulong_csv(make_products(sizes, int(BASE_ROWS['gulong'] * scale), seed + 1), seed + 2))
+    archive.save()
+
+    # GoGulong searches every size of the cleaned catalog
+    with replay.ReplayServer(path) as server:
+        replay.set_target(server.url)
+        try:
+            specs = gogulong_scraper.get_correct_specs(main_price_scraper.get_gulong_data())
+        finally:
+            replay.set_target(None)
+
+    rng = random.Random(seed + 3)
+    for spec in specs:
+        archive.add('POST', gogulong_scraper.GOGULONG_API_URL,
+                    gogulong_scraper.get_payload(*spec.split('/')), 200,
+                    'application/json', json.dumps(gogulong_response(spec, rng)))
+
+    counts = {'gulong_rows' : int(BASE_ROWS['gulong'] * scale),
+              'gogulong_specs' : len(specs)}
+    counts['tiremanila_pages'] = add_pages(archive, tiremanila_scraper.PAGE_URL,
+                                           make_products(sizes, int(BASE_ROWS['tiremanila'] * scale), seed + 4),
+                                           tiremanila_page)
+    counts['partspro_pages'] = add_pages(archive, partspro_scraper.PAGE_URL,
+                                         make_products(sizes, int(BASE_ROWS['partspro'] * scale), seed + 5),
+                                         partspro_page)
+    archive.save()
+    return counts
+
+def current_rss() -> int:
+    '''
+    Resident memory of this process in bytes
+    '''
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except:
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+class StageRecorder:
+    '''
+    Wall time, thread CPU time, peak RSS and item counts of instrumented
+    functions; calls of the same stage add up
+    '''
+    def __init__(self, interval : float = 0.02):
+        self.stages = {}
+        self.interval = interval
+        self.peak_rss = 0
+        self._active = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._sampler = threading.Thread(target = self._sample, daemon = True)
+
+    def _sample(self):
+        while not self._stop.is_set():
+            rss = current_rss()
+            with self._lock:
+                self.peak_rss = max(self.peak_rss, rss)
+                for key in self._active:
+                    stage = self.stages[self._active[key]]
+                    stage['peak_rss'] = max(stage['peak_rss'], rss)
+            self._stop.wait(self.interval)
+
+    def start(self):
+        self._sampler.start()
+
+    def stop(self):
+        self._stop.set()
+        self._sampler.join()
+
+    def wrap(self, name : str, func, count_items = len):
+        def timed(*args, **kwargs):
+            key = object()
+            with self._lock:
+                stage = self.stages.setdefault(name, {'calls' : 0, 'wall_secs' : 0.0,
+                                                      'cpu_secs' : 0.0, 'items' : 0,
+                                                      'peak_rss' : current_rss()})
+                self._active[key] = name
+            wall, cpu = time.perf_counter(), time.thread_time()
+            try:
+                result = func(*args, **kwargs)
+            finally:
+                with self._lock:
+                    del self._active[key]
+                    stage['calls'] += 1
+                    stage['wall_secs'] += time.perf_counter() - wall
+                    stage['cpu_secs'] += time.thread_time() - cpu
+            stage['items'] += count_items(result)
+            return result
+        return timed
+
+@contextmanager
+def instrument(recorder : StageRecorder, output_dir : str):
+    '''
+    Times the pipeline stages; the Google Sheets upload is replaced by a CSV
+    write of the same dataframe
+    '''
+    def write_csv(df):
+        df.to_csv(os.path.join(output_dir, 'merged.csv'), index = False)
+        return len(df)
+
+    patches = [(main_price_scraper, 'get_gulong_data', 'gulong_import', len),
+               (gogulong_scraper, 'main', 'scrape_gogulong', lambda r: r['items']),
+               (tiremanila_scraper, 'main', 'scrape_tiremanila', lambda r: r['items']),
+               (partspro_scraper, 'main', 'scrape_partspro', lambda r: r['items']),
+               (gogulong_scraper, 'construct_gogulong_df', 'construct_gogulong', len),
+               (tiremanila_scraper, 'construct_tiremanila_df', 'construct_tiremanila', len),
+               # PartsPro products are cleaned page by page
+               (partspro_scraper, 'clean_products', 'construct_partspro', len),
+               (main_price_scraper, 'get_intersection', 'intersection', len)]
+    originals = [(module, attr, getattr(module, attr)) for module, attr, _, _ in patches]
+    for module, attr, name, count_items in patches:
+        setattr(module, attr, recorder.wrap(name, getattr(module, attr), count_items))
+    original_write = main_price_scraper.write_to_gsheet
+    main_price_scraper.write_to_gsheet = recorder.wrap('output', write_csv, lambda rows: rows)
+    try:
+        yield recorder
+    finally:
+        for module, attr, func in originals:
+            setattr(module, attr, func)
+        main_price_scraper.write_to_gsheet = original_write
+
+@contextmanager
+def isolated_state(folder : str):
+    '''
+    Keeps the response cache, checkpoint journals and run metrics of a
+    benchmark run in folder, away from those of production runs
+    '''
+    original_cache, original_dir = gogulong_scraper.cache, checkpoint.CHECKPOINT_DIR
+    gogulong_scraper.cache = ResponseCache(os.path.join(folder, 'cache', 'gogulong_cache.sqlite'))
+    checkpoint.CHECKPOINT_DIR = os.path.join(folder, 'checkpoints')
+    try:
+        yield os.path.join(folder, 'metrics.json')
+    finally:
+        gogulong_scraper.cache, checkpoint.CHECKPOINT_DIR = original_cache, original_dir
+
+def run_scale(scale : float,
+              latency : float = 0.0,
+              paced : bool = False,
+              seed : int = 0) -> dict:
+    '''
+    Runs main_price_scraper.main once against a replay archive at scale
+    '''
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'archive.jsonl.gz')
+        counts = make_archive(path, scale, seed)
+
+        # cold start: no memoized cleaning (the response cache is empty and
+        # not used while replaying)
+        cleaner_functions.clear_memo_caches()
+        rate_limiter.LIMITER.reset()
+        if not paced:
+            # scrapers pass their own initial rates, which min_rate overrides
+            limiter = rate_limiter.LIMITER
+            limiter.initial_rate = limiter.min_rate = limiter.max_rate = 1000.0
+
+        recorder = StageRecorder()
+        with replay.ReplayServer(path, latency = latency) as server, \
+             isolated_state(tmp) as metrics_path, instrument(recorder, tmp):
+            recorder.start()
+            wall, cpu = time.perf_counter(), time.process_time()
+            try:
+                main_price_scraper.main(save = True,
+                                        platform = 'gsheet',
+                                        concurrent = True,
+                                        replay_url = server.url,
+                                        metrics_path = metrics_path)
+            finally:
+                wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+                recorder.stop()
+                replay.set_target(None)
+            hits = server.stats()['hits']
+
+    stages = {}
+    for name, stage in recorder.stages.items():
+        source = name.split('_')[-1]
+        pages = hits.get(HOSTS[source], 0) if name.startswith('scrape_') else None
+        stages[name] = {'calls' : stage['calls'],
+                        'wall_secs' : round(stage['wall_secs'], 3),
+                        'cpu_secs' : round(stage['cpu_secs'], 3),
+                        'peak_rss_mb' : round(stage['peak_rss'] / 2**20, 1),
+                        'items' : stage['items'],
+                        'items_per_sec' : round(stage['items'] / max(stage['wall_secs'], 1e-9), 1),
+                        'pages' : pages,
+                        'pages_per_sec' : None if pages is None else round(pages / max(stage['wall_secs'], 1e-9), 1)}
+
+    return {'scale' : scale,
+            'fixtures' : counts,
+            'wall_secs' : round(wall, 3),
+            'cpu_secs' : round(cpu, 3),
+            'peak_rss_mb' : round(recorder.peak_rss / 2**20, 1),
+            'requests' : hits,
+            'stages' : stages}
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output = True,
+                              text = True, check = True).stdout.strip()
+    except:
+        return 'unknown'
+
+def compare(old : dict,
+            new : dict,
+            threshold : float = 0.2) -> list:
+    '''
+    Stages whose wall time grew by more than threshold (fraction) between
+    two result files, per scale
+
+    DOCTESTS:
+    >>> old = {'runs' : [{'scale' : 1, 'stages' : {'intersection' : {'wall_secs' : 1.0}}}]}
+    >>> new = {'runs' : [{'scale' : 1, 'stages' : {'intersection' : {'wall_secs' : 1.5}}}]}
+    >>> compare(old, new)
+    [(1, 'intersection', 1.0, 1.5)]
+    '''
+    old_runs = {run['scale'] : run['stages'] for run in old['runs']}
+    slower = []
+    for run in new['runs']:
+        for name, stage in run['stages'].items():
+            before = old_runs.get(run['scale'], {}).get(name)
+            if (before is not None) and (stage['wall_secs'] > before['wall_secs'] * (1 + threshold)):
+                slower.append((run['scale'], name, before['wall_secs'], stage['wall_secs']))
+    return slower
+
+def run(scales : list = [1, 5, 20],
+        latency : float = 0.0,
+        paced : bool = False,
+        output : str = None) -> dict:
+    # one process per scale so memory of a run does not carry over
+    context = multiprocessing.get_context('spawn')
+    runs = []
+    for scale in scales:
+        with context.Pool(1) as pool:
+            runs.append(pool.apply(run_scale, (scale, latency, paced)))
+
+    results = {'commit' : git_commit(),
+               'date' : dt.now().strftime('%Y-%m-%d %H:%M:%S'),
+               'latency' : latency,
+               'paced' : paced,
+               'runs' : runs}
+
+    output = output or os.path.join('benchmarks', 'results', f'pipeline_{results["commit"]}.json')
+    os.makedirs(os.path.dirname(output) or '.', exist_ok = True)
+    with open(output, 'w') as f:
+        json.dump(results, f, indent = 2)
+
+    for r in runs:
+        print(f"{r['scale']}x: {r['wall_secs']:.2f}s wall, {r['cpu_secs']:.2f}s CPU, peak RSS {r['peak_rss_mb']} MB")
+        for name, stage in r['stages'].items():
+            pages = f", {stage['pages_per_sec']} pages/s" if stage['pages'] is not None else ''
+            print(f"  {name:>22}: {stage['wall_secs']:8.3f}s, {stage['items_per_sec']} items/s{pages}")
+    print(f'Saved to {output}')
+    return results
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--scales', type = float, nargs = '+', default = [1, 5, 20])
+    parser.add_argument('--latency', type = float, default = 0.0,
+                        help = 'seconds added to each replayed response')
+    parser.add_argument('--paced', action = 'store_true',
+                        help = 'keep the rate limiter production rates')
+    parser.add_argument('--output', default = None)
+    parser.add_argument('--compare', default = None,
+                        help = 'earlier results file to check for slower stages')
+    args = parser.parse_args()
+
+    results = run([int(s) if s.is_integer() else s for s in args.scales],
+                  args.latency, args.paced, args.output)
+    if args.compare:
+        with open(args.compare) as f:
+            for scale, name, before, after in compare(json.load(f), results):
+                print(f'Slower at {scale}x: {name} {before:.3f}s -> {after:.3f}s')
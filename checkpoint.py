@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 10:41:07 2026
+
+@author: carlo
+"""
+
+import os
+import json
+import threading
+from datetime import datetime as dt
+
+from base_logger import logger
+
+# folder of the default journal files
+CHECKPOINT_DIR = 'checkpoints'
+
+def _to_builtin(obj):
+    '''
+    Converts numpy scalars (e.g. from DataFrame.to_dict) to python types
+    '''
+    try:
+        return obj.item()
+    except AttributeError:
+        return str(obj)
+
+class CheckpointStore:
+    '''
+    Append-only journal of completed scraping units (pages or tire specs)
+    and their raw records. A resumed run skips units already in the journal
+    and rebuilds its results from the stored records.
+
+    Parameters
+    ----------
+        - source : str
+            scraper name (gogulong, tiremanila, partspro)
+        - resume : bool, default False
+            load existing journal; otherwise start a new one
+        - path : str, optional
+            journal file. Defaults to <CHECKPOINT_DIR>/<source>_<date>.jsonl
+
+    '''
+    def __init__(self,
+                 source : str,
+                 resume : bool = False,
+                 path : str = None):
+        self.source = source
+        self.path = path if path is not None else os.path.join(CHECKPOINT_DIR,
+                    f"{source}_{dt.today().date().strftime('%Y-%m-%d')}.jsonl")
+        self.completed = {}
+        # units may complete concurrently (e.g. pages from a driver pool)
+        self._lock = threading.Lock()
+
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok = True)
+
+        if resume:
+            self._load()
+            logger.info(f'Resuming {source} from checkpoint with {len(self.completed)} completed units.')
+        elif os.path.exists(self.path):
+            os.remove(self.path)
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+
+        valid_bytes = 0
+        with open(self.path, 'rb') as journal:
+            for line in journal:
+                # partially written line from a crash
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    entry = json.loads(line)
+                    self.completed[entry['unit']] = entry['records']
+                except:
+                    pass
+                valid_bytes += len(line)
+
+        # drop incomplete tail so new entries start on a fresh line
+        with open(self.path, 'ab') as journal:
+            journal.truncate(valid_bytes)
+
+    def is_done(self, unit) -> bool:
+        return str(unit) in self.completed
+
+    def get(self, unit) -> list:
+        return self.completed[str(unit)]
+
+    def add(self, unit, records : list):
+        '''
+        Appends completed unit and its records to the journal
+        '''
+        line = json.dumps({'unit' : str(unit),
+                           'records' : records},
+                          default = _to_builtin) + '\n'
+        with self._lock:
+            self.completed[str(unit)] = records
+            with open(self.path, 'a') as journal:
+                journal.write(line)
+                journal.flush()
+                os.fsync(journal.fileno())
+
+    def records(self) -> list:
+        '''
+        All stored records in journal order
+        '''
+        return [r for unit_records in self.completed.values() for r in unit_records]
@@ -7,9 +7,186 @@ Created on Fri Feb 16 09:46:11 2024
 import pandas as pd
 import numpy as np
 import re
+import os
+import csv
+import threading
+import functools
 from decimal import Decimal
 from fuzzywuzzy import process, fuzz
 
+from reference_catalog import ReferenceCatalog
+from string_matcher import AhoCorasick
+from tire_size import ASPECT_RATIO_ERRORS, TireSize, tokenize, render_sku, render_match
+
+# --- memoization -----------------------------------------------------------
+
+class LRUMemo:
+    '''
+    Bounded LRU cache of one cleaner's results (functools.lru_cache, typed
+    since e.g. 15, 15.0 and True compare equal) with hit, miss, eviction and
+    bypass (NaN or unhashable arguments) counters
+    
+    Parameters
+    ----------
+        - func : function
+            cleaner to cache
+        - maxsize : int, default 4096
+            maximum number of cached results
+    
+    '''
+    def __init__(self, func, maxsize : int = 4096):
+        self.func = func
+        self.lock = threading.Lock()
+        self.bypassed = 0
+        self.resize(maxsize)
+    
+    def resize(self, maxsize : int):
+        '''
+        Sets maxsize; drops cached results and counters if it changes
+        '''
+        if getattr(self, 'maxsize', None) != maxsize:
+            self.maxsize = maxsize
+            self.cached = functools.lru_cache(maxsize = maxsize, typed = True)(self.func)
+            self.bypassed = 0
+    
+    def bypass(self, *args, **kwargs):
+        with self.lock:
+            self.bypassed += 1
+        return self.func(*args, **kwargs)
+    
+    def stats(self) -> dict:
+        info = self.cached.cache_info()
+        calls = info.hits + info.misses
+        return {'hits' : info.hits,
+                'misses' : info.misses,
+                # each miss adds an entry
+                'evictions' : info.misses - info.currsize,
+                'bypassed' : self.bypassed,
+                'entries' : info.currsize,
+                'hit_ratio' : round(info.hits / calls, 4) if calls else 0.0}
+    
+    def clear(self):
+        self.cached.cache_clear()
+        with self.lock:
+            self.bypassed = 0
+
+# function name -> LRUMemo of each memoized cleaner
+MEMO_CACHES = {}
+_memo_enabled = False
+
+def memoized(func):
+    '''
+    Decorator adding an opt-in LRU cache to a pure cleaner. Calls go straight
+    to func unless enabled by enable_memoization. Only worth it for cleaners
+    costing well over a cache lookup (about 0.3 us).
+    '''
+    memo = MEMO_CACHES[func.__name__] = LRUMemo(func)
+    
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _memo_enabled:
+            return func(*args, **kwargs)
+        
+        # NaN never equals itself, so each NaN would be a new entry
+        for a in args:
+            if (a != a) if isinstance(a, float) else False:
+                return memo.bypass(*args, **kwargs)
+        try:
+            result = memo.cached(*args, **kwargs)
+        except TypeError:
+            # unhashable arguments
+            return memo.bypass(*args, **kwargs)
+        # callers may modify returned lists
+        return list(result) if type(result) is list else result
+    
+    wrapper.memo = memo
+    return wrapper
+
+def enable_memoization(maxsize : int = 4096):
+    '''
+    Turns on result caching of memoized cleaners (clean_tire_size, clean_specs,
+    clean_price, clean_year, clean_model), each bounded to maxsize entries
+    
+    DOCTESTS:
+    >>> enable_memoization(maxsize = 2)
+    >>> [clean_year(y) for y in ['22', '22', "'19", float('nan')]]
+    ['2022', '2022', '2019', nan]
+    >>> stats = get_memo_stats()['clean_year']
+    >>> stats['hits'], stats['misses'], stats['bypassed']
+    (1, 2, 1)
+    >>> disable_memoization()
+    '''
+    global _memo_enabled
+    for memo in MEMO_CACHES.values():
+        memo.resize(maxsize)
+    _memo_enabled = True
+
+def disable_memoization():
+    '''
+    Turns off result caching and drops cached results and counters
+    '''
+    global _memo_enabled
+    _memo_enabled = False
+    clear_memo_caches()
+
+def clear_memo_caches():
+    '''
+    Drops cached results and resets counters (e.g. between runs)
+    '''
+    for memo in MEMO_CACHES.values():
+        memo.clear()
+
+def get_memo_stats() -> dict:
+    return {name : memo.stats() for name, memo in MEMO_CACHES.items()}
+
+# alias -> model name table used by fix_names (first matching alias wins)
+NAME_ALIASES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 
+                                 'name_aliases.csv')
+
+def load_name_aliases(path : str = NAME_ALIASES_PATH) -> dict:
+    '''
+    Load alias table (alias, name, brand) in table order
+    
+    Returns
+    -------
+        - aliases : dict
+            alias substring -> replacement name (all caps)
+    '''
+    with open(path, newline = '', encoding = 'utf-8') as f:
+        return {row['alias'] : row['name'] for row in csv.DictReader(f)}
+
+class NameAliasMatcher:
+    '''
+    Alias table compiled once into a single automaton. Aliases are literal
+    substrings; if several are found, the one listed first in the table wins.
+    
+    DOCTESTS:
+    >>> aliases = NameAliasMatcher({'OPAT2': 'OPEN COUNTRY AT 2', 'OPAT': 'OPEN COUNTRY AT'})
+    >>> aliases.match('TOYO OPAT2 LT')
+    'OPEN COUNTRY AT 2'
+    >>> aliases.match('OPMT') is None
+    True
+    '''
+    def __init__(self, aliases : dict):
+        self.aliases = list(aliases.keys())
+        self.names = list(aliases.values())
+        self.matcher = AhoCorasick(self.aliases)
+    
+    def match(self, raw_name : str):
+        ndx = self.matcher.first(raw_name)
+        return None if ndx is None else self.names[ndx]
+
+_name_aliases = None
+
+def get_name_aliases() -> NameAliasMatcher:
+    '''
+    Shared alias matcher, compiled on first use
+    '''
+    global _name_aliases
+    if _name_aliases is None:
+        _name_aliases = NameAliasMatcher(load_name_aliases())
+    return _name_aliases
+
 def fix_names(sku_name, comp=None):
     '''
     Fix product names to match competitor names
@@ -18,7 +195,7 @@ def fix_names(sku_name, comp=None):
     ----------
     sku_name: str
         input SKU name string
-    comp: list (optional)
+    comp: list or ReferenceCatalog (optional)
         optional list of model names to compare with
     
     Returns
@@ -27,69 +204,6 @@ def fix_names(sku_name, comp=None):
         fixed names as UPPERCASE
     '''
     
-    # replacement should be all caps
-    change_name_dict = {'TRANSIT.*ARZ.?6-X' : 'TRANSITO ARZ6-X', #ARIVO
-                        'TRANSIT.*ARZ.?6-A' : 'TRANSITO ARZ6-A', #ARIVO
-                        'TRANSIT.*ARZ.?6-M' : 'TRANSITO ARZ6-M', #ARIVO
-                        'OPA25': 'OPEN COUNTRY A25', # TOYO
-                        'OPA28': 'OPEN COUNTRY A28', # TOYO
-                        'OPA32': 'OPEN COUNTRY A32', # TOYO
-                        'OPA33': 'OPEN COUNTRY A33', # TOYO
-                        'OPAT\+': 'OPEN COUNTRY AT PLUS',# TOYO
-                        'OPAT2': 'OPEN COUNTRY AT 2', # TOYO
-                        'OPMT2': 'OPEN COUNTRY MT 2', # TOYO
-                        'OPAT OPMT': 'OPEN COUNTRY AT', # TOYO
-                        'OPAT': 'OPEN COUNTRY AT', # TOYO
-                        'OPMT': 'OPEN COUNTRY MT', # TOYO
-                        'OPRT': 'OPEN COUNTRY RT', # TOYO
-                        'OPUT': 'OPEN COUNTRY UT', # TOYO
-                        'DC -80': 'DC-80', #DOUBLECOIN
-                        'DC -80+': 'DC-80+', #DOUBLECOIN
-                        'KM3': 'MUD-TERRAIN T/A KM3', # BFGOODRICH
-                        'KO2': 'ALL-TERRAIN T/A KO2', # BFGOODRICH
-                        'TRAIL-TERRAIN T/A' : 'TRAIL-TERRAIN', # BFGOODRICH
-                        '265/70/R16 GEOLANDAR 112S': 'GEOLANDAR A/T G015',
-                        '265/65/R17 GEOLANDAR 112S' : 'GEOLANDAR A/T G015',
-                        '265/65/R17 GEOLANDAR 112H' : 'GEOLANDAR G902',
-                        'GEOLANDAR A/T 102S': 'GEOLANDAR A/T-S G012',
-                        'GEOLANDAR A/T': 'GEOLANDAR A/T G015',
-                        'ASSURACE MAXGUARD SUV': 'ASSURANCE MAXGUARD SUV', #GOODYEAR
-                        'EFFICIENTGRIP SUV': 'EFFICIENTGRIP SUV', #GOODYEAR
-                        'EFFICIENGRIP PERFORMANCE SUV':'EFFICIENTGRIP PERFORMANCE SUV', #GOODYEAR
-                        'WRANGLE DURATRAC': 'WRANGLER DURATRAC', #GOODYEAR
-                        'WRANGLE AT ADVENTURE': 'WRANGLER AT ADVENTURE', #GOODYEAR
-                        'WRANGLER AT ADVENTURE': 'WRANGLER AT ADVENTURE', #GOODYEAR
-                        'WRANGLER AT SILENT TRAC': 'WRANGLER AT SILENTTRAC', #GOODYEAR
-                        'ENASAVE EC300+': 'ENSAVE EC300 PLUS', #DUNLOP
-                        'SAHARA AT2' : 'SAHARA AT 2',
-                        'SAHARA MT2' : 'SAHARA MT 2',
-                        'POTENZA RE003 ADREANALIN': 'POTENZA RE003 ADRENALIN', #BRIDGESTONE
-                        'POTENZA RE004': 'POTENZA RE004', #BRIDGESTONE
-                        'SPORT MAXX 050' : 'SPORT MAXX 050', #DUNLOP
-                        'DUELER H/T 470': 'DUELER H/T 470', # BRIDGESTONE
-                        'DUELER H/T 687': 'DUELER H/T 687 RBT', # BRIDGESTONE
-                        'DUELER A/T 697': 'DUELER A/T 697', # BRIDGESTONE
-                        'DUELER A/T 693': 'DUELER A/T 693 RBT', # BRIDGESTONE
-                        'DUELER H/T 840' : 'DUELER H/T 840 RBT', # BRIDGESTONE
-                        'EVOLUTION MT': 'EVOLUTION M/T', #COOPER
-                        'BLUEARTH AE61' : 'BLUEARTH XT AE61', #YOKOHAMA
-                        'BLUEARTH ES32' : 'BLUEARTH ES ES32', #YOKOHAMA
-                        'BLUEARTH AE51': 'BLUEARTH GT AE51', #YOKOHAMA
-                        'COOPER STT PRO': 'STT PRO',
-                        'COOPER AT3 LT' : 'AT3 LT',
-                        'COOPER AT3 XLT' : 'AT3 XLT',
-                        'A/T3' : 'AT3',
-                        'ENERGY XM2+' : 'ENERGY XM2+',
-                        'ENERGY XM2' : 'ENERGY XM2',
-                        'ENERGY XM+' : 'ENERGY XM2+',
-                        'XM2+' : 'ENERGY XM2+',
-                        'AT3 XLT': 'AT3 XLT',
-                        'ADVANTAGE T/A DRIVE' : 'ADVANTAGE T/A DRIVE',
-                        'ADVANTAGE T/A SUV' : 'ADVANTAGE T/A SUV',
-                        'AGILIS 3' :' AGILIS 3',
-                        'PRIMACY 4 ST' : 'PRIMACY 4 ST'
-                        }
-    
     if pd.isna(sku_name) or (sku_name is None):
         return np.nan
     
@@ -97,15 +211,18 @@ def fix_names(sku_name, comp=None):
         # uppercase and remove double spaces
         raw_name = re.sub('  ', ' ', sku_name).upper().strip()
         # specific cases
-        for key in change_name_dict.keys():
-            if re.search(re.escape(key), raw_name):
-                return change_name_dict[key]
-            else:
-                continue
+        alias = get_name_aliases().match(raw_name)
+        if alias is not None:
+            return alias
         
         # if match list provided
         
         if comp is not None:
+            # single pass over sku name with catalog's multi-pattern matcher
+            if isinstance(comp, ReferenceCatalog):
+                long_match = comp.longest_model(raw_name)
+                return raw_name if long_match is None else long_match
+            
             # check if any name from list matches anything in sku name
             match_list = [n for n in comp if re.search(n, raw_name)]
             # exact match from list
@@ -124,6 +241,109 @@ def fix_names(sku_name, comp=None):
         else:
             return raw_name
 
+def fix_names_series(names : pd.Series, comp = None) -> pd.Series:
+    '''
+    Bulk version of fix_names for a whole column; each distinct name is
+    fixed once and mapped back to the rows
+    
+    Parameters
+    ----------
+    names: pd.Series
+        input SKU/model names
+    comp: list or ReferenceCatalog (optional)
+        optional list of model names to compare with
+    
+    Returns
+    -------
+    pd.Series
+        fixed names with same index as names
+    '''
+    return map_unique(fix_names, names, comp = comp)
+
+# per-cleaner counters of map_unique: rows seen and distinct inputs cleaned
+MAP_STATS = {}
+_map_stats_lock = threading.Lock()
+
+def _factorize_column(col : pd.Series) -> np.ndarray:
+    '''
+    Integer codes of column values; NaN is a value of its own and, for object
+    columns, values of different types (e.g. 15 and 15.0) get different codes
+    '''
+    codes, uniques = pd.factorize(col, use_na_sentinel = False)
+    if col.dtype == object:
+        type_codes, type_uniques = pd.factorize(np.array([type(v) for v in col], 
+                                                         dtype = object))
+        if len(type_uniques) > 1:
+            codes = codes * len(type_uniques) + type_codes
+    return codes
+
+def map_unique(func, *columns : pd.Series, name : str = None, **kwargs) -> pd.Series:
+    '''
+    Applies func once per distinct tuple of column values and broadcasts the
+    results back to all rows. Same result as a row-wise apply of 
+    func(*row_values, **kwargs) for pure cleaners.
+    
+    Parameters
+    ----------
+    func : function
+        cleaner taking one argument per column
+    *columns : pd.Series
+        input columns of equal length (result takes index of first column)
+    name : str, optional
+        key in MAP_STATS; defaults to func.__name__
+    **kwargs
+        passed to every call of func
+    
+    Returns
+    -------
+    pd.Series
+        object series of func results
+    
+    DOCTESTS:
+    >>> map_unique(clean_width, pd.Series(['225', '225.0', '7.5', '225'])).tolist()
+    ['225', '225', '7.5', '225']
+    >>> MAP_STATS['clean_width']['calls']
+    3
+    '''
+    index = columns[0].index
+    n_rows = len(index)
+    
+    # combine per-column codes into one code per distinct row tuple
+    codes = np.zeros(n_rows, dtype = np.int64)
+    for col in columns:
+        col_codes = _factorize_column(col)
+        codes = codes * (col_codes.max() + 1 if n_rows else 1) + col_codes
+        codes = pd.factorize(codes)[0]
+    
+    # first row of each distinct tuple, in code order
+    _, first_rows = np.unique(codes, return_index = True)
+    args = zip(*[np.asarray(col, dtype = object)[first_rows] for col in columns])
+    
+    results = np.empty(len(first_rows), dtype = object)
+    for ndx, arg in enumerate(args):
+        results[ndx] = func(*arg, **kwargs)
+    
+    key = func.__name__ if name is None else name
+    with _map_stats_lock:
+        stats = MAP_STATS.setdefault(key, {'rows' : 0, 'calls' : 0})
+        stats['rows'] += n_rows
+        stats['calls'] += len(first_rows)
+    
+    return pd.Series(results[codes], index = index, name = columns[0].name)
+
+def get_map_stats() -> dict:
+    '''
+    map_unique counters per cleaner with hit ratio (share of rows served
+    from an already cleaned input)
+    '''
+    with _map_stats_lock:
+        return {k : {**v, 'hit_ratio' : round(1 - v['calls'] / v['rows'], 4) if v['rows'] else 0.0}
+                for k, v in MAP_STATS.items()}
+
+def reset_map_stats():
+    with _map_stats_lock:
+        MAP_STATS.clear()
+
 def combine_specs(w, ar, d, mode = 'SKU'):
     '''
     
@@ -156,20 +376,10 @@ def combine_specs(w, ar, d, mode = 'SKU'):
     '''
     
     if mode == 'SKU':
-        d = d if 'R' in d else 'R' + d 
-        if ar != 'R':
-            if '.' in ar:
-                return w + 'X' + ar + '/' + d
-            else:
-                return '/'.join([w, ar, d])
-        else:
-            return w + '/' + d
+        return render_sku(w, ar, d)
             
     elif mode == 'MATCH':
-        w = ''.join(re.findall('[0-9]|\.', str(w)))
-        ar = ''.join(re.findall('[0-9]|\.|R', str(ar)))
-        d = ''.join(re.findall('[0-9]|\.', str(d)))
-        return '/'.join([w, ar, d])
+        return render_match(w, ar, d)
 
     else:
         combine_specs(str(w), str(ar), str(d), mode = 'SKU')
@@ -273,12 +483,7 @@ def clean_aspect_ratio(ar, model = None):
     'R'
     
     '''
-    error_ar = {'.5' : '9.5',
-                '0.': '10.5',
-                '2.': '12.5',
-                '3.': '13.5',
-                '5.': '15.5',
-                '70.5': '10.5'}
+    error_ar = ASPECT_RATIO_ERRORS
 
     if pd.notna(ar):
         ar = re.sub('/', '', str(ar)).strip()
@@ -443,10 +648,20 @@ def combine_sku(make, w, ar, d, model, load, speed):
             SKU = SKU + ' ' + load + speed
         return SKU
 
+@memoized
 def clean_tire_size(s : str) -> tuple:
     '''
     Extracts width, aspect ratio, and diameter information from tire size string
+    
+    >>> clean_tire_size('LT235/75R15C')
+    ('235', '75', 'R15C')
     '''
+    m = tokenize(s)
+    # standard sizes are read from a single match
+    if (m is not None) and (m['sep'] is not None) and (m['construction'] == 'R') \
+        and (m['width'][0] in '1234') and (len(m['width']) == 2 or m['width'][2] == '5'):
+        return TireSize.from_tokens(m).astuple()
+    
     #s = re.search('[0-9]+(X|/)[0-9]+(.)?([0-9]+)?(\s+)?[A-Z]+(\s+)?(\/)?[0-9]+([A-Z]+)?', s)
     tire_pattern = re.compile('([1-4][0-9]5|[1-4]([0-9]|[0-9]?((\.)[05]{1,2})))(X|\/|\-|\s)([0-9]+\.?([0-9]+)?)?(\s+)?([RZ]+)?(\s+)?(\/)?[0-9]+(\.?[0-9]+)?([A-Z]+)?')
     s = re.search(tire_pattern, s)
@@ -466,6 +681,7 @@ def clean_tire_size(s : str) -> tuple:
     
     return w, ar, d
 
+@memoized
 def clean_specs(x):
     '''
     Extracts cleaned tire specs information from product title
@@ -475,6 +691,13 @@ def clean_specs(x):
     else:
         # baseline correction
         x = x.upper().strip()
+        # standard sizes are read from a single match
+        if (m := tokenize(x)) is not None:
+            if m['sep'] is None:
+                return ['']*3
+            ar = m['aspect_ratio']
+            return [m['width'], format(float(ar), '.2f') if '.' in ar else ar, m['diameter']]
+        
         if ((match := re.search('[0-9]+(X|/)[0-9]+(.)?([0-9]+)?(\s+)?(\/)?[A-Z]+(\s+)?[0-9]+([A-Z]+)?', x)) is not None):
             specs =  [num[0] for n in re.split('X|Z?R|/', match[0]) if (num := re.search('[0-9]+(.)?[0-9]+', n.strip())) is not None]
             if '.' in specs[1]:
@@ -484,6 +707,7 @@ def clean_specs(x):
         else:
             return ['']*3
 
+@memoized
 def clean_price(x : str) -> str:
     '''
     Cleans price string values from scraped entries
@@ -527,7 +751,8 @@ def clean_makes(x : str,
     #     return match
     # else:
     #     return x.split(' ')[0]
-    match = process.extractOne(x, ref.brand.unique())
+    brands = ref.brands if isinstance(ref, ReferenceCatalog) else ref.brand.unique()
+    match = process.extractOne(x, brands)
     if match:
         return match[0]
     else:
@@ -562,6 +787,7 @@ def clean_make(x, makes, model = None):
         # if input is NaN
         return np.nan
 
+@memoized
 def clean_model(x : str, 
                 ref : None):
     '''
@@ -595,6 +821,7 @@ def clean_model(x : str,
             
         return x
     
+@memoized
 def clean_year(y : str or int) -> [np.nan, str]:
     '''
     Cleans input year to resolve out of range values
@@ -620,4 +847,145 @@ def clean_year(y : str or int) -> [np.nan, str]:
         else:
             result = np.nan
     
-    return result
\ No newline at end of file
+    return result
+
+# --- vectorized cleaners ---------------------------------------------------
+# Series versions of the scalar cleaners above which produce identical values.
+# Common formats are parsed with str.extract (named groups); values outside
+# the fast-path formats are passed to the scalar cleaner.
+
+def _normalize_number(int_part : pd.Series, 
+                      frac_part : pd.Series) -> pd.Series:
+    '''
+    Vectorized str(remove_trailing_zero(Decimal(int_part.frac_part)))
+    for plain digit strings
+    '''
+    int_part = int_part.str.lstrip('0').replace('', '0')
+    frac_part = frac_part.fillna('').str.rstrip('0')
+    return int_part.where(frac_part == '', int_part + '.' + frac_part)
+
+def _decimal_safe(int_part : pd.Series, 
+                  frac_part : pd.Series) -> pd.Series:
+    '''
+    Rows where _normalize_number matches Decimal formatting (no exponent
+    notation or context rounding)
+    '''
+    return (int_part.str.len() <= 15) & (frac_part.fillna('').str.len() <= 6)
+
+def clean_width_series(w : pd.Series) -> pd.Series:
+    '''
+    Vectorized clean_width (without model fallback)
+    '''
+    s = w.astype(str).str.strip().str.upper()
+    parts = s.str.extract(r'^(?P<prefix>[A-Z]*)(?P<int>[0-9]+)(?:\.(?P<frac>[0-9]*))?$')
+    fast = w.notna() & parts['int'].notna() & _decimal_safe(parts['int'], parts['frac'])
+    
+    result = pd.Series(np.nan, index = w.index, dtype = object)
+    result[fast] = parts['prefix'][fast] + _normalize_number(parts['int'][fast], 
+                                                             parts['frac'][fast])
+    slow = w.notna() & ~fast
+    if slow.any():
+        result[slow] = w[slow].map(clean_width)
+    
+    return result
+
+def clean_aspect_ratio_series(ar : pd.Series) -> pd.Series:
+    '''
+    Vectorized clean_aspect_ratio (without model fallback)
+    '''
+    s = ar.astype(str).str.replace('/', '', regex = False).str.strip()
+    
+    # same rule order as clean_aspect_ratio
+    rules = [(ar.isna(), 'R'),
+             (s.isin(['0', 'R1', '/', 'R']), 'R'),
+             (s.isin(ASPECT_RATIO_ERRORS.keys()), s.map(ASPECT_RATIO_ERRORS)),
+             (s.str.isnumeric(), s),
+             (s.str.isalnum(), s.str.replace('[^0-9]', '', regex = True)),
+             (s.str.contains('.', regex = False), s.str.rstrip('0'))]
+    
+    result = pd.Series(np.nan, index = ar.index, dtype = object)
+    remaining = pd.Series(True, index = ar.index)
+    for mask, value in rules:
+        mask = mask & remaining
+        result[mask] = value[mask] if isinstance(value, pd.Series) else value
+        remaining &= ~mask
+    
+    return result
+
+def clean_diameter_series(d : pd.Series) -> pd.Series:
+    '''
+    Vectorized clean_diameter
+    '''
+    s = d.astype(str).str.strip().str.upper()
+    # same pattern as clean_diameter split into named groups
+    parts = s.str.extract(r'(?P<int>[0-9]+)(?P<sep>.?)(?P<frac>[0-9]*)(?P<suffix>[A-Z]*)')
+    
+    is_dot = parts['sep'] == '.'
+    # separator other than '.' is part of the suffix (e.g. '16C', '17 LT')
+    no_frac = (parts['frac'] == '') & ~is_dot
+    fast = d.notna() & parts['int'].notna() & (is_dot | no_frac) & \
+        _decimal_safe(parts['int'], parts['frac'])
+    
+    frac = parts['frac'].where(is_dot, '')
+    suffix = parts['suffix'].where(is_dot, parts['sep'] + parts['suffix'])
+    
+    # no size found in input returns None like clean_diameter
+    result = pd.Series(np.nan, index = d.index, dtype = object)
+    result[d.notna() & parts['int'].isna()] = None
+    result[fast] = 'R' + _normalize_number(parts['int'][fast], frac[fast]) + suffix[fast]
+    
+    slow = d.notna() & parts['int'].notna() & ~fast
+    if slow.any():
+        result[slow] = d[slow].map(clean_diameter)
+    
+    return result
+
+def combine_specs_series(w : pd.Series, 
+                         ar : pd.Series, 
+                         d : pd.Series, 
+                         mode : str = 'SKU') -> pd.Series:
+    '''
+    Vectorized combine_specs
+    '''
+    if mode == 'MATCH':
+        w = w.astype(str).str.replace(r'[^0-9.]', '', regex = True)
+        ar = ar.astype(str).str.replace(r'[^0-9.R]', '', regex = True)
+        d = d.astype(str).str.replace(r'[^0-9.]', '', regex = True)
+        return w + '/' + ar + '/' + d
+    
+    is_str = w.map(type).eq(str) & ar.map(type).eq(str) & d.map(type).eq(str)
+    
+    result = pd.Series(None, index = w.index, dtype = object)
+    if not is_str.all():
+        # non-string values keep the scalar behavior
+        result[~is_str] = [combine_specs(*x, mode = mode) for x in 
+                           zip(w[~is_str], ar[~is_str], d[~is_str])]
+    
+    w, ar, d = w[is_str], ar[is_str], d[is_str]
+    d = d.where(d.str.contains('R', regex = False), 'R' + d)
+    no_ar = ar == 'R'
+    decimal_ar = ar.str.contains('.', regex = False)
+    specs = (w + '/' + ar + '/' + d).where(~decimal_ar, w + 'X' + ar + '/' + d)
+    result[is_str] = specs.where(~no_ar, w + '/' + d)
+    
+    return result
+
+def combine_sku_series(make : pd.Series, 
+                       w : pd.Series, 
+                       ar : pd.Series, 
+                       d : pd.Series, 
+                       model : pd.Series, 
+                       load : pd.Series = None, 
+                       speed : pd.Series = None) -> pd.Series:
+    '''
+    Vectorized combine_sku for string columns. load/speed may be omitted
+    (no load-speed index appended).
+    '''
+    sku = make + ' ' + combine_specs_series(w, ar, d, mode = 'SKU') + ' ' + model
+    
+    if (load is None) or (speed is None):
+        return sku
+    
+    empty = ['nan', '-', '']
+    has_index = ~load.isin(empty) & ~speed.isin(empty) & load.notna() & speed.notna()
+    return sku.where(~has_index, sku + ' ' + load + speed)
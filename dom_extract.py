@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 19:48:10 2026
+
+@author: carlo
+"""
+
+# XPath helpers evaluated inside the browser, so a whole page is read with
+# one execute_script call instead of one WebDriver call per element
+
+_JS_HELPERS = '''
+const nodes = (xpath, ctx) => {
+    const snap = document.evaluate(xpath, ctx || document, null,
+                                   XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    const found = [];
+    for (let i = 0; i < snap.snapshotLength; i++) {
+        found.push(snap.snapshotItem(i));
+    }
+    return found;
+};
+const text = (node) => {
+    if (!node) {
+        return null;
+    }
+    if (node.nodeType === Node.ATTRIBUTE_NODE) {
+        return node.value;
+    }
+    // same lines as WebElement.text: trimmed, without blank lines
+    return (node.innerText || '').split('\\n')
+        .map((line) => line.trim())
+        .filter((line) => line.length)
+        .join('\\n');
+};
+'''
+
+EXTRACT_TEXTS_JS = _JS_HELPERS + '''
+const xpaths = arguments[0];
+const result = {};
+for (const key in xpaths) {
+    result[key] = nodes(xpaths[key]).map(text);
+}
+return result;
+'''
+
+EXTRACT_TILES_JS = _JS_HELPERS + '''
+const [tileXpath, fields] = arguments;
+return nodes(tileXpath).map((tile) => {
+    const record = {};
+    for (const key in fields) {
+        record[key] = text(nodes(fields[key], tile)[0]);
+    }
+    return record;
+});
+'''
+
+def extract_texts(driver, xpaths : dict) -> dict:
+    '''
+    Text of all elements matching each xpath, in one browser round trip
+
+    Parameters
+    ----------
+        - driver : selenium
+            Chrome driver with the page loaded
+        - xpaths : dict
+            absolute xpath of each key
+
+    Returns
+    -------
+        - texts : dict
+            list of element texts (same as WebElement.text) of each key
+    '''
+    return driver.execute_script(EXTRACT_TEXTS_JS, xpaths)
+
+def extract_tiles(driver,
+                  tile_xpath : str,
+                  fields : dict) -> list:
+    '''
+    Field texts of each product tile, in one browser round trip
+
+    Parameters
+    ----------
+        - driver : selenium
+            Chrome driver with the page loaded
+        - tile_xpath : str
+            absolute xpath of the product tiles
+        - fields : dict
+            xpath of each field relative to its tile (e.g. './/h3'); an
+            attribute xpath (e.g. '(.//img)[1]/@src') gives its value
+
+    Returns
+    -------
+        - tiles : list
+            dict of field texts for each tile in page order; None for fields
+            not found in the tile
+    '''
+    return driver.execute_script(EXTRACT_TILES_JS, tile_xpath, fields)
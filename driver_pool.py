@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 19:02:36 2026
+
+@author: carlo
+"""
+
+import functools
+import queue
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+import get_chromedriver
+import metrics
+from base_logger import logger
+
+class DriverPool:
+    '''
+    Pool of up to size headless Chrome drivers shared by scrapers. Drivers
+    are created on first use and reused until close.
+
+    Parameters
+    ----------
+        - size : int, default 4
+            maximum number of drivers
+        - factory : function, optional
+            creates a driver; defaults to get_chromedriver.create_driver
+        - profile : str, default 'default'
+            create_driver profile of the default factory (e.g. 'scrape')
+
+    '''
+    def __init__(self,
+                 size : int = 4,
+                 factory = None,
+                 profile : str = 'default'):
+        self.size = max(1, int(size))
+        self.factory = functools.partial(get_chromedriver.create_driver, profile = profile) \
+            if factory is None else factory
+        self._idle = queue.Queue()
+        self._drivers = []
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        '''
+        Idle driver, a new one if the pool is not full, otherwise waits for
+        a driver to be released
+        '''
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+
+            with self._lock:
+                create = len(self._drivers) < self.size
+                if create:
+                    # reserve slot while the driver starts
+                    self._drivers.append(None)
+            if create:
+                break
+
+            # recheck periodically in case a driver was discarded
+            try:
+                return self._idle.get(timeout = 1)
+            except queue.Empty:
+                continue
+
+        try:
+            driver = self.factory()
+        except:
+            with self._lock:
+                self._drivers.remove(None)
+            raise
+        with self._lock:
+            self._drivers[self._drivers.index(None)] = driver
+        return driver
+
+    def release(self, driver):
+        self._idle.put(driver)
+
+    def discard(self, driver):
+        '''
+        Quits a broken driver and frees its slot
+        '''
+        with self._lock:
+            if driver in self._drivers:
+                self._drivers.remove(driver)
+        try:
+            driver.quit()
+        except:
+            pass
+
+    @contextmanager
+    def driver(self):
+        driver = self.acquire()
+        try:
+            yield driver
+        except:
+            self.discard(driver)
+            raise
+        else:
+            self.release(driver)
+
+    def map_pages(self,
+                  scrape_page,
+                  pages : list) -> list:
+        '''
+        Runs scrape_page(driver, page) for all pages across the pool's drivers
+
+        Parameters
+        ----------
+            - scrape_page : function
+                takes a driver and page number, returns page results
+            - pages : list
+                page numbers
+
+        Returns
+        -------
+            - results : list
+                results in the order of pages; None for pages that raised
+        '''
+        # page spans and counters belong to the calling scraper
+        @metrics.bind
+        def run(page):
+            try:
+                with self.driver() as driver:
+                    return scrape_page(driver, page)
+            except Exception as e:
+                logger.warning(f'Page {page} failed: {repr(e)}')
+                return None
+
+        with ThreadPoolExecutor(max_workers = self.size) as executor:
+            return list(executor.map(run, pages))
+
+    def close(self):
+        '''
+        Quits all drivers
+        '''
+        with self._lock:
+            drivers = [d for d in self._drivers if d is not None]
+            self._drivers = []
+        self._idle = queue.Queue()
+        for driver in drivers:
+            try:
+                driver.quit()
+            except:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
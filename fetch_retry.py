@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 22:15:36 2026
+
+@author: carlo
+"""
+
+import asyncio
+import random
+import threading
+import time
+
+import metrics
+from base_logger import logger
+
+class CircuitOpen(Exception):
+    '''
+    Raised when a source's circuit breaker has tripped
+    '''
+    pass
+
+class CircuitBreaker:
+    '''
+    Trips after threshold consecutive failed fetch units of a source (e.g.
+    pages or tire specs); any success resets the count. Once tripped, the
+    rest of the crawl is skipped.
+
+    Parameters
+    ----------
+        - source : str
+        - threshold : int, default 15
+
+    DOCTESTS:
+    >>> breaker = CircuitBreaker('test', threshold = 2)
+    >>> breaker.record(False); breaker.record(True); breaker.record(False)
+    >>> breaker.is_open
+    False
+    >>> breaker.record(False)
+    >>> breaker.is_open
+    True
+    '''
+    def __init__(self,
+                 source : str,
+                 threshold : int = 15):
+        self.source = source
+        self.threshold = threshold
+        self.failures = 0
+        self.is_open = False
+        self._lock = threading.Lock()
+
+    def record(self, ok : bool):
+        with self._lock:
+            if self.is_open:
+                return
+            self.failures = 0 if ok else self.failures + 1
+            if self.failures >= self.threshold:
+                self.is_open = True
+                logger.error(f'{self.source}: {self.failures} consecutive failures, stopping crawl.')
+
+    def check(self):
+        '''
+        Raises CircuitOpen if the breaker has tripped
+        '''
+        if self.is_open:
+            raise CircuitOpen(f'Circuit open for {self.source}')
+
+# Retrier counts added to the run metrics
+RUN_COUNTERS = {'retries' : 'retries',
+                'failed' : 'fetch_failed',
+                'skipped' : 'fetch_skipped'}
+
+def is_failure(result) -> bool:
+    '''
+    Default failure test of a fetch result: None or an exception
+    '''
+    return (result is None) or isinstance(result, Exception)
+
+class Retrier:
+    '''
+    Retries failed fetch units of one source with exponential backoff and
+    full jitter, and stops the source through its circuit breaker after
+    sustained failures
+
+    Parameters
+    ----------
+        - source : str
+            name used in logs
+        - attempts : int, default 3
+            tries per fetch unit
+        - base_delay : float, default 1.0
+            backoff before the first retry in seconds (doubled per retry)
+        - max_delay : float, default 30.0
+        - threshold : int, default 15
+            consecutive failed units that trip the breaker
+        - failure : function, optional
+            takes a result and returns True if it failed; defaults to
+            is_failure
+
+    DOCTESTS:
+    >>> retrier = Retrier('test', base_delay = 0)
+    >>> calls = iter([None, 'page'])
+    >>> retrier.call(lambda: next(calls))
+    'page'
+    >>> retrier.stats()
+    {'units': 1, 'retries': 1, 'failed': 0, 'skipped': 0, 'breaker_tripped': False}
+    '''
+    def __init__(self,
+                 source : str,
+                 attempts : int = 3,
+                 base_delay : float = 1.0,
+                 max_delay : float = 30.0,
+                 threshold : int = 15,
+                 failure = None):
+        self.source = source
+        self.attempts = max(1, int(attempts))
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failure = is_failure if failure is None else failure
+        self.breaker = CircuitBreaker(source, threshold)
+        self.counts = {'units' : 0,
+                       'retries' : 0,
+                       'failed' : 0,
+                       'skipped' : 0}
+        self._lock = threading.Lock()
+
+    def _count(self, key : str, n : int = 1):
+        with self._lock:
+            self.counts[key] += n
+        if key in RUN_COUNTERS:
+            metrics.count(RUN_COUNTERS[key], n)
+
+    def backoff(self, retry : int) -> float:
+        '''
+        Seconds to wait before the given retry (1 for the first retry)
+        '''
+        cap = min(self.max_delay, self.base_delay * 2 ** (retry - 1))
+        return random.uniform(0, cap)
+
+    def call(self, func, *args, **kwargs):
+        '''
+        Result of func(*args, **kwargs), retried while it raises or its
+        result is a failure
+
+        Returns
+        -------
+            - result
+                last result, or None if func raised on the last attempt or
+                the breaker is open
+        '''
+        if self.breaker.is_open:
+            self._count('skipped')
+            return None
+
+        self._count('units')
+        result = None
+        for attempt in range(self.attempts):
+            if attempt:
+                self._count('retries')
+                time.sleep(self.backoff(attempt))
+            try:
+                result = func(*args, **kwargs)
+            except Exception as e:
+                logger.debug(f'{self.source}: attempt {attempt + 1} failed: {repr(e)}')
+                result = None
+            if not self.failure(result):
+                self.breaker.record(True)
+                return result
+            if self.breaker.is_open:
+                break
+
+        self._count('failed')
+        self.breaker.record(False)
+        return None if isinstance(result, Exception) else result
+
+    async def call_async(self, func, *args, **kwargs):
+        '''
+        call for a coroutine function (e.g. one request of a batch sharing an
+        event loop and session). Backoff waits don't block other requests,
+        and the breaker is fed as soon as the unit completes.
+
+        DOCTESTS:
+        >>> retrier = Retrier('test', base_delay = 0, threshold = 2)
+        >>> async def fetch(unit):
+        ...     return None
+        >>> [asyncio.run(retrier.call_async(fetch, unit)) for unit in range(4)]
+        [None, None, None, None]
+        >>> retrier.stats()
+        {'units': 2, 'retries': 4, 'failed': 2, 'skipped': 2, 'breaker_tripped': True}
+        '''
+        if self.breaker.is_open:
+            self._count('skipped')
+            return None
+
+        self._count('units')
+        result = None
+        try:
+            for attempt in range(self.attempts):
+                if attempt:
+                    self._count('retries')
+                    await asyncio.sleep(self.backoff(attempt))
+                try:
+                    result = await func(*args, **kwargs)
+                except Exception as e:
+                    logger.debug(f'{self.source}: attempt {attempt + 1} failed: {repr(e)}')
+                    result = None
+                if not self.failure(result):
+                    self.breaker.record(True)
+                    return result
+                if self.breaker.is_open:
+                    break
+        except asyncio.CancelledError:
+            # stopped in flight (e.g. the breaker tripped on another unit)
+            self._count('failed')
+            raise
+
+        self._count('failed')
+        self.breaker.record(False)
+        return None if isinstance(result, Exception) else result
+
+    def stats(self) -> dict:
+        '''
+        Fetch units, retries, failed and skipped units, and whether the
+        breaker tripped
+        '''
+        with self._lock:
+            return {**self.counts, 'breaker_tripped' : self.breaker.is_open}
@@ -10,6 +10,7 @@ import json
 import re
 import zipfile
 import os
+import threading
 
 if 'chromedriver-win64\\chromedriver.exe' not in os.environ['PATH']:
     os.environ['PATH'] += ';' + r"\chromedriver-win64\chromedriver.exe"
@@ -20,16 +21,84 @@ from selenium.webdriver import Chrome
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 
-# to run selenium in headless mode (no user interface/does not open browser)
-options = Options()
-options.add_argument('--headless')
-options.add_argument('--no-sandbox')
-options.add_argument('--disable-dev-shm-usage')
-options.add_argument("--disable-gpu")
-options.add_argument("--disable-features=NetworkService")
-options.add_argument("--window-size=1920x1080")
-options.add_argument("--disable-features=VizDisplayCompositor")
-options.add_experimental_option("excludeSwitches", ["enable-logging"])
+# resources not needed to read product text (blocked in the scrape profile)
+SCRAPE_BLOCKED_URLS = ['*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.avif',
+                       '*.svg', '*.ico', '*.woff', '*.woff2', '*.ttf', '*.otf',
+                       '*.mp4', '*.webm', '*.mp3',
+                       '*google-analytics.com*', '*googletagmanager.com*',
+                       '*doubleclick.net*', '*connect.facebook.net*',
+                       '*hotjar.com*', '*clarity.ms*', '*tiktok.com*']
+
+# seconds
+SCRAPE_TIMEOUTS = {'page_load' : 30,
+                   'script' : 10}
+
+def get_options(profile : str = 'default') -> Options:
+    '''
+    Chrome options for a driver profile
+    
+    Parameters:
+    ----------
+        - profile : str, default 'default'
+            'default' for headless Chrome; 'scrape' also disables images and
+            returns from driver.get once the DOM is ready (eager page load)
+    
+    Returns:
+    --------
+        - options : Options
+    '''
+    # to run selenium in headless mode (no user interface/does not open browser)
+    options = Options()
+    options.add_argument('--headless')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument("--disable-gpu")
+    options.add_argument("--disable-features=NetworkService")
+    options.add_argument("--window-size=1920x1080")
+    options.add_argument("--disable-features=VizDisplayCompositor")
+    options.add_experimental_option("excludeSwitches", ["enable-logging"])
+    
+    if profile == 'scrape':
+        # don't wait for images, async scripts and iframes to finish loading
+        options.page_load_strategy = 'eager'
+        options.add_argument('--blink-settings=imagesEnabled=false')
+        options.add_experimental_option('prefs', 
+                                        {'profile.managed_default_content_settings.images' : 2})
+    
+    return options
+
+options = get_options()
+
+def apply_scrape_profile(driver,
+                         blocked_urls : list = None,
+                         timeouts : dict = None):
+    '''
+    Blocks non-essential requests (fonts, media, trackers) through the
+    DevTools protocol and sets page load and script timeouts
+    
+    Parameters:
+    ----------
+        - driver : selenium.webdriver.chrome.webdriver.WebDriver
+        - blocked_urls : list, optional
+            url patterns to block; defaults to SCRAPE_BLOCKED_URLS
+        - timeouts : dict, optional
+            page_load and script timeouts in seconds; defaults to 
+            SCRAPE_TIMEOUTS
+    '''
+    blocked_urls = SCRAPE_BLOCKED_URLS if blocked_urls is None else blocked_urls
+    timeouts = SCRAPE_TIMEOUTS if timeouts is None else timeouts
+    try:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls' : blocked_urls})
+    except:
+        # blocking is an optimization only
+        pass
+    
+    driver.set_page_load_timeout(timeouts['page_load'])
+    driver.set_script_timeout(timeouts['script'])
+
+# serializes driver download/extraction when scrapers run concurrently
+_download_lock = threading.Lock()
 
 #from win32com.client import Dispatch
 
@@ -131,21 +200,10 @@ def extract_chromedriver():
     with zipfile.ZipFile(path) as zf:
         zf.extract(r'chromedriver-win64/chromedriver.exe')
 
-def create_driver():
+def start_chrome(options : Options):
     '''
-    Main function to create chromedriver
-    1. Initial attempt to create chromedriver instance
-    2. If fail, get chrome version, download appropriate version driver, 
-        extract driver
-    
-    Parameters:
-    ----------
-        None
-    
-    Returns:
-    -------
-        - driver : selenium.webdriver.chrome.webdriver.WebDriver
-    
+    Chrome driver with options; downloads the chromedriver matching the
+    installed Chrome if the first attempt fails
     '''
     try:
         # initial attempt at creating chromedriver
@@ -164,14 +222,15 @@ def create_driver():
         
         try:
             
-            # get download link for suitable driver version
-            link = get_json_link(version[0])
-            
-            # download chromedriver zip file from json endpoint/url
-            download_zip(link)
-            
-            # extract chromedriver contents
-            extract_chromedriver()
+            with _download_lock:
+                # get download link for suitable driver version
+                link = get_json_link(version[0])
+                
+                # download chromedriver zip file from json endpoint/url
+                download_zip(link)
+                
+                # extract chromedriver contents
+                extract_chromedriver()
             
             # reattempt to create driver
             driver = Chrome(service = service, 
@@ -182,4 +241,33 @@ def create_driver():
             raise e
             
     finally:
-        return driver
\ No newline at end of file
+        return driver
+
+def create_driver(profile : str = 'default'):
+    '''
+    Main function to create chromedriver
+    1. Initial attempt to create chromedriver instance
+    2. If fail, get chrome version, download appropriate version driver, 
+        extract driver
+    
+    Parameters:
+    ----------
+        - profile : str, default 'default'
+            'scrape' for a lean browser: no images, fonts, media or trackers,
+            eager page load, and page load/script timeouts (see get_options
+            and apply_scrape_profile)
+    
+    Returns:
+    -------
+        - driver : selenium.webdriver.chrome.webdriver.WebDriver
+    
+    '''
+    driver = start_chrome(get_options(profile))
+    if (driver is not None) and (profile == 'scrape'):
+        try:
+            apply_scrape_profile(driver)
+        except:
+            # don't leave a browser running without its timeouts
+            driver.quit()
+            raise
+    return driver
@@ -10,11 +10,22 @@ import json
 import re
 import numpy as np
 import pandas as pd
-import time
 from datetime import datetime as dt
 
 import cleaner_functions
 import get_chromedriver
+import dom_extract
+import async_fetcher
+import rate_limiter
+import fetch_retry
+import metrics
+import profiling
+import replay
+from response_cache import ResponseCache
+from checkpoint import CheckpointStore
+from incremental import SpecHistory
+from reference_catalog import ReferenceCatalog
+from tire_size import SIZE_PATTERN
 
 from selenium.webdriver.common.by import By
 
@@ -46,10 +57,19 @@ xpath_prod = {
                 'brand': "//div[@class='pl-4 pr-2 px-sm-2 col-sm-12 col-8']",
               }
 
-def get_data(w : str, 
-             ar : str, 
-             d : str, headers):
-    
+GOGULONG_API_URL = 'https://asia-east2-gogulong.cloudfunctions.net/searchRequestLg'
+
+# search responses keyed by (width, aspectRatio, rimDiameter)
+cache = ResponseCache('cache/gogulong_cache.sqlite',
+                      ttl = 6*3600,
+                      max_entries = 5000)
+
+def get_payload(w : str,
+                ar : str,
+                d : str) -> dict:
+    '''
+    Constructs search request body of gogulong cloud function for tire size
+    '''
     json_data = {
         'data': {
             'action': 'search-inventory-for-customer',
@@ -61,11 +81,37 @@ def get_data(w : str,
             'module': 'virtual_inventory',
         },
     }
+    return json_data
 
-    response = requests.post('https://asia-east2-gogulong.cloudfunctions.net/searchRequestLg', 
-                         headers=headers, 
-                         json=json_data)
+def get_data(w : str, 
+             ar : str, 
+             d : str, headers,
+             url : str = GOGULONG_API_URL,
+             use_cache : bool = True):
+    
+    # read through response cache (live responses only)
+    use_cache = use_cache and (not replay.active())
+    key = cache.make_key(w, ar, d)
+    if use_cache and ((data := cache.get(key)) is not None):
+        return data
+    
+    json_data = get_payload(w, ar, d)
+
+    with rate_limiter.LIMITER.request(rate_limiter.get_host(url)) as outcome, metrics.span('fetch'):
+        response = requests.post(replay.url(url), 
+                                 headers=headers, 
+                                 json=json_data)
+        outcome['ok'] = rate_limiter.ok_status(response.status_code)
+    metrics.count('requests')
+    metrics.count('bytes', len(response.content))
+    replay.record('POST', url, json_data, response.status_code,
+                  response.headers.get('content-type'), response.text)
     data = json.loads(response.content)
+    
+    # only cache successful searches
+    if use_cache and ('result' in data):
+        cache.set(key, data)
+    
     return data
 
 # Note: json_data will not be serialized by requests
@@ -73,48 +119,349 @@ def get_data(w : str,
 #data = '{"data":{"action":"search-inventory-for-customer","payload":{"width":"175","aspectRatio":"65","rimDiameter":"14"},"module":"virtual_inventory"}}'
 #response = requests.post('https://asia-east2-gogulong.cloudfunctions.net/searchRequestLg', headers=headers, data=data)
 
-def gogulong_scraper_network(df_gulong : None):
-    # 1. filter out unnecessary specs to be scraped
-    correct_specs = [cs for cs in np.sort(
+def is_failed_response(data) -> bool:
+    '''
+    Failed search request: an exception or a body without results
+    
+    >>> is_failed_response({'error' : {'status' : 'INTERNAL'}})
+    True
+    '''
+    return (not isinstance(data, dict)) or ('result' not in data)
+
+def get_retrier(source : str = 'gogulong') -> fetch_retry.Retrier:
+    '''
+    Retrier for GoGulong search requests
+    '''
+    return fetch_retry.Retrier(source, failure = is_failed_response)
+
+def get_correct_specs(df_gulong : pd.DataFrame) -> list:
+    '''
+    Filter out unnecessary specs to be scraped from gulong correct_specs
+    '''
+    return [cs for cs in np.sort(
         df_gulong.loc[:, 'correct_specs'].unique()) if float(cs.split('/')[0]) > 27]
+
+def get_info_specs(info : str) -> tuple:
+    '''
+    Extracts cleaned width, aspect ratio and diameter from tire info text
+    (e.g. '265/65 R17 112S 8PR') of gogulong selenium results
+    '''
+    m = SIZE_PATTERN.match(info)
+    # standard sizes at start of info are read from a single match
+    if (m is not None) and (info[m.end():m.end()+1] in ['', ' ']):
+        width, sep = m['width'], m['sep']
+        if (sep == '/') and (len(width) == 3):
+            return width, m['aspect_ratio'][:2], 'R' + m['diameter']
+        
+        ar_start = m.start('aspect_ratio')
+        if (sep == 'X') and (len(width) == 2) and (len(info) >= ar_start + 4):
+            return width, cleaner_functions.clean_aspect_ratio(info[ar_start:ar_start+4]), 'R' + m['diameter']
+        
+        if (sep is None) and (m['space'] == ' ') and (m['construction'] == 'R') and (len(width) == 3):
+            return width, 'R', 'R' + m['diameter']
+    
+    w = cleaner_functions.clean_width(re.search("(\d{3}/)|(\d{2}[Xx])|(\d{3} )", info)[0][:-1])
+    ar = cleaner_functions.clean_aspect_ratio(re.search("(/\d{2})|(X.{4})|( R)", info)[0][1:])
+    d = cleaner_functions.clean_diameter(re.search('R.*\d{2}', info)[0].replace(' ', '')[1:3])
+    return w, ar, d
+
+@metrics.span('parse')
+def parse_products(prod_list : list) -> pd.DataFrame:
+    '''
+    Converts product list from gogulong search response to dataframe
+    
+    Parameters
+    ----------
+        - prod_list : list
+            data['result']['result'] of get_data response
+    
+    Returns
+    -------
+        - pd.DataFrame
+            one row per product
+    '''
+    tire_list = []
+    tire_cols = ['tire_id', 'size', 'slug',
+                 'plyRating', 'width', 'aspectRatio', 'rimDiameter']
+    
+    for p in prod_list:
+        temp_dict = {}
+        for col in tire_cols:
+            if col in p['tire'].keys():
+                temp_dict[col] = p['tire'][col]
+            else:
+                temp_dict[col] = None
+            
+        temp_dict['sellingPrice'] = p['sellingPrice']
+        temp_dict['tireBrand'] = p['tire']['tireDesign']['tireBrand']
+        temp_dict['designName'] = p['tire']['tireDesign']['designName']
+        tire_list.append(temp_dict)
+    
+    return pd.DataFrame(tire_list)
+
+def gogulong_scraper_network(df_gulong : None,
+                             use_cache : bool = True,
+                             checkpoint : CheckpointStore = None,
+                             retrier : fetch_retry.Retrier = None):
+    # 1. filter out unnecessary specs to be scraped
+    correct_specs = get_correct_specs(df_gulong)
+    retrier = get_retrier() if retrier is None else retrier
     
     # 2. iteration loop
     gg_df_list = []
     for n, spec in enumerate(correct_specs):
+        # rebuild specs completed in a previous run
+        if (checkpoint is not None) and checkpoint.is_done(spec):
+            gg_df_list.append(pd.DataFrame(checkpoint.get(spec)))
+            continue
+        
         w, ar, d = spec.split('/')
         logger.info(f'Extracting GoGulong info with tire size: {spec}')
+        # stop requesting from a dead endpoint
+        retrier.breaker.check()
         
         try:
-            prod_list = get_data(w, ar, d, headers)['result']['result']
-            tire_list = []
-            tire_cols = ['tire_id', 'size', 'slug',
-                         'plyRating', 'width', 'aspectRatio', 'rimDiameter']
-            
-            for p in prod_list:
-                temp_dict = {}
-                for col in tire_cols:
-                    if col in p['tire'].keys():
-                        temp_dict[col] = p['tire'][col]
-                    else:
-                        temp_dict[col] = None
-                    
-                temp_dict['sellingPrice'] = p['sellingPrice']
-                temp_dict['tireBrand'] = p['tire']['tireDesign']['tireBrand']
-                temp_dict['designName'] = p['tire']['tireDesign']['designName']
-                tire_list.append(temp_dict)
-                
-            gg_df_list.append(pd.DataFrame(tire_list))   
-            time.sleep(np.random.randint(1, 5))
+            # requests are paced by the shared rate limiter
+            data = retrier.call(get_data, w, ar, d, headers, 
+                                use_cache = use_cache)
+            prod_list = data['result']['result']
+            spec_df = parse_products(prod_list)
+            gg_df_list.append(spec_df)
+            if checkpoint is not None:
+                checkpoint.add(spec, spec_df.to_dict('records'))
         except:
+            metrics.count('specs_dropped')
             continue
     
     gg_df = pd.concat(gg_df_list, ignore_index = True)
     
     return gg_df
 
+def gogulong_scraper_async(df_gulong : pd.DataFrame,
+                           concurrency : int = 8,
+                           rate_per_host : float = 4.0,
+                           url : str = GOGULONG_API_URL,
+                           use_cache : bool = True,
+                           checkpoint : CheckpointStore = None,
+                           retrier : fetch_retry.Retrier = None) -> pd.DataFrame:
+    '''
+    Concurrent version of gogulong_scraper_network using a pooled async client
+    
+    Parameters
+    ----------
+        - df_gulong : pd.DataFrame
+            df_gulong from get_gulong_data function
+        - concurrency : int, default 8
+            max number of in-flight requests
+        - rate_per_host : float, default 4.0
+            initial requests per second sent to the cloud function (adapted
+            by the shared rate limiter)
+        - url : str
+            search endpoint; can point to a local stand-in server
+        - use_cache : bool, default True
+            read/write responses through the on-disk response cache
+        - checkpoint : CheckpointStore, optional
+            journal of completed specs; completed specs are not requested again
+        - retrier : fetch_retry.Retrier, optional
+            retries failed requests; see get_retrier
+    
+    Returns
+    -------
+        - gg_df : pd.DataFrame
+            same schema as gogulong_scraper_network
+    '''
+    retrier = get_retrier() if retrier is None else retrier
+    # 1. filter out unnecessary specs to be scraped
+    correct_specs = get_correct_specs(df_gulong)
+    
+    # 2. collect cached responses (live responses only)
+    use_cache = use_cache and (not replay.active())
+    responses = {}
+    done = [spec for spec in correct_specs 
+            if (checkpoint is not None) and checkpoint.is_done(spec)]
+    if use_cache:
+        for spec in correct_specs:
+            if spec in done:
+                continue
+            if (data := cache.get(cache.make_key(*spec.split('/')))) is not None:
+                responses[spec] = data
+    
+    # 3. one request per uncached tire size; failed requests are retried
+    missing = [spec for spec in correct_specs 
+               if (spec not in responses) and (spec not in done)]
+    
+    jobs = [{'url' : url,
+             'headers' : headers,
+             'json' : get_payload(*spec.split('/'))} for spec in missing]
+    
+    parsed = {}
+    arrived = set()
+    
+    def parse_spec(spec, data):
+        # parse and journal each spec as soon as its response is available
+        try:
+            parsed[spec] = parse_products(data['result']['result'])
+            if checkpoint is not None:
+                checkpoint.add(spec, parsed[spec].to_dict('records'))
+        except:
+            logger.debug(f'No GoGulong data for tire size: {spec}')
+            metrics.count('specs_dropped')
+    
+    def on_result(ndx, data):
+        spec = missing[ndx]
+        arrived.add(spec)
+        if use_cache and isinstance(data, dict) and ('result' in data):
+            cache.set(cache.make_key(*spec.split('/')), data)
+        parse_spec(spec, data)
+    
+    for spec, data in responses.items():
+        parse_spec(spec, data)
+    
+    logger.info(f'Extracting GoGulong info for {len(missing)} tire sizes (async), {len(responses)} cached.')
+    async_fetcher.fetch_json_all(jobs, 
+                                 concurrency = concurrency,
+                                 rate_per_host = rate_per_host,
+                                 retrier = retrier,
+                                 on_result = on_result)
+    # specs cancelled by the circuit breaker never reach on_result
+    metrics.count('specs_dropped', len(set(missing) - arrived))
+    
+    # 4. combine specs in spec order
+    gg_df_list = []
+    for spec in correct_specs:
+        if spec in done:
+            gg_df_list.append(pd.DataFrame(checkpoint.get(spec)))
+        elif spec in parsed:
+            gg_df_list.append(parsed[spec])
+    
+    gg_df = pd.concat(gg_df_list, ignore_index = True)
+    
+    return gg_df
+
+
+def gogulong_scraper_incremental(df_gulong : pd.DataFrame,
+                                 engine : str = 'async',
+                                 use_cache : bool = True,
+                                 checkpoint : CheckpointStore = None,
+                                 window : int = 7,
+                                 retrier : fetch_retry.Retrier = None) -> tuple:
+    '''
+    Scrapes only new specs and a rolling 1/window slice of unchanged specs,
+    carrying forward stored results of the rest
+    
+    Parameters
+    ----------
+        - df_gulong : pd.DataFrame
+            df_gulong from get_gulong_data function
+        - engine : str, default 'async'
+            'async' or 'network'
+        - use_cache : bool, default True
+            read/write responses through the on-disk response cache
+        - checkpoint : CheckpointStore, optional
+            journal of completed specs
+        - window : int, default 7
+            number of days over which all unchanged specs are refreshed
+        - retrier : fetch_retry.Retrier, optional
+            retries failed requests; see get_retrier
+    
+    Returns
+    -------
+        - gg_df : pd.DataFrame
+            same schema as gogulong_scraper_network
+        - summary : dict
+            counts of scraped/carried specs and age (days) of carried specs
+    '''
+    checkpoint = CheckpointStore('gogulong') if checkpoint is None else checkpoint
+    history = SpecHistory('gogulong')
+    
+    correct_specs = get_correct_specs(df_gulong)
+    to_scrape, carried = history.plan(correct_specs, window = window)
+    
+    # 1. scrape new and due specs
+    gg_df_list = []
+    if len(to_scrape):
+        df_scrape = df_gulong[df_gulong.correct_specs.isin(to_scrape)]
+        try:
+            if engine == 'async':
+                gogulong_scraper_async(df_scrape, 
+                                       use_cache = use_cache,
+                                       checkpoint = checkpoint,
+                                       retrier = retrier)
+            else:
+                gogulong_scraper_network(df_scrape, 
+                                         use_cache = use_cache,
+                                         checkpoint = checkpoint,
+                                         retrier = retrier)
+        # nothing collected or endpoint down
+        except (ValueError, fetch_retry.CircuitOpen):
+            pass
+    
+    scraped = set([spec for spec in to_scrape if checkpoint.is_done(spec)])
+    for spec in scraped:
+        history.update(spec, checkpoint.get(spec))
+    
+    # failed specs fall back to their last stored results
+    carried = set(carried + [spec for spec in to_scrape 
+                             if (spec not in scraped) and (spec in history.specs)])
+    
+    # 2. assemble in spec order
+    spec_age = {}
+    for spec in correct_specs:
+        if spec in scraped:
+            gg_df_list.append(pd.DataFrame(checkpoint.get(spec)))
+        elif spec in carried:
+            gg_df_list.append(pd.DataFrame(history.get(spec)))
+            spec_age[spec] = history.age(spec)
+    
+    history.save(correct_specs)
+    
+    summary = {'specs' : len(correct_specs),
+               'scraped' : len(scraped),
+               'carried_forward' : len(spec_age),
+               'max_age_days' : max(spec_age.values()) if len(spec_age) else 0,
+               'spec_age_days' : spec_age}
+    
+    gg_df = pd.concat(gg_df_list, ignore_index = True) if len(gg_df_list) else pd.DataFrame()
+    
+    return gg_df, summary
+
+
+def get_logo_brand(logo_link : str, text : str) -> str:
+    '''
+    Brand from the logo image link of a result, else from its first text line
+    
+    DOCTESTS:
+    >>> get_logo_brand('https://gogulong.ph/img/bridgestone-logo.png', 'X')
+    'BRIDGESTONE'
+    >>> get_logo_brand(None, 'Michelin\\nPilot Sport 4')
+    'MICHELIN'
+    '''
+    try:
+        return re.search('(?<=img/).*(?=-logo)', logo_link)[0].upper()
+    except:
+        return text.split('\n')[0].upper()
+
+def scrape_data_script(driver, 
+                       xpath_info : dict) -> pd.DataFrame:
+    '''
+    Same as scrape_data but reads all results with two execute_script calls
+    instead of one WebDriver call per element
+    '''
+    texts = dom_extract.extract_texts(driver, {col : xpath_info[col] 
+                                               for col in ['tires', 'price', 'info']})
+    df_dict = {col : [t for t in texts[col] if t != ''] 
+               for col in ['tires', 'price', 'info']}
+    
+    brands = dom_extract.extract_tiles(driver, xpath_info['brand'], 
+                                       {'logo' : '(.//*)[1]/@src',
+                                        'text' : '.'})
+    df_dict['brand'] = [get_logo_brand(b['logo'], b['text']) for b in brands]
+    
+    return pd.DataFrame(df_dict)
 
 def scrape_data(driver, 
-                xpath_info : dict) -> pd.DataFrame:
+                xpath_info : dict,
+                extraction : str = 'script') -> pd.DataFrame:
     '''
 
     Parameters
@@ -123,8 +470,9 @@ def scrape_data(driver,
         chrome driver
     xpath_prod : dictionary
         Dictionary of tires, price, info html xpaths separated by website
-    site : string, optional
-        Which site is being scraped. The default is 'gulong'.
+    extraction : str, default 'script'
+        'script' uses scrape_data_script (falls back to 'elements' if it
+        fails); 'elements' reads each element separately
 
     Returns
     -------
@@ -132,6 +480,12 @@ def scrape_data(driver,
         list of lists containing text of scraped info (tire, price, info)
 
     '''
+    if extraction == 'script':
+        try:
+            return scrape_data_script(driver, xpath_info)
+        except Exception as e:
+            logger.debug(f'Script extraction failed: {repr(e)}')
+    
     df_dict = {}
     # collect different data on available tires in driver
     for col in ['tires', 'price', 'info']:
@@ -145,11 +499,9 @@ def scrape_data(driver,
         for b in brand_gulong:
             try:
                 logo_link = b.find_elements(By.XPATH, './/*')[0].get_attribute('src')
-                brand = re.search('(?<=img/).*(?=-logo)', logo_link)[0].upper()
-                brands_list.append(brand)
             except:
-                brand = b.text.split('\n')[0].upper()
-                brands_list.append(brand)
+                logo_link = None
+            brands_list.append(get_logo_brand(logo_link, b.text))
     except:
         brands_list = [None] * len(df_dict['tires'])
     
@@ -161,9 +513,53 @@ def scrape_data(driver,
     
     return results_df
 
+def scrape_spec_selenium(driver,
+                         xpath_prod : dict,
+                         spec : str) -> pd.DataFrame:
+    '''
+    Scrapes the GoGulong search results of one tire size
+    
+    Returns
+    -------
+        - spec_df : pd.DataFrame
+            scraped results (empty if GoGulong has none for spec); None if
+            results were shown but could not be read
+    '''
+    # 1. obtain specs
+    w, ar, d = spec.split('/')
+    
+    # 2. open web page
+    url_page = 'https://gogulong.ph/search-results?width=' + \
+        w + '&aspectRatio=' + ar + '&rimDiameter=' + d
+    
+    with rate_limiter.LIMITER.request(rate_limiter.get_host(url_page)):
+        replay.get_page(driver, url_page)
+    
+    # 3. check error message
+    # check if error message for page
+    err_message = len(driver.find_elements(
+        By.XPATH, '//div[@class="searchResultEmptyMessage"]'))
+    
+    if err_message:
+        return pd.DataFrame()
+    
+    # wait for results to render
+    driver.implicitly_wait(2)
+    # get number of items
+    nums = driver.find_elements(By.XPATH, '//span[@class="grey--text"]')
+    num_items = sum([int(n.text[1]) for n in nums])
+    logger.debug('{} items on this page: '.format(num_items))
+    
+    # scrape data
+    spec_df = scrape_data(driver, 
+                          xpath_prod)
+    return spec_df if len(spec_df) else None
+
 def gogulong_scraper_selenium(driver, 
                      xpath_prod : dict, 
-                     df_gulong : pd.DataFrame) -> dict:
+                     df_gulong : pd.DataFrame,
+                     checkpoint : CheckpointStore = None,
+                     retrier : fetch_retry.Retrier = None) -> dict:
     '''
     Gogulong price scraper
     
@@ -175,65 +571,54 @@ def gogulong_scraper_selenium(driver,
         Dictionary of tires, price, info html xpaths separated by website
     df_gulong: dataframe
         Dataframe of scraped data from gulong
+    checkpoint : CheckpointStore, optional
+        journal of completed specs; completed specs are not scraped again
+    retrier : fetch_retry.Retrier, optional
+        retries failed specs; raises CircuitOpen once its breaker trips
 
     Returns
     -------
         - gg_df_dict : dict
             dictionary containing scraped tire info per tire size
     '''
+    retrier = fetch_retry.Retrier('gogulong_selenium') if retrier is None else retrier
     
     # 1. filter out unnecessary specs to be scraped
-    correct_specs = [cs for cs in np.sort(
-        df_gulong.loc[:, 'correct_specs'].unique()) if float(cs.split('/')[0]) > 27]
+    correct_specs = get_correct_specs(df_gulong)
     
     # 2. iteration loop
     gg_df_dict = {}
-    for n, spec in enumerate(correct_specs):
-        try:
-            # 2.1 obtain specs
-            w, ar, d = spec.split('/')
-            logger.info(f'Extracting GoGulong info with tire size: {spec}')
-            
-            # 2.2 open web page
-            url_page = 'https://gogulong.ph/search-results?width=' + \
-                w + '&aspectRatio=' + ar + '&rimDiameter=' + d
-            
-            driver.get(url_page)
-            
-            # 2.3 check error message
-            # check if error message for page
-            err_message = len(driver.find_elements(
-                By.XPATH, '//div[@class="searchResultEmptyMessage"]'))
-            
-            if err_message == 0:
-                driver.implicitly_wait(np.random.randint(1, 5))
-                # get number of items
-                nums = driver.find_elements(By.XPATH, '//span[@class="grey--text"]')
-                num_items = sum([int(n.text[1]) for n in nums])
-                logger.debug('{} items on this page: '.format(num_items))
-                
-                # scrape data
-                gg_df_dict[spec] = scrape_data(driver, 
-                                               xpath_prod) 
+    for spec in correct_specs:
+        # rebuild specs completed in a previous run
+        if (checkpoint is not None) and checkpoint.is_done(spec):
+            gg_df_dict[spec] = pd.DataFrame(checkpoint.get(spec))
+            continue
         
-        # page-level exception
-        except Exception as e:
-            raise e
+        logger.info(f'Extracting GoGulong info with tire size: {spec}')
+        # terminate after sustained failures (e.g. site down or blocking us)
+        retrier.breaker.check()
         
-        finally:
-            total = len(pd.concat(gg_df_dict))
-            if (n >= 15) and (total == 0):
-                raise Exception('Scraper unable to collect data from gogulong. Terminating scraper.')
-                break
-            else:
-                logger.info('Collected total {} tire items'.format(total))
+        spec_df = retrier.call(scrape_spec_selenium, driver, xpath_prod, spec)
+        if spec_df is None:
+            metrics.count('specs_dropped')
+            continue
+        
+        if len(spec_df):
+            gg_df_dict[spec] = spec_df
+        if checkpoint is not None:
+            checkpoint.add(spec, spec_df.to_dict('records'))
+        
+        logger.info('Collected total {} tire items'.format(sum(len(df) for df in gg_df_dict.values())))
     
     gg_df = pd.concat(gg_df_dict, axis=0).reset_index(drop = True)
     
     return gg_df
 
+@profiling.stage('construct_gogulong_df')
+@metrics.span('clean')
 def construct_gogulong_df(df_gogulong : pd.DataFrame, 
-                          df_gulong : pd.DataFrame) -> pd.DataFrame:
+                          df_gulong : pd.DataFrame,
+                          catalog : ReferenceCatalog = None) -> pd.DataFrame:
     
     '''
     
@@ -243,6 +628,8 @@ def construct_gogulong_df(df_gogulong : pd.DataFrame,
             dataframe containing scraped tire info
         - df_gulong : pd.DataFrame
             imported gulong dataframe
+        - catalog : ReferenceCatalog, optional
+            reference data built from df_gulong; built here if not given
     
     Returns
     -------
@@ -257,42 +644,94 @@ def construct_gogulong_df(df_gogulong : pd.DataFrame,
                                   'aspectRatio' : 'aspect_ratio',
                                   'rimDiameter' : 'diameter',
                                   'sellingPrice' : 'price_gogulong'})
+    catalog = ReferenceCatalog(df_gulong) if catalog is None else catalog
+    
+    # network responses have size and ply rating instead of the info text
+    if 'info' not in df_gogulong.columns:
+        df_gogulong.loc[:, 'info'] = df_gogulong['size'].astype(str) + \
+            df_gogulong['ply'].map(lambda x: f' {int(x)}PR' if pd.notna(x) and str(x).replace('.0', '').isdigit() else '')
+        # ply is read back from info below
+        df_gogulong = df_gogulong.drop(columns = 'ply')
+    
     # model
     try:
-        df_gogulong.loc[:,'name'] = df_gogulong.apply(lambda x: cleaner_functions.fix_names(x['designName'], 
-                                                                comp = df_gulong[df_gulong.name.notna()].name.unique()), axis=1)
+        df_gogulong.loc[:,'name'] = cleaner_functions.map_unique(cleaner_functions.fix_names,
+                                                                 df_gogulong['designName'], 
+                                                                 comp = catalog)
     except:
-        df_gogulong.loc[:,'name'] = df_gogulong.apply(lambda x: cleaner_functions.fix_names(x['tires'], 
-                                                                comp = df_gulong[df_gulong.name.notna()].name.unique()), axis=1)
-    
-    df_gogulong.loc[:,'width'] = df_gogulong.loc[:,'info'].apply(lambda x: cleaner_functions.clean_width(re.search("(\d{3}/)|(\d{2}[Xx])|(\d{3} )", x)[0][:-1]))
-    df_gogulong.loc[:,'aspect_ratio'] = df_gogulong.loc[:, 'info'].apply(lambda x: cleaner_functions.clean_aspect_ratio(re.search("(/\d{2})|(X.{4})|( R)", x)[0][1:]))
-    df_gogulong.loc[:,'diameter'] = df_gogulong.loc[:, 'info'].apply(lambda x: cleaner_functions.clean_diameter(re.search('R.*\d{2}', x)[0].replace(' ', '')[1:3]))
+        df_gogulong.loc[:,'name'] = cleaner_functions.map_unique(cleaner_functions.fix_names,
+                                                                 df_gogulong['tires'], 
+                                                                 comp = catalog)
+    
+    specs = cleaner_functions.map_unique(get_info_specs, df_gogulong['info'])
+    df_gogulong.loc[:,'width'] = specs.str[0]
+    df_gogulong.loc[:,'aspect_ratio'] = specs.str[1]
+    df_gogulong.loc[:,'diameter'] = specs.str[2]
     df_gogulong.loc[:,'ply'] = df_gogulong.loc[:,'info'].apply(lambda x: re.search('(\d{1}PR)|(\d{2}PR)', x)[0][:-2] if re.search('(\d{1}PR)|(\d{2}PR)', x) else '0')
-    df_gogulong.loc[:,'price_gogulong'] = df_gogulong.loc[:,'price'].apply(lambda x: float((x.split(' ')[1]).replace(',', '')))
-    df_gogulong.loc[:, 'raw_specs'] = df_gogulong.apply(lambda x: cleaner_functions.combine_specs(str(x['width']), str(x['aspect_ratio']), str(x['diameter']), mode = 'SKU'), axis=1)
-    df_gogulong.loc[:, 'correct_specs'] = df_gogulong.apply(lambda x: cleaner_functions.combine_specs(x['width'], x['aspect_ratio'], x['diameter'], mode = 'MATCH'), axis=1)
-    df_gogulong.loc[:, 'sku_name'] = df_gogulong.apply(lambda x: cleaner_functions.combine_sku(str(x['brand']), 
-                                                           str(x['width']),
-                                                           str(x['aspect_ratio']),
-                                                           str(x['diameter']),
-                                                           str(x['name']), 
-                                                           np.NaN, 
-                                                           np.NaN), 
-                                                           axis=1)
+    if 'price' in df_gogulong.columns:
+        df_gogulong.loc[:,'price_gogulong'] = df_gogulong.loc[:,'price'].apply(lambda x: float((x.split(' ')[1]).replace(',', '')))
+    else:
+        df_gogulong.loc[:,'price_gogulong'] = df_gogulong['price_gogulong'].astype(float)
+    df_gogulong.loc[:, 'raw_specs'] = cleaner_functions.map_unique(lambda w, ar, d: cleaner_functions.combine_specs(str(w), str(ar), str(d), mode = 'SKU'),
+                                                                   df_gogulong['width'], df_gogulong['aspect_ratio'], 
+                                                                   df_gogulong['diameter'], name = 'combine_specs')
+    df_gogulong.loc[:, 'correct_specs'] = cleaner_functions.map_unique(cleaner_functions.combine_specs,
+                                                                       df_gogulong['width'], df_gogulong['aspect_ratio'], 
+                                                                       df_gogulong['diameter'], mode = 'MATCH')
+    df_gogulong.loc[:, 'sku_name'] = cleaner_functions.map_unique(lambda make, w, ar, d, model: cleaner_functions.combine_sku(str(make), 
+                                                                                                   str(w),
+                                                                                                   str(ar),
+                                                                                                   str(d),
+                                                                                                   str(model), 
+                                                                                                   np.NaN, 
+                                                                                                   np.NaN),
+                                                                  df_gogulong['brand'], df_gogulong['width'],
+                                                                  df_gogulong['aspect_ratio'], df_gogulong['diameter'],
+                                                                  df_gogulong['name'], name = 'combine_sku')
     df_gogulong.reset_index(inplace = True, drop = True)
     cols = ['sku_name', 'brand', 'name', 'raw_specs', 'width', 'aspect_ratio',
             'diameter', 'price_gogulong', 'correct_specs', 'ply']
     
     return df_gogulong[cols]
 
-def main(df_ref : None):
+@profiling.stage('gogulong')
+@replay.with_target
+def main(df_ref : None,
+         engine : str = 'async',
+         use_cache : bool = True,
+         resume : bool = False,
+         incremental : bool = False,
+         window : int = 7,
+         catalog : ReferenceCatalog = None,
+         replay_url : str = None,
+         driver_profile : str = 'scrape'):
     '''
     
     Parameters:
     ----------
         - df_ref : pd.DataFrame
             df_gulong from get_gulong_data function. Required.
+        - engine : str, default 'async'
+            'async' for concurrent requests, 'network' for sequential requests.
+            Selenium is used as fallback for both.
+        - use_cache : bool, default True
+            set to False to bypass the response cache (always bypassed when
+            replaying or recording)
+        - resume : bool, default False
+            skip tire specs completed by a previous (crashed) run today
+        - incremental : bool, default False
+            scrape new specs and 1/window of unchanged specs; carry forward
+            stored results of the rest
+        - window : int, default 7
+            number of days over which all unchanged specs are refreshed
+        - catalog : ReferenceCatalog, optional
+            shared reference data built from df_ref
+        - replay_url : str, optional
+            address of a replay.ReplayServer to scrape instead of the live
+            site (e.g. 'http://127.0.0.1:8765')
+        - driver_profile : str, default 'scrape'
+            get_chromedriver.create_driver profile of the Selenium drivers
+            created here ('default' for a full browser)
     
     Returns:
     --------
@@ -301,26 +740,60 @@ def main(df_ref : None):
     '''
     
     time_start = dt.now()
+    # the cache is shared by runs in the same process; report this run only
+    cache.reset_stats()
+    if use_cache and replay.active():
+        logger.info('Replaying or recording responses, GoGulong response cache not used.')
+        use_cache = False
+    incremental_stats = None
+    retriers = {'network' : get_retrier()}
     
     try:
         # try first scraper using requests
-        logger.info('Scraping via network.')
-        gg_df = gogulong_scraper_network(df_ref)
+        logger.info(f'Scraping via network ({engine}).')
+        checkpoint = CheckpointStore('gogulong', resume = resume)
+        if incremental:
+            gg_df, incremental_stats = gogulong_scraper_incremental(df_ref,
+                                                                    engine = engine,
+                                                                    use_cache = use_cache,
+                                                                    checkpoint = checkpoint,
+                                                                    window = window,
+                                                                    retrier = retriers['network'])
+        elif engine == 'async':
+            gg_df = gogulong_scraper_async(df_ref, 
+                                           use_cache = use_cache,
+                                           checkpoint = checkpoint,
+                                           retrier = retriers['network'])
+        else:
+            gg_df = gogulong_scraper_network(df_ref, 
+                                             use_cache = use_cache,
+                                             checkpoint = checkpoint,
+                                             retrier = retriers['network'])
         if (len(gg_df) == 0) or (gg_df is None):
             raise Exception
     
     except:
         # resort to selenium scraper method
         logger.info('Resorting to Selenium scraper.')
-        driver = get_chromedriver.create_driver()
-        gg_df = gogulong_scraper_selenium(driver,
-                                          xpath_prod,
-                                          df_ref)
+        driver = get_chromedriver.create_driver(profile = driver_profile)
+        try:
+            # separate journal since selenium records have a different schema
+            checkpoint = CheckpointStore('gogulong_selenium', resume = resume)
+            retriers['selenium'] = fetch_retry.Retrier('gogulong_selenium')
+            gg_df = gogulong_scraper_selenium(driver,
+                                              xpath_prod,
+                                              df_ref,
+                                              checkpoint = checkpoint,
+                                              retrier = retriers['selenium'])
+        finally:
+            driver.quit()
     
     df_gogulong = construct_gogulong_df(gg_df, 
-                                        df_ref)
+                                        df_ref,
+                                        catalog = catalog)
     
     time_finish = dt.now()
+    cache.log_stats('GoGulong')
     
     return {'source' : 'gogulong',
             'df' : df_gogulong,
@@ -328,9 +801,17 @@ def main(df_ref : None):
             'time_start': time_start.strftime('%Y-%m-%d %H:%M:%S'),
             'time_end': time_finish.strftime('%Y-%m-%d %H:%M:%S'),
             'duration': f'{(time_finish-time_start).seconds} secs',
+            'cache' : cache.stats(),
+            'incremental' : incremental_stats,
+            'fetch' : {path : retrier.stats() for path, retrier in retriers.items()},
             }
 
-def main_test(df_ref : None):
+@profiling.stage('gogulong')
+@replay.with_target
+def main_test(df_ref : None,
+              catalog : ReferenceCatalog = None,
+              replay_url : str = None,
+              driver_profile : str = 'scrape'):
     
     time_start = dt.now()
     
@@ -339,37 +820,40 @@ def main_test(df_ref : None):
     
     
     # 2.2 open web page
-    driver = get_chromedriver.create_driver()
-    url_page = 'https://gogulong.ph/search-results?width=' + \
-        w + '&aspectRatio=' + ar + '&rimDiameter=' + d
-    
-    driver.get(url_page)
-    
-    # 2.3 check error message
-    # check if error message for page
-    err_message = len(driver.find_elements(
-        By.XPATH, '//div[@class="searchResultEmptyMessage"]'))
-    
-    gg_df_dict = {}
-    if err_message == 0:
-        driver.implicitly_wait(np.random.randint(1, 5))
-        # get number of items
-        nums = driver.find_elements(By.XPATH, '//span[@class="grey--text"]')
-        num_items = sum([int(n.text[1]) for n in nums])
-        logger.debug('{} items on this page: '.format(num_items))
+    driver = get_chromedriver.create_driver(profile = driver_profile)
+    try:
+        url_page = 'https://gogulong.ph/search-results?width=' + \
+            w + '&aspectRatio=' + ar + '&rimDiameter=' + d
+    
+        replay.get_page(driver, url_page)
+    
+        # 2.3 check error message
+        # check if error message for page
+        err_message = len(driver.find_elements(
+            By.XPATH, '//div[@class="searchResultEmptyMessage"]'))
+    
+        gg_df_dict = {}
+        if err_message == 0:
+            # wait for results to render
+            driver.implicitly_wait(2)
+            # get number of items
+            nums = driver.find_elements(By.XPATH, '//span[@class="grey--text"]')
+            num_items = sum([int(n.text[1]) for n in nums])
+            logger.debug('{} items on this page: '.format(num_items))
         
-        # scrape data
-        gg_df_dict[spec] = scrape_data(driver, 
-                                       xpath_prod) 
+            # scrape data
+            gg_df_dict[spec] = scrape_data(driver, 
+                                           xpath_prod) 
     
-    gg_df = pd.concat(gg_df_dict, axis=0).reset_index(drop = True)
+        gg_df = pd.concat(gg_df_dict, axis=0).reset_index(drop = True)
+    
+    finally:
+        driver.quit()
     
-    df_gogulong_test = construct_gogulong_df(gg_df, df_ref)
+    df_gogulong_test = construct_gogulong_df(gg_df, df_ref, catalog = catalog)
     
     time_finish = dt.now()
     
-    driver.quit()
-    
     return {'source' : 'gogulong',
             'df' : df_gogulong_test,
             'items': len(df_gogulong_test),
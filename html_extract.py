@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 20:31:52 2026
+
+@author: carlo
+"""
+
+# Same extraction as dom_extract but on static HTML fetched without a
+# browser, so listing pages can be scraped without launching Chrome
+
+import re
+import lxml.html
+
+import async_fetcher
+from base_logger import logger
+
+HEADERS = {
+    'accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'accept-language': 'en-US,en;q=0.9',
+    'user-agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123.0.0.0 Safari/537.36',
+}
+
+# elements rendered on their own line(s)
+BLOCK_TAGS = {'address', 'article', 'aside', 'blockquote', 'dd', 'details',
+              'dialog', 'div', 'dl', 'dt', 'fieldset', 'figcaption', 'figure',
+              'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'header',
+              'hr', 'li', 'main', 'nav', 'ol', 'p', 'pre', 'section',
+              'summary', 'table', 'tr', 'ul'}
+
+_WHITESPACE = re.compile(r'\s+')
+
+# elements without visible text
+SKIP_TAGS = {'head', 'noscript', 'script', 'style', 'template'}
+
+def parse(html : str):
+    '''
+    lxml element tree of an HTML page
+    '''
+    return lxml.html.fromstring(html)
+
+def element_text(element, block_tags : set = BLOCK_TAGS) -> str:
+    '''
+    Visible text of an element, one line per block (same lines as
+    WebElement.text for plain markup); attribute values are returned as is
+
+    Parameters
+    ----------
+        - element : lxml element or str
+        - block_tags : set, default BLOCK_TAGS
+            tags rendered on their own line; add tags a site styles as
+            blocks (e.g. 'a')
+
+    DOCTESTS:
+    >>> tree = parse('<div><h3> Dueler \\n H/T </h3><p>Index:<br>91V</p><script>x</script></div>')
+    >>> element_text(tree)
+    'Dueler H/T\\nIndex:\\n91V'
+    >>> element_text(parse('<div><a>Bridgestone</a><a>Dueler</a></div>'), BLOCK_TAGS | {'a'})
+    'Bridgestone\\nDueler'
+    '''
+    if isinstance(element, str):
+        return str(element)
+
+    parts = []
+    def walk(node):
+        # comments and processing instructions have no str tag
+        if (not isinstance(node.tag, str)) or (node.tag in SKIP_TAGS):
+            return
+        block = node.tag in block_tags
+        if block or (node.tag == 'br'):
+            parts.append('\n')
+        # source line breaks are plain whitespace
+        if node.text:
+            parts.append(_WHITESPACE.sub(' ', node.text))
+        for child in node:
+            walk(child)
+            if child.tail:
+                parts.append(_WHITESPACE.sub(' ', child.tail))
+        if block:
+            parts.append('\n')
+
+    walk(element)
+    lines = (' '.join(line.split()) for line in ''.join(parts).split('\n'))
+    return '\n'.join(line for line in lines if line)
+
+def extract_texts(tree, 
+                  xpaths : dict,
+                  block_tags : set = BLOCK_TAGS) -> dict:
+    '''
+    Text of all elements matching each xpath (see dom_extract.extract_texts
+    and element_text)
+    '''
+    return {key : [element_text(node, block_tags) for node in tree.xpath(xpath)]
+            for key, xpath in xpaths.items()}
+
+def extract_tiles(tree,
+                  tile_xpath : str,
+                  fields : dict) -> list:
+    '''
+    Field texts of each product tile (see dom_extract.extract_tiles)
+
+    DOCTESTS:
+    >>> tree = parse('<div class="t"><img src="/img/x-logo.png"><h3>A</h3></div><div class="t"></div>')
+    >>> extract_tiles(tree, '//div[@class="t"]', {'name' : './/h3', 'logo' : '(.//*)[1]/@src'})
+    [{'name': 'A', 'logo': '/img/x-logo.png'}, {'name': None, 'logo': None}]
+    '''
+    tiles = []
+    for tile in tree.xpath(tile_xpath):
+        record = {}
+        for key, xpath in fields.items():
+            found = tile.xpath(xpath)
+            record[key] = element_text(found[0]) if len(found) else None
+        tiles.append(record)
+
+    return tiles
+
+def fetch_pages(urls : list,
+                concurrency : int = 4,
+                rate_per_host : float = 2.0,
+                retrier = None,
+                on_page = None) -> list:
+    '''
+    Fetches and parses pages concurrently over a pooled HTTP session
+
+    Parameters
+    ----------
+        - urls : list of str
+        - concurrency : int, default 4
+            max number of in-flight requests
+        - rate_per_host : float, default 2.0
+            initial requests per second against a host (see
+            async_fetcher.fetch_text_all)
+        - retrier : fetch_retry.Retrier, optional
+            refetches failed pages within the same session
+        - on_page : function, optional
+            called with the index and parsed page (or None) of each url as
+            soon as it is fetched
+
+    Returns
+    -------
+        - trees : list
+            parsed page of each url in order; None for failed requests
+    '''
+    jobs = [{'url' : url, 'headers' : HEADERS} for url in urls]
+    trees = [None] * len(urls)
+    
+    def on_result(ndx, html):
+        try:
+            if html is None:
+                raise ValueError('no response')
+            if isinstance(html, Exception):
+                raise html
+            trees[ndx] = parse(html)
+        except Exception as e:
+            logger.debug(f'Static fetch of {urls[ndx]} failed: {repr(e)}')
+        if on_page is not None:
+            on_page(ndx, trees[ndx])
+    
+    async_fetcher.fetch_text_all(jobs,
+                                 concurrency = concurrency,
+                                 rate_per_host = rate_per_host,
+                                 retrier = retrier,
+                                 on_result = on_result)
+    return trees
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 11:20:33 2026
+
+@author: carlo
+"""
+
+import os
+import json
+import zlib
+from datetime import datetime as dt
+
+from checkpoint import _to_builtin
+from base_logger import logger
+
+class SpecHistory:
+    '''
+    Stores the last scraped records of each tire spec so unchanged specs
+    can be carried forward while only a rolling slice is refreshed per day
+
+    Parameters
+    ----------
+        - source : str
+            scraper name
+        - path : str, optional
+            json file. Defaults to history/<source>_specs.json
+
+    '''
+    def __init__(self,
+                 source : str,
+                 path : str = None):
+        self.source = source
+        self.path = path if path is not None else os.path.join('history',
+                                                               f'{source}_specs.json')
+        self.specs = {}
+
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                self.specs = json.load(f)
+
+    @staticmethod
+    def bucket(spec : str, window : int) -> int:
+        '''
+        Stable refresh day (0 to window-1) of spec
+
+        >>> SpecHistory.bucket('175/65/14', 7)
+        1
+        '''
+        return zlib.crc32(spec.encode('utf-8')) % window
+
+    def age(self, spec : str, today : dt = None) -> int:
+        '''
+        Days since spec was last scraped
+        '''
+        today = dt.now() if today is None else today
+        fetched_at = dt.fromisoformat(self.specs[spec]['fetched_at'])
+        return (today - fetched_at).days
+
+    def plan(self,
+             specs : list,
+             window : int = 7,
+             today : dt = None) -> tuple:
+        '''
+        Splits today's specs into specs to scrape and specs to carry forward
+
+        New specs are always scraped. Unchanged specs are refreshed when
+        today is their bucket day or when their data is older than window days.
+
+        Parameters
+        ----------
+            - specs : list
+                today's correct_specs to be scraped
+            - window : int, default 7
+                number of days over which all unchanged specs are refreshed
+            - today : datetime, optional
+
+        Returns
+        -------
+            - to_scrape : list
+            - carried : list
+
+        '''
+        today = dt.now() if today is None else today
+        day = today.date().toordinal() % window
+
+        to_scrape, carried = [], []
+        for spec in specs:
+            if (spec not in self.specs) or (self.bucket(spec, window) == day) \
+                or (self.age(spec, today) >= window):
+                to_scrape.append(spec)
+            else:
+                carried.append(spec)
+
+        new = len([s for s in specs if s not in self.specs])
+        logger.info(f'{self.source} incremental plan: {new} new, '
+                    f'{len(to_scrape) - new} refreshed, {len(carried)} carried forward.')
+
+        return to_scrape, carried
+
+    def get(self, spec : str) -> list:
+        return self.specs[spec]['records']
+
+    def update(self,
+               spec : str,
+               records : list,
+               fetched_at : dt = None):
+        fetched_at = dt.now() if fetched_at is None else fetched_at
+        self.specs[spec] = {'fetched_at' : fetched_at.isoformat(timespec = 'seconds'),
+                            'records' : records}
+
+    def save(self, specs : list = None):
+        '''
+        Writes history to disk, dropping specs no longer in the catalog
+        '''
+        if specs is not None:
+            self.specs = {s : v for s, v in self.specs.items() if s in specs}
+
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok = True)
+
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.specs, f, default = _to_builtin)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 17:12:44 2026
+
+@author: carlo
+"""
+
+import numpy as np
+import pandas as pd
+
+def encode_keys(frames : list, on : list) -> list:
+    '''
+    Encodes the key columns of several dataframes into one int64 key per
+    row, using codes shared by all frames. NaN keys are equal to each other
+    (same as pd.merge).
+
+    Parameters
+    ----------
+        - frames : list of pd.DataFrame
+        - on : list of str
+            key columns present in all frames
+
+    Returns
+    -------
+        - keys : list of np.ndarray
+            int64 key array of each frame
+        - uniques : list of np.ndarray
+            decoded values of each key column (see decode_keys)
+
+    DOCTESTS:
+    >>> a = pd.DataFrame({'name' : ['X', 'Y'], 'brand' : ['B', 'B']})
+    >>> b = pd.DataFrame({'name' : ['Y', 'Z'], 'brand' : ['B', 'B']})
+    >>> keys, uniques = encode_keys([a, b], ['name', 'brand'])
+    >>> [k.tolist() for k in keys]
+    [[0, 1], [1, 2]]
+    '''
+    bounds = np.cumsum([0] + [len(f) for f in frames])
+    keys = np.zeros(bounds[-1], dtype = np.int64)
+    uniques = []
+    for col in on:
+        values = np.concatenate([np.asarray(f[col], dtype = object) for f in frames])
+        codes, col_uniques = pd.factorize(values, use_na_sentinel = False)
+        keys = keys * len(col_uniques) + codes
+        uniques.append(col_uniques)
+
+    return [keys[bounds[i]:bounds[i+1]] for i in range(len(frames))], uniques
+
+def decode_keys(keys : np.ndarray, uniques : list) -> list:
+    '''
+    Key column values of encoded keys (inverse of encode_keys)
+    '''
+    values = []
+    for col_uniques in uniques[::-1]:
+        keys, codes = np.divmod(keys, len(col_uniques))
+        values.append(np.asarray(col_uniques, dtype = object)[codes])
+    return values[::-1]
+
+def outer_join_index(left_keys : np.ndarray,
+                     right_keys : np.ndarray) -> tuple:
+    '''
+    Row indices of a full outer join on integer keys; -1 marks a missing
+    side. Keys on both sides give all left x right row pairs (same rows as
+    pd.merge how='outer'). Left rows come first in order, followed by right
+    rows whose key is not on the left.
+
+    DOCTESTS:
+    >>> left, right = outer_join_index(np.array([5, 7]), np.array([7, 7, 9]))
+    >>> left.tolist(), right.tolist()
+    ([0, 1, 1, -1], [-1, 0, 1, 2])
+    '''
+    order = np.argsort(right_keys, kind = 'stable')
+    sorted_keys = right_keys[order]
+    lo = np.searchsorted(sorted_keys, left_keys, 'left')
+    counts = np.searchsorted(sorted_keys, left_keys, 'right') - lo
+
+    # one row per match, or a single unmatched row
+    reps = np.maximum(counts, 1)
+    left_idx = np.repeat(np.arange(len(left_keys)), reps)
+    offsets = np.arange(len(left_idx)) - np.repeat(np.cumsum(reps) - reps, reps)
+    matched = np.repeat(counts, reps) > 0
+    right_idx = np.full(len(left_idx), -1, dtype = np.int64)
+    right_idx[matched] = order[(np.repeat(lo, reps) + offsets)[matched]]
+
+    right_only = np.flatnonzero(~np.isin(right_keys, left_keys))
+    return (np.concatenate([left_idx, np.full(len(right_only), -1)]),
+            np.concatenate([right_idx, right_only]))
+
+def take(values, idx : np.ndarray) -> np.ndarray:
+    '''
+    values[idx] with NaN where idx is -1 (ints are upcast only if needed)
+    '''
+    return pd.api.extensions.take(np.asarray(values), idx, allow_fill = True)
@@ -9,22 +9,95 @@ import pandas as pd
 import numpy as np
 #from datetime import timedelta, date
 from datetime import datetime as dt
+import io
 import json
+import requests
 from functools import reduce
 import gspread
 import time
 import re
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # custom modules
 import gogulong_scraper, tiremanila_scraper, partspro_scraper
-import bq_functions, cleaner_functions
+import bq_functions, cleaner_functions, keyed_join, record_linkage, rate_limiter, replay, metrics, profiling
+from reference_catalog import ReferenceCatalog
+from driver_pool import DriverPool
 
 from base_logger import logger
 
-def get_gulong_data() -> pd.DataFrame:
+# Gulong backend export, redash query 131
+# http://app.redash.licagroup.ph/queries/131
+GULONG_URL = "http://app.redash.licagroup.ph/api/queries/131/results.csv?api_key=FqpOO9ePYQhAXrtdqsXSt2ZahnUZ2XCh3ooFogzY"
+
+@metrics.span('clean')
+def normalize_gulong_data(df : pd.DataFrame,
+                          vectorized : bool = True) -> pd.DataFrame:
+    '''
+    Cleans tire size, name and sku_name columns of gulong backend data
+    
+    Parameters
+    ----------
+    df : dataframe
+        Renamed and filtered gulong.ph backend data
+    vectorized : bool, default True
+        use vectorized column cleaners; False runs the row-wise cleaners
+    
+    Returns
+    -------
+    df : dataframe
+        dataframe with cleaned width, aspect_ratio, diameter, raw_specs,
+        correct_specs, name and sku_name columns
+    '''
+    if vectorized:
+        width = cleaner_functions.clean_width_series(df['width'])
+        aspect_ratio = cleaner_functions.clean_aspect_ratio_series(df['aspect_ratio'])
+        diameter = cleaner_functions.clean_diameter_series(df['diameter'])
+        name = cleaner_functions.fix_names_series(df['name'])
+        
+        df = df.assign(width = width,
+                       aspect_ratio = aspect_ratio,
+                       diameter = diameter,
+                       raw_specs = cleaner_functions.combine_specs_series(width, aspect_ratio, 
+                                                                          diameter, mode = 'SKU'),
+                       correct_specs = cleaner_functions.combine_specs_series(width, aspect_ratio, 
+                                                                              diameter, mode = 'MATCH'),
+                       name = name,
+                       sku_name = cleaner_functions.combine_sku_series(df['brand'].astype(str),
+                                                                       width.astype(str),
+                                                                       aspect_ratio.astype(str),
+                                                                       diameter.astype(str),
+                                                                       name.astype(str),
+                                                                       df['load_rating'].astype(str),
+                                                                       df['speed_rating'].astype(str)))
+        return df
+    
+    df.loc[:, 'width'] = df.apply(lambda x: cleaner_functions.clean_width(x['width']), axis=1)
+    df.loc[:, 'aspect_ratio'] = df.apply(lambda x: cleaner_functions.clean_aspect_ratio(x['aspect_ratio']), axis=1)    
+    df.loc[:, 'diameter'] = df.apply(lambda x: cleaner_functions.clean_diameter(x['diameter']), axis=1)
+    df.loc[:, 'raw_specs'] = df.apply(lambda x: cleaner_functions.combine_specs(x['width'], x['aspect_ratio'], x['diameter'], mode = 'SKU'), axis=1)
+    df.loc[:, 'correct_specs'] = df.apply(lambda x: cleaner_functions.combine_specs(x['width'], x['aspect_ratio'], x['diameter'], mode = 'MATCH'), axis=1)
+    df.loc[:, 'name'] = df.apply(lambda x: cleaner_functions.fix_names(x['name']), axis=1)
+    df.loc[:, 'sku_name'] = df.apply(lambda x: cleaner_functions.combine_sku(str(x['brand']), 
+                                                           str(x['width']),
+                                                           str(x['aspect_ratio']),
+                                                           str(x['diameter']),
+                                                           str(x['name']), 
+                                                           str(x['load_rating']), 
+                                                           str(x['speed_rating'])), 
+                                                           axis=1)
+    return df
+
+@profiling.stage('get_gulong_data')
+def get_gulong_data(vectorized : bool = True) -> pd.DataFrame:
     '''
     Get gulong.ph data from backend
     
+    Parameters
+    ----------
+    vectorized : bool, default True
+        clean catalog columns with vectorized cleaners
+    
     Returns
     -------
     df : dataframe
@@ -35,10 +108,14 @@ def get_gulong_data() -> pd.DataFrame:
     
     try:
         ## 1. Import from redash query api key
-        # http://app.redash.licagroup.ph/queries/131
-        url1 =  "http://app.redash.licagroup.ph/api/queries/131/results.csv?api_key=FqpOO9ePYQhAXrtdqsXSt2ZahnUZ2XCh3ooFogzY"
-        
-        df = pd.read_csv(url1, 
+        with metrics.span('fetch'):
+            response = requests.get(replay.url(GULONG_URL))
+        response.raise_for_status()
+        metrics.count('requests')
+        metrics.count('bytes', len(response.content))
+        replay.record('GET', GULONG_URL, None, response.status_code,
+                      response.headers.get('content-type'), response.text)
+        df = pd.read_csv(io.StringIO(response.text), 
                          parse_dates = ['supplier_price_date_updated',
                                         'product_price_date_updated'],
                          date_format = '%m/%d/%y %H:%M')
@@ -55,20 +132,7 @@ def get_gulong_data() -> pd.DataFrame:
         ## 3. Perform data filtering and cleaning
         df.loc[df['sale_tag']==0, 'price_gulong'] = df.loc[df['sale_tag']==0, 'srp']
         df = df[df.activity == 1]
-        df.loc[:, 'width'] = df.apply(lambda x: cleaner_functions.clean_width(x['width']), axis=1)
-        df.loc[:, 'aspect_ratio'] = df.apply(lambda x: cleaner_functions.clean_aspect_ratio(x['aspect_ratio']), axis=1)    
-        df.loc[:, 'diameter'] = df.apply(lambda x: cleaner_functions.clean_diameter(x['diameter']), axis=1)
-        df.loc[:, 'raw_specs'] = df.apply(lambda x: cleaner_functions.combine_specs(x['width'], x['aspect_ratio'], x['diameter'], mode = 'SKU'), axis=1)
-        df.loc[:, 'correct_specs'] = df.apply(lambda x: cleaner_functions.combine_specs(x['width'], x['aspect_ratio'], x['diameter'], mode = 'MATCH'), axis=1)
-        df.loc[:, 'name'] = df.apply(lambda x: cleaner_functions.fix_names(x['name']), axis=1)
-        df.loc[:, 'sku_name'] = df.apply(lambda x: cleaner_functions.combine_sku(str(x['brand']), 
-                                                               str(x['width']),
-                                                               str(x['aspect_ratio']),
-                                                               str(x['diameter']),
-                                                               str(x['name']), 
-                                                               str(x['load_rating']), 
-                                                               str(x['speed_rating'])), 
-                                                               axis=1)
+        df = normalize_gulong_data(df, vectorized = vectorized)
         df = df[df.name != '-']
         
     except Exception as e:
@@ -77,7 +141,11 @@ def get_gulong_data() -> pd.DataFrame:
     return df[show_cols]
            
 
-def get_intersection(df_gulong, df_gogulong, df_tiremanila, df_partspro):
+@profiling.stage('get_intersection')
+@metrics.span('merge')
+def get_intersection(df_gulong, df_gogulong, df_tiremanila, df_partspro,
+                     engine : str = 'keyed',
+                     link : bool = False):
     '''
     Parameters
     ----------
@@ -86,14 +154,106 @@ def get_intersection(df_gulong, df_gogulong, df_tiremanila, df_partspro):
         Scraped gulong.ph data
     df_gogulong : dataframe
         Scraped gogulong.ph data
-    save : bool
-        Save file to csv. The default is True.
+    df_tiremanila : dataframe
+        Scraped tiremanila data
+    df_partspro : dataframe
+        Scraped partspro data
+    engine : str, default 'keyed'
+        'keyed' joins on integer-encoded keys; 'merge' runs the chained
+        outer pd.merge (reference implementation)
+    link : bool, default False
+        link near-miss competitor names to gulong names of the same brand and
+        correct_specs before joining; adds match_confidence column (lowest
+        confidence of the competitor rows joined, 100 for exact matches)
     
     Returns
     -------
     
     df_merged: pd.DataFrame
     
+    '''
+    if engine == 'merge':
+        if link:
+            raise ValueError("link requires engine = 'keyed'")
+        return _get_intersection_merge(df_gulong, df_gogulong, df_tiremanila, df_partspro)
+    
+    on = ['name', 'brand', 'correct_specs']
+    sources = {'gulong' : df_gulong,
+               'gogulong' : df_gogulong,
+               'tiremanila' : df_tiremanila,
+               'partspro' : df_partspro}
+    competitors = ['gogulong', 'tiremanila', 'partspro']
+    if link:
+        for source in competitors:
+            sources[source] = record_linkage.link_to_reference(df_gulong, sources[source], 
+                                                               source = source)
+    
+    source_keys, uniques = keyed_join.encode_keys(list(sources.values()), on)
+    source_keys = dict(zip(sources.keys(), source_keys))
+    
+    ## outer join of all sources as row indices into each source (-1 if missing)
+    keys = source_keys['gulong']
+    rows = {'gulong' : np.arange(len(keys))}
+    for source in competitors:
+        left, right = keyed_join.outer_join_index(keys, source_keys[source])
+        keys = np.concatenate([keys[left[left >= 0]], 
+                               source_keys[source][right[left < 0]]])
+        rows = {s : np.append(idx, -1)[left] for s, idx in rows.items()}
+        rows[source] = right
+    
+    def col(source, name):
+        return keyed_join.take(sources[source][name], rows[source])
+    
+    prices = {p : col(s, p) for s, p in [('gulong', 'price_gulong'),
+                                         ('gogulong', 'price_gogulong'),
+                                         ('partspro', 'price_partspro'),
+                                         ('tiremanila', 'price_tiremanila')]}
+    has = {p : pd.notna(v) for p, v in prices.items()}
+    sku_name = {s : col(s, 'sku_name') for s in sources}
+    raw_specs = {s : col(s, 'raw_specs') for s in sources}
+    competitor = has['price_gogulong'] | has['price_tiremanila'] | has['price_partspro']
+    
+    ## output rows: products on gulong.ph with competitor prices, gulong only
+    ## products, then competitor products missing a gulong price
+    parts = [('gulong', competitor & pd.notna(sku_name['gulong'])),
+             ('gulong', has['price_gulong'] & ~competitor),
+             ('tiremanila', ~has['price_gulong'] & has['price_tiremanila']),
+             ('gogulong', ~has['price_gulong'] & has['price_gogulong']),
+             ('partspro', ~has['price_gulong'] & has['price_partspro'])]
+    
+    sel = np.concatenate([np.flatnonzero(mask) for _, mask in parts])
+    df_ = pd.DataFrame({'sku_name' : np.concatenate([sku_name[s][mask] for s, mask in parts]),
+                        'raw_specs' : np.concatenate([raw_specs[s][mask] for s, mask in parts]),
+                        **{p : prices[p][sel] for p in prices},
+                        'qty_tiremanila' : col('tiremanila', 'qty_tiremanila')[sel],
+                        'year' : col('tiremanila', 'year')[sel],
+                        **dict(zip(on, keyed_join.decode_keys(keys[sel], uniques)))})
+    if link:
+        # weakest name link among competitor rows joined
+        df_['match_confidence'] = np.fmin.reduce([col(s, 'match_confidence')[sel].astype(float) 
+                                                  for s in competitors])
+    
+    # sort by raw_specs (NaN last) through its sorted codes
+    codes = pd.factorize(df_['raw_specs'], sort = True)[0]
+    df_ = df_.take(np.argsort(np.where(codes < 0, codes.max(initial = -1) + 1, codes), kind = 'stable'))
+    # remove duplicates and cleaning
+    df_ = df_.drop_duplicates().reset_index(drop = True)
+    # remove '' values
+    obj_cols = df_.columns[df_.dtypes == object]
+    df_[obj_cols] = df_[obj_cols].replace(to_replace = '', value = np.NaN)
+    # insert date
+    df_['date'] = dt.today().date().strftime('%Y-%m-%d')
+    # reorder columns
+    df_final = df_[['date', 'raw_specs', 'sku_name', 'price_gulong', 'price_gogulong',
+                        'price_partspro', 'price_tiremanila', 'qty_tiremanila',
+                        'year', 'brand', 'name', 'correct_specs'] + 
+                   (['match_confidence'] if link else [])]
+    
+    return df_final
+
+def _get_intersection_merge(df_gulong, df_gogulong, df_tiremanila, df_partspro):
+    '''
+    get_intersection through chained outer merges on the object key columns
     '''
     gulong_cols = ['sku_name', 'name', 'brand', 'price_gulong', 'raw_specs', 
                    'correct_specs']
@@ -176,6 +336,8 @@ def get_intersection(df_gulong, df_gogulong, df_tiremanila, df_partspro):
     
     return df_final
 
+@profiling.stage('write_to_gsheet')
+@metrics.span('write')
 def write_to_gsheet(df):
     '''
     Creates new sheet in designated googlesheet and writes selected data from df
@@ -245,19 +407,28 @@ def upload_gsheet_to_bq(df_ref = None):
     # clean SKU
     df_all_.loc[df_all_.brand.apply(lambda x: re.search('BFGOODRICH.+', x) is not None), 'sku_name'] = df_all_.loc[df_all_.brand.apply(lambda x: re.search('BFGOODRICH.+', x) is not None), :].apply(lambda x: re.sub('BFG', 'BFGOODRICH', x['sku_name']), axis=1)
     
-    df_all_['name'] = df_all_.apply(lambda x: cleaner_functions.fix_names(x['name'], df_ref), axis=1)
+    catalog = ReferenceCatalog(df_ref) if df_ref is not None else None
+    df_all_['name'] = cleaner_functions.fix_names_series(df_all_['name'], catalog)
     df_all_.loc[df_all_.raw_specs == '265/6/R18', 'raw_specs'] = '265/60/R18'
-    df_all_['width'], df_all_['aspect_ratio'], df_all_['diameter'] = zip(*df_all_.loc[:, 'raw_specs'].map(cleaner_functions.clean_tire_size))
-    df_all_.loc[:, 'raw_specs'] = df_all_.apply(lambda x: cleaner_functions.combine_specs(str(x['width']), str(x['aspect_ratio']), str(x['diameter']), mode = 'SKU'), axis=1)
-    df_all_.loc[:, 'correct_specs'] = df_all_.apply(lambda x: cleaner_functions.combine_specs(x['width'], x['aspect_ratio'], x['diameter'], mode = 'MATCH'), axis=1)
+    df_all_['width'], df_all_['aspect_ratio'], df_all_['diameter'] = zip(*cleaner_functions.map_unique(cleaner_functions.clean_tire_size,
+                                                                                                        df_all_['raw_specs']))
+    df_all_.loc[:, 'raw_specs'] = cleaner_functions.map_unique(lambda w, ar, d: cleaner_functions.combine_specs(str(w), str(ar), str(d), mode = 'SKU'),
+                                                               df_all_['width'], df_all_['aspect_ratio'], df_all_['diameter'],
+                                                               name = 'combine_specs')
+    df_all_.loc[:, 'correct_specs'] = cleaner_functions.map_unique(cleaner_functions.combine_specs,
+                                                                   df_all_['width'], df_all_['aspect_ratio'], df_all_['diameter'],
+                                                                   mode = 'MATCH')
     #df_all_['sku_name'] = df_all_.apply(lambda x: re.sub('  ', ' ',' '.join([x['brand'], re.sub('  ', ' ', re.sub(x['brand'], '', x['sku_name']))])).strip().upper(), axis=1)
-    df_all_['sku_name'] = df_all_.apply(lambda x: cleaner_functions.combine_sku(str(x['brand']),
-                                                                                 str(x['width']),
-                                                                                 str(x['aspect_ratio']),
-                                                                                 str(x['diameter']),
-                                                                                 str(x['name']),
-                                                                                 np.NaN,
-                                                                                 np.NaN), axis=1)
+    df_all_['sku_name'] = cleaner_functions.map_unique(lambda make, w, ar, d, model: cleaner_functions.combine_sku(str(make),
+                                                                                                                 str(w),
+                                                                                                                 str(ar),
+                                                                                                                 str(d),
+                                                                                                                 str(model),
+                                                                                                                 np.NaN,
+                                                                                                                 np.NaN),
+                                                       df_all_['brand'], df_all_['width'], df_all_['aspect_ratio'],
+                                                       df_all_['diameter'], df_all_['name'], name = 'combine_sku')
+    logger.info(f'Cleaner dedupe stats: {cleaner_functions.get_map_stats()}')
     
     df_all_ = df_all_.replace(to_replace = '', value = np.NaN)
     df_all_ = df_all_[df_all_.price_tiremanila != 'COOPER 305/70R16 STT PRO'].reset_index(drop = True)
@@ -294,6 +465,7 @@ def init_bq(table_name : str = 'gulong_wheel_size') -> dict:
             'table_id' : table_id}
     
         
+@metrics.span('write')
 def load_save_data(bq_dict : dict,
                    df : pd.DataFrame = None,
                    ls : str = 'load',
@@ -338,102 +510,280 @@ def load_save_data(bq_dict : dict,
     else:
         return None
 
-def main(save : bool = True,
-         platform : str = 'all'):
+SCRAPERS = {'gogulong' : gogulong_scraper,
+            'tiremanila' : tiremanila_scraper,
+            'partspro' : partspro_scraper}
+
+def run_scrapers(df_gulong : pd.DataFrame,
+                 concurrent : bool = False,
+                 test : bool = False,
+                 resume : bool = False,
+                 incremental : bool = False,
+                 catalog : ReferenceCatalog = None,
+                 pool_size : int = 1,
+                 driver_profile : str = 'scrape') -> dict:
+    '''
+    Runs all competitor scrapers either one after another or concurrently
+    (one worker thread per scraper, each with its own driver/session)
     
-    time_start = dt.now()
-    ## 1. Import gulong backend data
-    df_gulong = get_gulong_data()
-    gulong_time = dt.now()
+    Parameters
+    ----------
+        - df_gulong : pd.DataFrame
+            df_gulong from get_gulong_data function
+        - concurrent : bool, default False
+            run scrapers in parallel worker threads (opt-in, e.g. from the
+            command line)
+        - test : bool, default False
+            use each scraper's main_test instead of main
+        - resume : bool, default False
+            resume each scraper from its checkpoint journal (ignored in test)
+        - incremental : bool, default False
+            GoGulong only scrapes new specs and a rolling slice of unchanged
+            specs (ignored in test)
+        - catalog : ReferenceCatalog, optional
+            reference data shared by all scrapers; built from df_gulong if
+            not given
+        - pool_size : int, default 1
+            number of Chrome drivers shared by the Tiremanila and PartsPro
+            page scrapers; pages are scraped one at a time if 1 (ignored in test)
+        - driver_profile : str, default 'scrape'
+            get_chromedriver.create_driver profile of all Selenium drivers
+            ('default' for a full browser)
     
-    logger.info('Starting GoGulong Scraper.')
-    ## 2. Gogulong scraper 
-    gogulong_dict = gogulong_scraper.main(df_gulong)
-
+    Returns
+    -------
+        - scraper_dicts : dict
+            result dict of each scraper with source as key
     
-    logger.info('Starting Tiremanila Scraper.')
-    ## 3. Tiremanila scraper
-    tiremanila_dict = tiremanila_scraper.main(df_gulong)
-
+    '''
+    catalog = ReferenceCatalog(df_gulong) if catalog is None else catalog
+    kwargs = {source : {'catalog' : catalog, 'driver_profile' : driver_profile} if test else 
+              {'resume' : resume, 'catalog' : catalog, 'driver_profile' : driver_profile} 
+              for source in SCRAPERS}
+    if not test:
+        kwargs['gogulong']['incremental'] = incremental
+    
+    pool = DriverPool(pool_size, profile = driver_profile) if (pool_size > 1) and (not test) else None
+    if pool is not None:
+        kwargs['tiremanila']['pool'] = pool
+        kwargs['partspro']['pool'] = pool
     
-    logger.info('Starting PartsPro Scraper.')
-    ## 4. PartsPro scraper
-    partspro_dict = partspro_scraper.main(df_gulong)
-    
-    ## 5. Merge/get intersection of product lists
-    df_merged = get_intersection(df_gulong, 
-                                 gogulong_dict['df'], 
-                                 tiremanila_dict['df'], 
-                                 partspro_dict['df'])
-    
-    ## 6. Save
-    if save:
-        if platform.lower() in ['all', 'gsheet']:
-            # 8. Write to gsheet
-            write_to_gsheet(df_merged.fillna('').drop('date', axis=1))
+    try:
+        return _run_scrapers(df_gulong, kwargs, concurrent, test)
+    finally:
+        if pool is not None:
+            pool.close()
+
+def _run_scrapers(df_gulong : pd.DataFrame,
+                  kwargs : dict,
+                  concurrent : bool,
+                  test : bool) -> dict:
+    scraper_dicts = {}
+    if not concurrent:
+        for source, scraper in SCRAPERS.items():
+            logger.info(f'Starting {source} scraper.')
+            scraper_main = scraper.main_test if test else scraper.main
+            # spans and counters of each scraper are kept under its name
+            scraper_dicts[source] = metrics.span(source)(scraper_main)(df_gulong, **kwargs[source])
         
-        if platform.lower() in ['all', 'bq']:
-            bq_dict = init_bq('competitor_price_matching')
-            load_save_data(bq_dict, df_merged, 
-                           ls = 'save', 
-                           mode = 'WRITE_APPEND')
-            
-    results = {'gulong' : {'source' : 'gulong',
-                           'df' : df_gulong,
-                           'items' : len(df_gulong),
-                           'time_start' : time_start,
-                           'time_end' : gulong_time,
-                           'duration' :  f'{(gulong_time-time_start).seconds} secs'},
-               'gogulong': gogulong_dict,
-               'tiremanila' : tiremanila_dict,
-               'partspro' : partspro_dict,
-               'merged' : {'df' : df_merged,
-                           'json' : df_merged.to_json(orient = 'index')}
-               }
-    
-    return results
+        return scraper_dicts
+    
+    with ThreadPoolExecutor(max_workers = len(SCRAPERS)) as executor:
+        futures = {}
+        for source, scraper in SCRAPERS.items():
+            logger.info(f'Starting {source} scraper (concurrent).')
+            scraper_main = scraper.main_test if test else scraper.main
+            futures[executor.submit(metrics.span(source)(scraper_main), 
+                                    df_gulong, **kwargs[source])] = source
+        
+        errors = {}
+        for future in as_completed(futures):
+            source = futures[future]
+            try:
+                scraper_dicts[source] = future.result()
+                logger.info(f'{source} scraper finished in {scraper_dicts[source]["duration"]}.')
+            except Exception as e:
+                logger.error(f'{source} scraper failed: {e}')
+                errors[source] = e
+    
+    if len(errors):
+        # propagate first failure after all workers have stopped
+        raise list(errors.values())[0]
+    
+    return scraper_dicts
 
-def main_test():
+@replay.with_target
+def main(save : bool = True,
+         platform : str = 'all',
+         concurrent : bool = False,
+         resume : bool = False,
+         incremental : bool = False,
+         memoize : bool = False,
+         link : bool = False,
+         pool_size : int = 1,
+         replay_url : str = None,
+         record : str = None,
+         metrics_path : str = None,
+         driver_profile : str = 'scrape'):
     
     time_start = dt.now()
-    ## 1. Import gulong backend data
-    df_gulong = get_gulong_data()
-    gulong_time = dt.now()
-    
-    logger.info('Starting GoGulong Scraper - Test')
-    ## 2. Gogulong scraper 
-    gogulong_dict = gogulong_scraper.main_test(df_gulong)
-
-    
-    logger.info('Starting Tiremanila Scraper - Test')
-    ## 3. Tiremanila scraper
-    tiremanila_dict = tiremanila_scraper.main_test(df_gulong)
+    metrics.reset()
+    # learned and backed-off host rates of earlier runs do not carry over
+    rate_limiter.LIMITER.reset()
+    cleaner_functions.reset_map_stats()
+    if memoize:
+        # share cleaned values of recurring raw strings across sources
+        cleaner_functions.enable_memoization()
+        cleaner_functions.clear_memo_caches()
+    try:
+        ## 1. Import gulong backend data
+        with metrics.span('gulong'):
+            df_gulong = get_gulong_data()
+        catalog = ReferenceCatalog(df_gulong)
+        gulong_time = dt.now()
+    
+        ## 2 - 4. GoGulong, Tiremanila, PartsPro scrapers
+        if record is not None:
+            replay.start_recording(record)
+        try:
+            scraper_dicts = run_scrapers(df_gulong, 
+                                         concurrent = concurrent,
+                                         resume = resume,
+                                         incremental = incremental,
+                                         catalog = catalog,
+                                         pool_size = pool_size,
+                                         driver_profile = driver_profile)
+        finally:
+            replay.stop_recording()
+        gogulong_dict = scraper_dicts['gogulong']
+        tiremanila_dict = scraper_dicts['tiremanila']
+        partspro_dict = scraper_dicts['partspro']
+    
+        ## 5. Merge/get intersection of product lists
+        df_merged = get_intersection(df_gulong, 
+                                     gogulong_dict['df'], 
+                                     tiremanila_dict['df'], 
+                                     partspro_dict['df'],
+                                     link = link)
+    
+        ## 6. Save
+        if save:
+            if platform.lower() in ['all', 'gsheet']:
+                # 8. Write to gsheet
+                write_to_gsheet(df_merged.fillna('').drop('date', axis=1))
+        
+            if platform.lower() in ['all', 'bq']:
+                bq_dict = init_bq('competitor_price_matching')
+                load_save_data(bq_dict, df_merged, 
+                               ls = 'save', 
+                               mode = 'WRITE_APPEND')
+            
+        results = {'gulong' : {'source' : 'gulong',
+                               'df' : df_gulong,
+                               'items' : len(df_gulong),
+                               'time_start' : time_start,
+                               'time_end' : gulong_time,
+                               'duration' :  f'{(gulong_time-time_start).seconds} secs'},
+                   'gogulong': gogulong_dict,
+                   'tiremanila' : tiremanila_dict,
+                   'partspro' : partspro_dict,
+                   'merged' : {'df' : df_merged,
+                               'json' : df_merged.to_json(orient = 'index')},
+                   'cleaner_stats' : cleaner_functions.get_map_stats(),
+                   'memo_stats' : cleaner_functions.get_memo_stats(),
+                   'rate_limits' : rate_limiter.LIMITER.stats()
+                   }
+        # summary of run spans and counters, also kept as a file per run
+        metrics_path = f'metrics/run_{time_start:%Y%m%d_%H%M%S}.json' if metrics_path is None else metrics_path
+        results['metrics'] = metrics.save(metrics_path)
+    
+        return results
+    finally:
+        if memoize:
+            # memo caches are module-global; later runs start without them
+            cleaner_functions.disable_memoization()
 
+@replay.with_target
+def main_test(concurrent : bool = False,
+              memoize : bool = False,
+              link : bool = False,
+              replay_url : str = None,
+              record : str = None,
+              metrics_path : str = None,
+              driver_profile : str = 'scrape'):
     
-    logger.info('Starting PartsPro Scraper - Test')
-    ## 4. PartsPro scraper
-    partspro_dict = partspro_scraper.main_test(df_gulong)
-    
-    ## 5. Merge/get intersection of product lists
-    df_merged = get_intersection(df_gulong, 
-                                 gogulong_dict['df'], 
-                                 tiremanila_dict['df'], 
-                                 partspro_dict['df'])
-    
-    results = {'gulong' : {'source' : 'gulong',
-                           'df' : df_gulong,
-                           'items' : len(df_gulong),
-                           'time_start' : time_start,
-                           'time_end' : gulong_time,
-                           'duration' :  f'{(gulong_time-time_start).seconds} secs'},
-               'gogulong': gogulong_dict,
-               'tiremanila' : tiremanila_dict,
-               'partspro' : partspro_dict,
-               'merged' : {'df' : df_merged,
-                           'json' : df_merged.to_json(orient = 'index')}
-               }
-    
-    return results
+    time_start = dt.now()
+    metrics.reset()
+    rate_limiter.LIMITER.reset()
+    cleaner_functions.reset_map_stats()
+    if memoize:
+        cleaner_functions.enable_memoization()
+        cleaner_functions.clear_memo_caches()
+    try:
+        ## 1. Import gulong backend data
+        with metrics.span('gulong'):
+            df_gulong = get_gulong_data()
+        catalog = ReferenceCatalog(df_gulong)
+        gulong_time = dt.now()
+    
+        ## 2 - 4. GoGulong, Tiremanila, PartsPro scrapers
+        if record is not None:
+            replay.start_recording(record)
+        try:
+            scraper_dicts = run_scrapers(df_gulong, 
+                                         concurrent = concurrent,
+                                         test = True,
+                                         catalog = catalog,
+                                         driver_profile = driver_profile)
+        finally:
+            replay.stop_recording()
+        gogulong_dict = scraper_dicts['gogulong']
+        tiremanila_dict = scraper_dicts['tiremanila']
+        partspro_dict = scraper_dicts['partspro']
+    
+        ## 5. Merge/get intersection of product lists
+        df_merged = get_intersection(df_gulong, 
+                                     gogulong_dict['df'], 
+                                     tiremanila_dict['df'], 
+                                     partspro_dict['df'],
+                                     link = link)
+    
+        results = {'gulong' : {'source' : 'gulong',
+                               'df' : df_gulong,
+                               'items' : len(df_gulong),
+                               'time_start' : time_start,
+                               'time_end' : gulong_time,
+                               'duration' :  f'{(gulong_time-time_start).seconds} secs'},
+                   'gogulong': gogulong_dict,
+                   'tiremanila' : tiremanila_dict,
+                   'partspro' : partspro_dict,
+                   'merged' : {'df' : df_merged,
+                               'json' : df_merged.to_json(orient = 'index')},
+                   'cleaner_stats' : cleaner_functions.get_map_stats(),
+                   'memo_stats' : cleaner_functions.get_memo_stats(),
+                   'rate_limits' : rate_limiter.LIMITER.stats()
+                   }
+        metrics_path = f'metrics/test_{time_start:%Y%m%d_%H%M%S}.json' if metrics_path is None else metrics_path
+        results['metrics'] = metrics.save(metrics_path)
+    
+        return results
+    finally:
+        if memoize:
+            # memo caches are module-global; later runs start without them
+            cleaner_functions.disable_memoization()
 
 if __name__ == "__main__":
-    results = main(save = True, platform = 'all')
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--profile', default = None,
+                        help = f'stages to profile, comma-separated or all: {", ".join(sorted(profiling.STAGES))}')
+    parser.add_argument('--profile-mode', choices = profiling.MODES, default = 'cprofile')
+    parser.add_argument('--profile-dir', default = 'profiles')
+    parser.add_argument('--profile-top', type = int, default = 25)
+    args = parser.parse_args()
+    # overrides SCRAPER_PROFILE* environment variables
+    if args.profile:
+        profiling.configure(args.profile, mode = args.profile_mode,
+                            folder = args.profile_dir, top = args.profile_top)
+    
+    results = main(save = True, platform = 'all', concurrent = True)
\ No newline at end of file
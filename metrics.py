@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 00:48:30 2026
+
+@author: carlo
+
+Run metrics: nested timing spans and counters shared by all modules.
+
+    with metrics.span('fetch'):
+        ...
+
+    @metrics.span('clean')
+    def construct_df(...):
+        ...
+
+    metrics.count('requests')
+
+Spans nest per thread (e.g. 'gogulong/fetch'). Counters are kept per top
+span of the thread (e.g. the scraper a request belongs to), or under 'run'
+outside any span.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import ContextDecorator
+
+from base_logger import logger
+
+class Metrics:
+    '''
+    Span timings and counters of a run
+
+    DOCTESTS:
+    >>> m = Metrics()
+    >>> with m.span('gogulong'):
+    ...     with m.span('fetch'):
+    ...         m.count('requests', 2)
+    >>> m.count('requests')
+    >>> summary = m.summary()
+    >>> summary['spans']['gogulong/fetch']['calls'], summary['counters']
+    (1, {'gogulong': {'requests': 2}, 'run': {'requests': 1}})
+    '''
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.spans = {}
+            self.counters = {}
+            self.started = time.time()
+
+    def _stack(self) -> list:
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    def span(self, name : str) -> 'span':
+        return span(name, self)
+
+    def count(self, name : str, n : int = 1):
+        '''
+        Adds n to counter name of the current top span
+        '''
+        stack = self._stack()
+        scope = stack[0][0] if len(stack) else 'run'
+        with self._lock:
+            counters = self.counters.setdefault(scope, {})
+            counters[name] = counters.get(name, 0) + n
+
+    def _record(self, path : str, secs : float, cpu_secs : float):
+        with self._lock:
+            stats = self.spans.setdefault(path, {'calls' : 0, 'secs' : 0.0, 'cpu_secs' : 0.0})
+            stats['calls'] += 1
+            stats['secs'] += secs
+            stats['cpu_secs'] += cpu_secs
+
+    def bind(self, func):
+        '''
+        func running inside the caller's current spans when called from
+        another thread (e.g. a worker pool)
+        '''
+        parents = list(self._stack())
+        def bound(*args, **kwargs):
+            stack = self._stack()
+            saved = list(stack)
+            stack[:] = parents
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stack[:] = saved
+        return bound
+
+    def summary(self) -> dict:
+        '''
+        Seconds, CPU seconds and calls per span path, and counters per scope
+        '''
+        with self._lock:
+            return {'run_secs' : round(time.time() - self.started, 3),
+                    'spans' : {path : {'calls' : s['calls'],
+                                       'secs' : round(s['secs'], 3),
+                                       'cpu_secs' : round(s['cpu_secs'], 3)}
+                               for path, s in sorted(self.spans.items())},
+                    'counters' : {scope : dict(c) for scope, c in self.counters.items()}}
+
+    def save(self, path : str) -> dict:
+        '''
+        Writes the summary to a JSON file and returns it
+        '''
+        summary = self.summary()
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok = True)
+        with open(path, 'w') as f:
+            json.dump(summary, f, indent = 2)
+        logger.info(f'Saved run metrics to {path}')
+        return summary
+
+class span(ContextDecorator):
+    '''
+    Times a block or function call as a child of the current span of the
+    thread. Reusable as a decorator and safe across threads.
+    '''
+    def __init__(self,
+                 name : str,
+                 recorder : Metrics = None):
+        self.name = name
+        self.recorder = METRICS if recorder is None else recorder
+
+    def __enter__(self):
+        stack = self.recorder._stack()
+        stack.append((self.name, time.perf_counter(), time.thread_time()))
+        return self
+
+    def __exit__(self, *exc):
+        stack = self.recorder._stack()
+        path = '/'.join(name for name, _, _ in stack)
+        _, start, cpu_start = stack.pop()
+        self.recorder._record(path, time.perf_counter() - start, time.thread_time() - cpu_start)
+        return False
+
+# shared by all modules of a run
+METRICS = Metrics()
+
+def count(name : str, n : int = 1):
+    METRICS.count(name, n)
+
+def bind(func):
+    return METRICS.bind(func)
+
+def summary() -> dict:
+    return METRICS.summary()
+
+def reset():
+    METRICS.reset()
+
+def save(path : str) -> dict:
+    return METRICS.save(path)
@@ -6,7 +6,6 @@ Created on Fri Apr 12 21:57:26 2024
 """
 
 import pandas as pd
-import numpy as np
 import re
 from fuzzywuzzy import process
 from datetime import datetime as dt
@@ -14,6 +13,16 @@ from datetime import datetime as dt
 # custom modules
 import cleaner_functions
 import get_chromedriver
+import dom_extract
+import html_extract
+import rate_limiter
+import fetch_retry
+import metrics
+import profiling
+import replay
+from checkpoint import CheckpointStore
+from reference_catalog import ReferenceCatalog
+from driver_pool import DriverPool
 
 # selenium
 from selenium.webdriver.common.by import By
@@ -22,187 +31,96 @@ from selenium.webdriver.support import expected_conditions as EC
 
 from base_logger import logger
 
-def partspro_scraper(driver,
-                     df_gulong : pd.DataFrame) -> pd.DataFrame:
-    
+PAGE_URL = 'https://www.partspro.ph/search?type=product&options%5Bprefix%5D=last&options%5Bunavailable_products%5D=last&q=product_type%3ATires&page={page}'
+
+PRODUCT_XPATH = '//div[@class="product-item__info-inner"]'
+
+PAGINATION_XPATH = '//a[@class="pagination__nav-item link"]'
+
+# vendor and title links are displayed as separate lines
+STATIC_BLOCK_TAGS = html_extract.BLOCK_TAGS | {'a'}
+
+@metrics.span('parse')
+def get_product_texts(driver, 
+                      extraction : str = 'script') -> list:
     '''
-    PartsPro product scraper
+    Text lines of each product on the loaded page
     
     Parameters:
     ----------
     driver : selenium
         Chrome driver
-    df_gulong : pd.DataFrame
-        Dataframe of gulong ph data
-
+    extraction : str, default 'script'
+        'script' reads all products with one execute_script call (falls back
+        to 'elements' if it fails); 'elements' reads each product element
+    
     Returns:
     -------
-        - df : pd.DataFrame
-            dataframe of scraped data from partspro
+    products : list
+        list of text lines of each product
     '''
+    if extraction == 'script':
+        try:
+            texts = dom_extract.extract_texts(driver, {'products' : PRODUCT_XPATH})['products']
+            return [t.split('\n') for t in texts]
+        except Exception as e:
+            logger.debug(f'Script extraction failed: {repr(e)}')
     
+    return [p.text.split('\n') for p in driver.find_elements(By.XPATH, PRODUCT_XPATH)]
+
+def get_last_page(driver) -> int:
+    '''
+    Number of PartsPro tire search result pages (64 if not found)
+    '''
     try:
-        url_page = 'https://www.partspro.ph/search?type=product&options%5Bprefix%5D=last&options%5Bunavailable_products%5D=last&q=product_type%3ATires&page=1'
-        driver.get(url_page)
+        url_page = PAGE_URL.format(page = 1)
+        with rate_limiter.LIMITER.request(rate_limiter.get_host(url_page)):
+            replay.get_page(driver, url_page, record = False)
         
         wait = WebDriverWait(driver, timeout = 5)
         # driver.implicitly_wait(3)
-        wait.until(EC.presence_of_element_located((By.XPATH, '//a[@class="pagination__nav-item link"]')))
-        pages = driver.find_elements(By.XPATH, '//a[@class="pagination__nav-item link"]')
+        wait.until(EC.presence_of_element_located((By.XPATH, PAGINATION_XPATH)))
+        replay.record_page(driver, url_page)
+        pages = driver.find_elements(By.XPATH, PAGINATION_XPATH)
         last_page = max([int(page.text) for page in pages if page.text.isnumeric()])
     
     except:
         last_page = 64
     
-    prod_list = []
-    for page in range(1, last_page+1):
-        logger.info(f'Extracting PartsPro info from page: {page}')
-        try:
-            url = f"https://www.partspro.ph/search?type=product&options%5Bprefix%5D=last&options%5Bunavailable_products%5D=last&q=product_type%3ATires&page={page}"
-            driver.get(url)
-            
-            # extract products texts
-            products = [p.text.split('\n') for p in driver.find_elements(By.XPATH, 
-                                            '//div[@class="product-item__info-inner"]')]
-            
-            for p in products:
-                try:
-                    try:
-                        brand = process.extractOne(p[0], 
-                                                   df_gulong.brand.unique(), 
-                                                   score_cutoff = 90)[0]
-                    except:
-                        brand = p[0].strip().upper()
-                        
-                    sku_name = p[1].upper().strip()
-                    price = cleaner_functions.clean_price([_ for _ in p if '₱' in _][0])
-                    model = cleaner_functions.clean_model(sku_name, df_gulong)
-                
-                    # cleaned tire specs
-                    try:
-                        specs = re.sub(f'{brand}|{model}', '', sku_name).strip()
-                    except:
-                        specs = sku_name
-                        
-                    width, aspect_ratio, diameter = cleaner_functions.clean_specs(specs)
-                    aspect_ratio = cleaner_functions.clean_aspect_ratio(aspect_ratio)
-                    diameter = cleaner_functions.clean_diameter(diameter)
-                    raw_specs_ = cleaner_functions.combine_specs(width, aspect_ratio, diameter, mode = 'SKU')
-                    correct_specs = cleaner_functions.combine_specs(width, aspect_ratio, diameter, mode = 'MATCH')
-                    name = cleaner_functions.fix_names(model, 
-                                                       comp = df_gulong[df_gulong.name.notna()].name.unique())
-                    # extract load and speed index
-                    try:                 
-                        load_speed = re.search('(?<=R[0-9]{2}\s)[0-9]{2,3}(\/)?([0-9]{2,3})?[A-Z]', sku_name)[0]
-                        # find all numbers in searched text
-                        load = re.findall('[0-9]{2,3}', load_speed)
-                        load_index = '/'.join(load) if len(load) > 1 else load[0]
-                        speed_index = re.search('[A-Z]', load_speed)[0]
-                        
-                    except:
-                        load_index = ''
-                        speed_index = ''
-                    
-                    # construct final sku name
-                    sku_name = cleaner_functions.combine_sku(brand,
-                                                             width,
-                                                             aspect_ratio,
-                                                             diameter,
-                                                             name,
-                                                             load_index,
-                                                             speed_index)
-                    
-                    # append data dict to list
-                    prod_list.append({
-                            'sku_name':sku_name,
-                            'price_partspro':price,
-                            'brand':brand,
-                            'name':name,
-                            'width':width,
-                            'aspect_ratio':aspect_ratio,
-                            'diameter':diameter,
-                            'raw_specs':raw_specs_,
-                            'correct_specs':correct_specs,
-                            'load_index':load_index,
-                            'speed_index':speed_index
-                            })
-                # product level scraping exception
-                except:
-                    continue
-        
-        # page-level scraping exception
-        except:
-            continue
-        
-        driver.implicitly_wait(np.random.randint(1, 5))
-    
-    df = pd.DataFrame(prod_list)
-    df = df[df.brand != 'PARTSPRO.PH']
-    
-    return df
+    return last_page
 
-def main(df_ref = None):
+@metrics.span('clean')
+def clean_products(products : list,
+                   catalog : ReferenceCatalog) -> list:
     '''
+    Cleaned product dicts from the text lines of each product (products that
+    fail to parse are skipped)
+    
     Parameters:
     ----------
-        - df_ref : pd.DataFrame
-            df_gulong from get_gulong_data function. Required.
+    products : list
+        text lines of each product (see get_product_texts)
+    catalog : ReferenceCatalog
+        reference data built from df_gulong
     
     Returns:
-    --------
-        - dict
+    -------
+    records : list
+        list of product dicts
     '''
-    
-    # 1. Create chromedriver instance
-    driver = get_chromedriver.create_driver()
-    
-    time_start = dt.now()
-    
-    # 2. Scrape data
-    df_partspro = partspro_scraper(driver, 
-                                   df_ref)
-    
-    time_finish = dt.now()
-    
-    # 3. Close chromedriver
-    driver.quit()
-    
-    # 4. Return scraping results and stats
-    return {'source' : 'partspro',
-            'df' : df_partspro,
-            'items': len(df_partspro),
-            'time_start': time_start.strftime('%Y-%m-%d %H:%M:%S'),
-            'time_end': time_finish.strftime('%Y-%m-%d %H:%M:%S'),
-            'duration': f'{(time_finish-time_start).seconds} secs',
-            }
-
-def main_test(df_gulong = None):
-    
-    # 1. Create chromedriver instance
-    driver = get_chromedriver.create_driver()
-    
-    time_start = dt.now()
-    
-    page = 1
-    
-    url = f"https://www.partspro.ph/search?type=product&options%5Bprefix%5D=last&options%5Bunavailable_products%5D=last&q=product_type%3ATires&page={page}"
-    driver.get(url)
-    
-    # extract products texts
-    products = [p.text.split('\n') for p in driver.find_elements(By.XPATH, 
-                                    '//div[@class="product-item__info-inner"]')]
-    prod_list = []
+    records = []
     for p in products:
+        try:
             try:
                 brand = process.extractOne(p[0], 
-                                           df_gulong.brand.unique(), 
+                                           catalog.brands, 
                                            score_cutoff = 90)[0]
             except:
                 brand = p[0].strip().upper()
                 
             sku_name = p[1].upper().strip()
             price = cleaner_functions.clean_price([_ for _ in p if '₱' in _][0])
-            model = cleaner_functions.clean_model(sku_name, df_gulong)
+            model = cleaner_functions.clean_model(sku_name, catalog)
         
             # cleaned tire specs
             try:
@@ -216,7 +134,7 @@ def main_test(df_gulong = None):
             raw_specs_ = cleaner_functions.combine_specs(width, aspect_ratio, diameter, mode = 'SKU')
             correct_specs = cleaner_functions.combine_specs(width, aspect_ratio, diameter, mode = 'MATCH')
             name = cleaner_functions.fix_names(model, 
-                                               comp = df_gulong[df_gulong.name.notna()].name.unique())
+                                               comp = catalog)
             # extract load and speed index
             try:                 
                 load_speed = re.search('(?<=R[0-9]{2}\s)[0-9]{2,3}(\/)?([0-9]{2,3})?[A-Z]', sku_name)[0]
@@ -239,7 +157,7 @@ def main_test(df_gulong = None):
                                                      speed_index)
             
             # append data dict to list
-            prod_list.append({
+            records.append({
                     'sku_name':sku_name,
                     'price_partspro':price,
                     'brand':brand,
@@ -252,16 +170,323 @@ def main_test(df_gulong = None):
                     'load_index':load_index,
                     'speed_index':speed_index
                     })
+        # product level scraping exception
+        except:
+            metrics.count('rows_dropped')
+            continue
+    
+    return records
+
+def scrape_partspro_page(driver, 
+                         page : int,
+                         catalog : ReferenceCatalog,
+                         extraction : str = 'script') -> list:
+    '''
+    Scrapes and cleans product info from one PartsPro page
+    
+    Parameters:
+    ----------
+    driver : selenium
+        Chrome driver
+    page : int
+        page number
+    catalog : ReferenceCatalog
+        reference data built from df_gulong
+    extraction : str, default 'script'
+        see get_product_texts
+    
+    Returns:
+    -------
+    page_records : list
+        list of product dicts; None if the page failed to load
+    '''
+    logger.info(f'Extracting PartsPro info from page: {page}')
+    try:
+        url = PAGE_URL.format(page = page)
+        with rate_limiter.LIMITER.request(rate_limiter.get_host(url)):
+            replay.get_page(driver, url)
+        
+        # extract products texts
+        products = get_product_texts(driver, extraction)
+        page_records = clean_products(products, catalog)
+    
+    # page-level scraping exception
+    except:
+        return None
+    
+    return page_records
+
+def partspro_scraper(driver,
+                     df_gulong : pd.DataFrame,
+                     checkpoint : CheckpointStore = None,
+                     catalog : ReferenceCatalog = None,
+                     pool : DriverPool = None,
+                     retrier : fetch_retry.Retrier = None) -> pd.DataFrame:
+    
+    '''
+    PartsPro product scraper
+    
+    Parameters:
+    ----------
+    driver : selenium
+        Chrome driver (not used if pool is given)
+    df_gulong : pd.DataFrame
+        Dataframe of gulong ph data
+    checkpoint : CheckpointStore, optional
+        journal of completed pages; completed pages are not scraped again
+    catalog : ReferenceCatalog, optional
+        reference data built from df_gulong; built here if not given
+    pool : DriverPool, optional
+        spread pages across the pool's drivers
+    retrier : fetch_retry.Retrier, optional
+        retries failed pages; remaining pages are skipped once its breaker
+        trips
+
+    Returns:
+    -------
+        - df : pd.DataFrame
+            dataframe of scraped data from partspro
+    '''
+    retrier = fetch_retry.Retrier('partspro') if retrier is None else retrier
+    
+    if pool is not None:
+        with pool.driver() as pool_driver:
+            last_page = get_last_page(pool_driver)
+    else:
+        last_page = get_last_page(driver)
+    
+    catalog = ReferenceCatalog(df_gulong) if catalog is None else catalog
+    
+    pages = list(range(1, last_page+1))
+    # pages completed in a previous run are rebuilt from the checkpoint
+    pending = [page for page in pages 
+               if (checkpoint is None) or not checkpoint.is_done(page)]
+    
+    def scrape_page(page_driver, page):
+        page_records = retrier.call(scrape_partspro_page, page_driver, page, catalog)
+        if (page_records is not None) and (checkpoint is not None):
+            checkpoint.add(page, page_records)
+        return page_records
+    
+    if pool is not None:
+        scraped = dict(zip(pending, pool.map_pages(scrape_page, pending)))
+    else:
+        scraped = {page : scrape_page(driver, page) for page in pending}
+    
+    # merge in page order
+    prod_list = []
+    for page in pages:
+        page_records = scraped[page] if page in scraped else checkpoint.get(page)
+        prod_list.extend(page_records or [])
     
     df = pd.DataFrame(prod_list)
-    df_partspro_test = df[df.brand != 'PARTSPRO.PH']
+    df = df[df.brand != 'PARTSPRO.PH']
+    
+    return df
+
+def partspro_scraper_static(df_gulong : pd.DataFrame,
+                            checkpoint : CheckpointStore = None,
+                            catalog : ReferenceCatalog = None,
+                            concurrency : int = 4,
+                            rate_per_host : float = 2.0,
+                            retrier : fetch_retry.Retrier = None) -> pd.DataFrame:
+    '''
+    PartsPro product scraper over plain HTTP (no browser). Pages are fetched
+    concurrently and parsed with lxml.
+    
+    Parameters:
+    ----------
+    df_gulong : pd.DataFrame
+        Dataframe of gulong ph data
+    checkpoint : CheckpointStore, optional
+        journal of completed pages; completed pages are not fetched again
+    catalog : ReferenceCatalog, optional
+        reference data built from df_gulong; built here if not given
+    concurrency : int, default 4
+        max number of pages fetched at the same time
+    rate_per_host : float, default 2.0
+        initial page requests per second (adapted by the shared rate limiter)
+    retrier : fetch_retry.Retrier, optional
+        refetches failed pages
+    
+    Returns:
+    -------
+        - df : pd.DataFrame
+            same as partspro_scraper; empty if the first page has no products
+            in its static HTML
+    '''
+    catalog = ReferenceCatalog(df_gulong) if catalog is None else catalog
+    retrier = fetch_retry.Retrier('partspro_static') if retrier is None else retrier
+    
+    def parse_page(tree):
+        with metrics.span('parse'):
+            texts = html_extract.extract_texts(tree, {'products' : PRODUCT_XPATH},
+                                               block_tags = STATIC_BLOCK_TAGS)['products']
+        return clean_products([t.split('\n') for t in texts], catalog)
+    
+    # 1. First page gives number of pages and whether static HTML has products
+    first = retrier.call(lambda: html_extract.fetch_pages([PAGE_URL.format(page = 1)])[0])
+    first_records = parse_page(first) if first is not None else []
+    if not len(first_records):
+        logger.info('No products in PartsPro static HTML.')
+        return pd.DataFrame()
+    
+    pages = html_extract.extract_texts(first, {'pages' : PAGINATION_XPATH})['pages']
+    pages = [int(page) for page in pages if page.isnumeric()]
+    last_page = max(pages) if len(pages) else 64
+    
+    pages = list(range(1, last_page+1))
+    # pages completed in a previous run are rebuilt from the checkpoint
+    pending = [page for page in pages[1:] 
+               if (checkpoint is None) or not checkpoint.is_done(page)]
+    
+    logger.info(f'Extracting PartsPro info from {len(pending) + 1} pages (static).')
+    scraped = {1 : first_records}
+    if (checkpoint is not None) and not checkpoint.is_done(1):
+        checkpoint.add(1, first_records)
+    
+    def on_page(ndx, tree):
+        # parse and journal each page as it arrives
+        page = pending[ndx]
+        scraped[page] = parse_page(tree) if tree is not None else None
+        if (checkpoint is not None) and (scraped[page] is not None):
+            checkpoint.add(page, scraped[page])
+    
+    # one session for all pages; failed pages are retried as they fail
+    html_extract.fetch_pages([PAGE_URL.format(page = page) for page in pending],
+                             concurrency = concurrency,
+                             rate_per_host = rate_per_host,
+                             retrier = retrier,
+                             on_page = on_page)
+    # pages cancelled by the circuit breaker never reach on_page
+    for page in pending:
+        scraped.setdefault(page, None)
+    
+    failed = [page for page, page_records in scraped.items() if page_records is None]
+    if len(failed):
+        logger.warning(f'Failed to fetch PartsPro pages: {failed}')
+    
+    # merge in page order
+    prod_list = []
+    for page in pages:
+        page_records = scraped[page] if page in scraped else checkpoint.get(page)
+        prod_list.extend(page_records or [])
+    
+    df = pd.DataFrame(prod_list)
+    df = df[df.brand != 'PARTSPRO.PH']
+    
+    return df
+
+@profiling.stage('partspro')
+@replay.with_target
+def main(df_ref = None,
+         resume : bool = False,
+         catalog : ReferenceCatalog = None,
+         pool : DriverPool = None,
+         engine : str = 'static',
+         replay_url : str = None,
+         driver_profile : str = 'scrape'):
+    '''
+    Parameters:
+    ----------
+        - df_ref : pd.DataFrame
+            df_gulong from get_gulong_data function. Required.
+        - resume : bool, default False
+            skip pages completed by a previous (crashed) run today
+        - catalog : ReferenceCatalog, optional
+            shared reference data built from df_ref
+        - pool : DriverPool, optional
+            shared drivers to scrape pages in parallel; otherwise pages are
+            scraped in order with a single driver
+        - engine : str, default 'static'
+            'static' fetches pages over HTTP without a browser, with Selenium
+            as fallback if no products are found; 'selenium' always uses
+            Selenium
+        - replay_url : str, optional
+            address of a replay.ReplayServer to scrape instead of the live
+            site (e.g. 'http://127.0.0.1:8765')
+        - driver_profile : str, default 'scrape'
+            get_chromedriver.create_driver profile of the Selenium drivers
+            created here ('default' for a full browser)
+    
+    Returns:
+    --------
+        - dict
+    '''
+    
+    time_start = dt.now()
+    
+    # 1. Scrape data
+    checkpoint = CheckpointStore('partspro', resume = resume)
+    retriers = {}
+    df_partspro = pd.DataFrame()
+    if engine == 'static':
+        logger.info('Scraping PartsPro via static HTML.')
+        retriers['static'] = fetch_retry.Retrier('partspro_static')
+        df_partspro = partspro_scraper_static(df_ref,
+                                              checkpoint = checkpoint,
+                                              catalog = catalog,
+                                              retrier = retriers['static'])
+    
+    # 2. Resort to selenium (chromedriver instance)
+    driver = None
+    if not len(df_partspro):
+        logger.info('Resorting to Selenium scraper.')
+        driver = get_chromedriver.create_driver(profile = driver_profile) if pool is None else None
+        retriers['selenium'] = fetch_retry.Retrier('partspro')
+        try:
+            df_partspro = partspro_scraper(driver, 
+                                           df_ref,
+                                           checkpoint = checkpoint,
+                                           catalog = catalog,
+                                           pool = pool,
+                                           retrier = retriers['selenium'])
+        finally:
+            # pool drivers are closed by the pool owner
+            if driver is not None:
+                driver.quit()
     
     time_finish = dt.now()
     
-    # 3. Close chromedriver
-    driver.quit()
+    # 3. Return scraping results and stats
+    return {'source' : 'partspro',
+            'df' : df_partspro,
+            'items': len(df_partspro),
+            'time_start': time_start.strftime('%Y-%m-%d %H:%M:%S'),
+            'time_end': time_finish.strftime('%Y-%m-%d %H:%M:%S'),
+            'duration': f'{(time_finish-time_start).seconds} secs',
+            'fetch' : {path : retrier.stats() for path, retrier in retriers.items()},
+            }
+
+@profiling.stage('partspro')
+@replay.with_target
+def main_test(df_gulong = None,
+              catalog : ReferenceCatalog = None,
+              replay_url : str = None,
+              driver_profile : str = 'scrape'):
+    
+    catalog = ReferenceCatalog(df_gulong) if catalog is None else catalog
+    
+    # 1. Create chromedriver instance
+    driver = get_chromedriver.create_driver(profile = driver_profile)
+    
+    time_start = dt.now()
+    
+    try:
+        replay.get_page(driver, PAGE_URL.format(page = 1))
+        
+        # extract products texts
+        prod_list = clean_products(get_product_texts(driver), catalog)
+    finally:
+        # 2. Close chromedriver
+        driver.quit()
+    
+    df = pd.DataFrame(prod_list)
+    df_partspro_test = df[df.brand != 'PARTSPRO.PH']
+    
+    time_finish = dt.now()
     
-    # 4. Return scraping results and stats
+    # 3. Return scraping results and stats
     return {'source' : 'partspro',
             'df' : df_partspro_test,
             'items': len(df_partspro_test),
@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Mon Oct 19 01:36:44 2026
+
+@author: carlo
+
+Opt-in profiling of pipeline stages. Stages are marked with the stage
+decorator and run under a profiler only when enabled, by environment
+variable or with configure (e.g. from the main_price_scraper command line):
+
+    SCRAPER_PROFILE=gogulong,get_intersection python main_price_scraper.py
+    SCRAPER_PROFILE=all SCRAPER_PROFILE_MODE=sample python main_price_scraper.py
+    python main_price_scraper.py --profile construct_tiremanila_df --profile-top 40
+
+    SCRAPER_PROFILE         comma-separated stage names, or all
+    SCRAPER_PROFILE_MODE    cprofile (deterministic, default) or sample
+    SCRAPER_PROFILE_DIR     folder of the profile files (default profiles)
+    SCRAPER_PROFILE_TOP     functions in the logged summary (default 25)
+
+Each profiled call writes a file to the profile folder (<stage>_<time>.prof,
+readable with pstats or snakeviz, or <stage>_<time>.folded collapsed stacks
+for flame graphs in sample mode) and logs its hottest functions. Stages
+called while a profile of the same thread is running are covered by that
+profile. When a stage is not enabled its call goes straight to the function.
+"""
+
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime as dt
+from functools import wraps
+
+from base_logger import logger
+
+MODES = ['cprofile', 'sample']
+
+# stage names marked with stage()
+STAGES = set()
+
+_stages = frozenset()
+_mode = 'cprofile'
+_folder = 'profiles'
+_top = 25
+_interval = 0.005
+_calls = Counter()
+_lock = threading.Lock()
+_local = threading.local()
+
+def configure(stages = None,
+              mode : str = 'cprofile',
+              folder : str = 'profiles',
+              top : int = 25,
+              interval : float = 0.005):
+    '''
+    Sets the profiled stages of the process
+
+    Parameters
+    ----------
+        - stages : str or list, default None
+            stage names (comma-separated if str) or 'all'; None or empty
+            disables profiling
+        - mode : str, default 'cprofile'
+            'cprofile' for deterministic profiles of every call, 'sample' to
+            sample the stack of the stage thread every interval seconds
+            (lower overhead, for long Selenium stages)
+        - folder : str, default 'profiles'
+            folder of the profile files
+        - top : int, default 25
+            number of functions logged per profiled call
+        - interval : float, default 0.005
+            seconds between samples in sample mode
+
+    DOCTESTS:
+    >>> configure('gogulong, get_intersection')
+    >>> enabled('gogulong'), enabled('write_to_gsheet')
+    (True, False)
+    >>> configure(None)
+    '''
+    global _stages, _mode, _folder, _top, _interval
+    if mode not in MODES:
+        raise ValueError(f'Unknown profile mode {mode}, expected one of {MODES}')
+    if isinstance(stages, str):
+        stages = stages.split(',')
+    _stages = frozenset(s.strip() for s in (stages or []) if s.strip())
+    _mode, _folder, _top, _interval = mode, folder, int(top), float(interval)
+    if len(_stages):
+        logger.info(f'Profiling stages {", ".join(sorted(_stages))} ({_mode}) to {_folder}')
+
+def configure_from_env():
+    '''
+    Sets the profiled stages from the SCRAPER_PROFILE* environment variables
+    '''
+    configure(os.environ.get('SCRAPER_PROFILE'),
+              mode = os.environ.get('SCRAPER_PROFILE_MODE', 'cprofile'),
+              folder = os.environ.get('SCRAPER_PROFILE_DIR', 'profiles'),
+              top = os.environ.get('SCRAPER_PROFILE_TOP', 25))
+
+def enabled(name : str) -> bool:
+    return (name in _stages) or ('all' in _stages)
+
+def stage(name : str):
+    '''
+    Marks a function as pipeline stage name, profiled when enabled
+
+        @profiling.stage('get_intersection')
+        def get_intersection(...):
+            ...
+    '''
+    STAGES.add(name)
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _stages:
+                return func(*args, **kwargs)
+            return _call(name, func, args, kwargs)
+        return wrapper
+    return decorator
+
+def _call(name : str, func, args, kwargs):
+    # one profile per thread at a time; nested stages are part of it
+    if (not enabled(name)) or getattr(_local, 'active', False):
+        return func(*args, **kwargs)
+
+    with _lock:
+        _calls[name] += 1
+        path = os.path.join(_folder, f'{name}_{dt.now():%Y%m%d_%H%M%S}_{_calls[name]}')
+    profiler = cProfile.Profile() if _mode == 'cprofile' else Sampler(threading.get_ident(), _interval)
+    _local.active = True
+    start = time.perf_counter()
+    try:
+        profiler.enable()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profiler.disable()
+    finally:
+        _local.active = False
+        secs = time.perf_counter() - start
+        try:
+            os.makedirs(_folder, exist_ok = True)
+            if _mode == 'cprofile':
+                path += '.prof'
+                profiler.dump_stats(path)
+                summary = cprofile_summary(profiler, _top)
+            else:
+                path += '.folded'
+                profiler.dump(path)
+                summary = profiler.summary(_top)
+            logger.info(f'Profile of {name} ({secs:.2f} secs) saved to {path}\n{summary}')
+        except Exception as e:
+            logger.warning(f'Failed to save profile of {name}: {e}')
+
+def cprofile_summary(profiler : cProfile.Profile,
+                     top : int = 25) -> str:
+    '''
+    Top functions of a profile by own time, then by cumulative time
+    '''
+    out = io.StringIO()
+    stats = pstats.Stats(profiler, stream = out).strip_dirs()
+    stats.sort_stats('tottime').print_stats(top)
+    stats.sort_stats('cumulative').print_stats(top)
+    return out.getvalue()
+
+def _frame_name(code) -> str:
+    return f'{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})'
+
+class Sampler:
+    '''
+    Sampling profiler of one thread: records the thread's call stack every
+    interval seconds from a background thread
+
+    Parameters
+    ----------
+        - thread_id : int
+            threading.get_ident() of the profiled thread
+        - interval : float, default 0.005
+            seconds between samples
+
+    DOCTESTS:
+    >>> sampler = Sampler(threading.get_ident(), 0.001)
+    >>> sampler.enable()
+    >>> total = sum(i * i for i in range(2000000))
+    >>> sampler.disable()
+    >>> sampler.samples > 0
+    True
+    '''
+    def __init__(self,
+                 thread_id : int,
+                 interval : float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        # stacks as tuples of code objects, outermost first
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def samples(self) -> int:
+        return sum(self.stacks.values())
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(frame.f_code)
+                frame = frame.f_back
+            if len(stack):
+                self.stacks[tuple(reversed(stack))] += 1
+
+    def enable(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target = self._run, daemon = True)
+        self._thread.start()
+
+    def disable(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def dump(self, path : str):
+        '''
+        Writes collapsed stacks ("outer;...;inner count" lines), the input of
+        flamegraph.pl and speedscope
+        '''
+        with open(path, 'w') as f:
+            for stack, n in self.stacks.most_common():
+                f.write(';'.join(_frame_name(code) for code in stack) + f' {n}\n')
+
+    def summary(self, top : int = 25) -> str:
+        '''
+        Top functions by share of samples on top of the stack (own) and
+        anywhere in the stack (total)
+        '''
+        own, total = Counter(), Counter()
+        for stack, n in self.stacks.items():
+            own[stack[-1]] += n
+            for code in set(stack):
+                total[code] += n
+        samples = max(self.samples, 1)
+        lines = [f'{self.samples} samples every {self.interval * 1000:g} ms',
+                 f'{"own %":>7} {"total %":>7}  function']
+        for code, n in own.most_common(top):
+            lines.append(f'{100 * n / samples:7.1f} {100 * total[code] / samples:7.1f}  {_frame_name(code)}')
+        lines.append(f'{"total %":>7}  function')
+        for code, n in total.most_common(top):
+            lines.append(f'{100 * n / samples:7.1f}  {_frame_name(code)}')
+        return '\n'.join(lines)
+
+configure_from_env()
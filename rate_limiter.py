@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 21:40:03 2026
+
+@author: carlo
+"""
+
+import asyncio
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+from base_logger import logger
+
+class AdaptiveRateLimiter:
+    '''
+    Per-host request pacing shared by all scrapers (threads and asyncio).
+    Each host has a token bucket whose rate adapts to the site (AIMD):
+    fast successful responses add to the rate, errors and slow responses
+    cut it.
+
+    Parameters
+    ----------
+        - rate : float, default 2.0
+            initial requests per second of a new host
+        - min_rate : float, default 0.2
+        - max_rate : float, default 10.0
+        - burst : int, default 1
+            requests that can start at once after an idle period
+        - increase : float, default 0.25
+            requests per second added after a fast successful response
+        - decrease : float, default 0.5
+            rate multiplier after an error or slow response
+        - slow_secs : float, default 5.0
+            responses slower than this count as slow
+
+    DOCTESTS:
+    >>> limiter = AdaptiveRateLimiter(rate = 2.0)
+    >>> limiter.reserve('a.com'), limiter.reserve('a.com') > 0.4
+    (0.0, True)
+    >>> limiter.record('a.com', 0.1)
+    >>> limiter.rate('a.com')
+    2.25
+    >>> limiter.record('a.com', 0.1, ok = False)
+    >>> limiter.rate('a.com')
+    1.125
+    '''
+    def __init__(self,
+                 rate : float = 2.0,
+                 min_rate : float = 0.2,
+                 max_rate : float = 10.0,
+                 burst : int = 1,
+                 increase : float = 0.25,
+                 decrease : float = 0.5,
+                 slow_secs : float = 5.0):
+        self.initial_rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = max(1, int(burst))
+        self.increase = increase
+        self.decrease = decrease
+        self.slow_secs = slow_secs
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def _host(self, host : str, rate : float = None) -> dict:
+        if host not in self._hosts:
+            rate = self.initial_rate if rate is None else rate
+            self._hosts[host] = {'rate' : min(max(rate, self.min_rate), self.max_rate),
+                                 'next_slot' : 0.0,
+                                 'requests' : 0,
+                                 'errors' : 0,
+                                 'slow' : 0,
+                                 'wait_secs' : 0.0}
+        return self._hosts[host]
+
+    def reserve(self, host : str, rate : float = None) -> float:
+        '''
+        Reserves the next request slot of host and returns the seconds to
+        wait before sending it
+
+        Parameters
+        ----------
+            - host : str
+            - rate : float, optional
+                initial rate if host has not been seen yet
+        '''
+        with self._lock:
+            state = self._host(host, rate)
+            interval = 1.0 / state['rate']
+            now = time.monotonic()
+            # up to burst slots may be taken back-to-back after idling
+            slot = max(now - (self.burst - 1) * interval, state['next_slot'])
+            state['next_slot'] = slot + interval
+            delay = max(0.0, slot - now)
+            state['requests'] += 1
+            state['wait_secs'] += delay
+
+        return delay
+
+    def wait(self, host : str, rate : float = None):
+        '''
+        Blocks until a request to host may be sent
+        '''
+        delay = self.reserve(host, rate)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def wait_async(self, host : str, rate : float = None):
+        '''
+        Same as wait for asyncio tasks
+        '''
+        delay = self.reserve(host, rate)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    @contextmanager
+    def request(self, host : str, rate : float = None):
+        '''
+        Waits for a request slot of host, then records the latency and outcome
+        of the request made in the block. The request failed if the block
+        raises or sets outcome['ok'] to False.
+
+        DOCTESTS:
+        >>> limiter = AdaptiveRateLimiter(rate = 2.0)
+        >>> with limiter.request('a.com') as outcome:
+        ...     outcome['ok'] = ok_status(503)
+        >>> limiter.stats()['a.com']['errors']
+        1
+        '''
+        self.wait(host, rate)
+        outcome = {'ok' : True}
+        start = time.monotonic()
+        try:
+            yield outcome
+        except:
+            outcome['ok'] = False
+            raise
+        finally:
+            self.record(host, time.monotonic() - start, ok = outcome['ok'])
+
+    def record(self,
+               host : str,
+               latency : float,
+               ok : bool = True):
+        '''
+        Adapts the rate of host to the outcome of a request
+
+        Parameters
+        ----------
+            - host : str
+            - latency : float
+                seconds taken by the request
+            - ok : bool, default True
+                False for failed requests (e.g. errors, HTTP 429 or 5xx)
+        '''
+        with self._lock:
+            state = self._host(host)
+            rate = state['rate']
+            if ok and (latency <= self.slow_secs):
+                state['rate'] = min(self.max_rate, rate + self.increase)
+                return
+
+            state['errors' if not ok else 'slow'] += 1
+            state['rate'] = max(self.min_rate, rate * self.decrease)
+            # back off the request already scheduled as well
+            state['next_slot'] = max(state['next_slot'],
+                                     time.monotonic() + 1.0 / state['rate'])
+
+        logger.debug(f'{host}: {"error" if not ok else "slow response"}, rate {rate:.2f} -> {state["rate"]:.2f}/s')
+
+    def rate(self, host : str) -> float:
+        '''
+        Current requests per second of host
+        '''
+        with self._lock:
+            return self._host(host)['rate']
+
+    def stats(self) -> dict:
+        '''
+        Rate, requests, errors, slow responses and seconds waited per host
+        '''
+        with self._lock:
+            return {host : {**{k : v for k, v in state.items() if k != 'next_slot'},
+                            'rate' : round(state['rate'], 3),
+                            'wait_secs' : round(state['wait_secs'], 3)}
+                    for host, state in self._hosts.items()}
+
+    def reset(self):
+        with self._lock:
+            self._hosts = {}
+
+def ok_status(status : int) -> bool:
+    '''
+    False for HTTP statuses that mean the host wants fewer requests
+    (429 Too Many Requests and server errors)
+    '''
+    return (status != 429) and (status < 500)
+
+def get_host(url : str) -> str:
+    '''
+    >>> get_host('https://tiremanila.com/?page=2')
+    'tiremanila.com'
+    '''
+    return urlparse(url).netloc
+
+# shared by all scrapers of a run
+LIMITER = AdaptiveRateLimiter()
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 18:20:15 2026
+
+@author: carlo
+"""
+
+import numpy as np
+import pandas as pd
+from fuzzywuzzy import process, fuzz
+
+import cleaner_functions
+from base_logger import logger
+
+def build_blocks(df_ref : pd.DataFrame) -> dict:
+    '''
+    Reference model names grouped by (brand, correct_specs)
+    '''
+    df = df_ref.loc[df_ref.name.notna(), ['brand', 'correct_specs', 'name']].drop_duplicates()
+    return {key : list(group.name) for key, group in df.groupby(['brand', 'correct_specs'],
+                                                                  sort = False)}
+
+def link_to_reference(df_ref : pd.DataFrame,
+                      df_comp : pd.DataFrame,
+                      threshold : int = 90,
+                      scorer = fuzz.WRatio,
+                      source : str = None) -> pd.DataFrame:
+    '''
+    Links competitor model names to reference (gulong) names. Candidates
+    are only reference products of the same brand and correct_specs, scored
+    by name similarity.
+
+    Parameters
+    ----------
+        - df_ref : pd.DataFrame
+            reference data with name, brand and correct_specs columns
+        - df_comp : pd.DataFrame
+            competitor data with name, brand and correct_specs columns
+        - threshold : int, default 90
+            minimum similarity (0-100) to link a name
+        - scorer : function, default fuzz.WRatio
+            fuzzywuzzy scorer
+        - source : str, optional
+            competitor name for logging
+
+    Returns
+    -------
+        - df_comp : pd.DataFrame
+            copy of df_comp with linked names and match_confidence column
+            (100 for exact matches, similarity for linked names, NaN if unmatched
+            or if the best candidates are tied)
+
+    DOCTESTS:
+    >>> ref = pd.DataFrame({'name' : ['DUELER H/T 684', 'DUELER H/T 687'],
+    ...                     'brand' : ['BRIDGESTONE'] * 2,
+    ...                     'correct_specs' : ['265/65/17'] * 2})
+    >>> comp = pd.DataFrame({'name' : ['DUELER H/T 687 RBT', 'DUELER H/T 684', 'DUELER H/T', 'ECOPIA EP150'],
+    ...                      'brand' : ['BRIDGESTONE'] * 4,
+    ...                      'correct_specs' : ['265/65/17'] * 4})
+    >>> link_to_reference(ref, comp)[['name', 'match_confidence']].values.tolist()
+    [['DUELER H/T 687', 95.0], ['DUELER H/T 684', 100.0], ['DUELER H/T', nan], ['ECOPIA EP150', nan]]
+    '''
+    blocks = build_blocks(df_ref)
+    exact = set(zip(df_ref.name, df_ref.brand, df_ref.correct_specs))
+
+    def link(name, brand, specs):
+        if (name, brand, specs) in exact:
+            return name, 100
+        candidates = blocks.get((brand, specs))
+        if (not candidates) or pd.isna(name):
+            return name, np.nan
+        matches = process.extract(name, candidates, scorer = scorer, limit = 2)
+        if (not matches) or (matches[0][1] < threshold):
+            return name, np.nan
+        # ambiguous (e.g. generic name matching several models)
+        if (len(matches) > 1) and (matches[1][1] == matches[0][1]):
+            return name, np.nan
+        return matches[0][0], matches[0][1]
+
+    linked = cleaner_functions.map_unique(link, df_comp['name'], df_comp['brand'],
+                                          df_comp['correct_specs'], name = 'link_to_reference')
+    df_comp = df_comp.copy()
+    df_comp['name'] = linked.str[0]
+    df_comp['match_confidence'] = linked.str[1].astype(float)
+
+    n_linked = int((df_comp['match_confidence'] < 100).sum())
+    logger.info(f'{source or "competitor"}: linked {n_linked} of {len(df_comp)} rows by name similarity.')
+    return df_comp
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 12:05:48 2026
+
+@author: carlo
+"""
+
+import pandas as pd
+
+from string_matcher import AhoCorasick
+
+class ReferenceCatalog:
+    '''
+    Gulong reference data (brands, model names and compiled model matcher)
+    built once from df_gulong and shared by all scrapers and cleaners
+
+    Parameters
+    ----------
+        - df_gulong : pd.DataFrame
+            df_gulong from get_gulong_data function
+
+    '''
+    def __init__(self, df_gulong : pd.DataFrame):
+        self.df = df_gulong
+        # unique values in order of appearance (same as Series.unique)
+        self.brands = df_gulong.brand.unique()
+        self.brand_set = set(self.brands)
+        self.model_names = df_gulong[df_gulong.name.notna()].name.unique()
+        # model names are matched as literal substrings in one pass
+        self.model_matcher = AhoCorasick(self.model_names)
+
+    def __len__(self):
+        return len(self.model_names)
+
+    def __iter__(self):
+        return iter(self.model_names)
+
+    def match_models(self, raw_name : str) -> list:
+        '''
+        Reference model names found in raw_name, in catalog order
+        '''
+        return [self.model_names[ndx] for ndx in self.model_matcher.find_all(raw_name)]
+
+    def longest_model(self, raw_name : str):
+        '''
+        Longest reference model name found in raw_name (first in catalog
+        order among equal lengths), None if no match
+        '''
+        return self.model_matcher.longest(raw_name)
@@ -0,0 +1,348 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 22:52:19 2026
+
+@author: carlo
+
+Record and replay of scraper network traffic. A run with recording on
+saves every response it receives (GoGulong search JSON, listing pages) to
+a gzipped JSON lines archive; ReplayServer serves that archive locally so
+scrapers can run offline against a stand-in for the live sites.
+
+    python replay.py serve replay/archive.jsonl.gz --port 8765 --latency 0.2
+"""
+
+import argparse
+import inspect
+import gzip
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+import metrics
+from base_logger import logger
+
+def make_key(method : str, url : str, body = None) -> str:
+    '''
+    Archive key of a request: method, url without scheme and body (json
+    bodies with sorted keys)
+
+    >>> make_key('POST', 'https://gogulong.ph/api', {'b' : 1, 'a' : 2})
+    'POST gogulong.ph/api {"a": 2, "b": 1}'
+    >>> make_key('GET', 'replay://www.partspro.ph/search?options%5Bprefix%5D=last')
+    'GET www.partspro.ph/search?options[prefix]=last '
+    '''
+    parts = urlsplit(url)
+    target = parts.netloc + (parts.path or '/') + ('?' + parts.query if parts.query else '')
+    # HTTP clients may re-quote URLs (e.g. aiohttp sends %5B as [)
+    target = unquote(target)
+    if isinstance(body, (bytes, str)) and len(body):
+        try:
+            body = json.loads(body)
+        except:
+            body = body.decode('utf-8', errors = 'replace') if isinstance(body, bytes) else body
+    if isinstance(body, (dict, list)):
+        body = json.dumps(body, sort_keys = True)
+    return f'{method.upper()} {target} {body or ""}'
+
+class ResponseArchive:
+    '''
+    Responses keyed by request (see make_key), saved as gzipped JSON lines
+
+    Parameters
+    ----------
+        - path : str
+            archive file (e.g. replay/archive.jsonl.gz); loaded if it exists
+    '''
+    def __init__(self, path : str):
+        self.path = path
+        self.responses = {}
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with gzip.open(path, 'rt', encoding = 'utf-8') as archive:
+                for line in archive:
+                    entry = json.loads(line)
+                    self.responses[entry['key']] = entry
+
+    def __len__(self):
+        return len(self.responses)
+
+    def add(self,
+            method : str,
+            url : str,
+            body,
+            status : int,
+            content_type : str,
+            text : str):
+        key = make_key(method, url, body)
+        with self._lock:
+            self.responses[key] = {'key' : key,
+                                   'status' : status,
+                                   'content_type' : content_type,
+                                   'text' : text}
+
+    def get(self, key : str) -> dict:
+        return self.responses.get(key)
+
+    def save(self):
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok = True)
+        with self._lock:
+            entries = list(self.responses.values())
+        with gzip.open(self.path, 'wt', encoding = 'utf-8') as archive:
+            for entry in entries:
+                archive.write(json.dumps(entry) + '\n')
+        logger.info(f'Saved {len(entries)} responses to {self.path}')
+
+# process-wide recording archive and replay server address
+_recorder = None
+_target = None
+
+def start_recording(path : str = 'replay/archive.jsonl.gz') -> ResponseArchive:
+    '''
+    Records responses received from now on (responses served from the
+    GoGulong response cache are not requests, so run with use_cache=False
+    for a complete archive)
+    '''
+    global _recorder
+    _recorder = ResponseArchive(path)
+    logger.info(f'Recording responses to {path}')
+    return _recorder
+
+def stop_recording():
+    '''
+    Saves and stops the active recording
+    '''
+    global _recorder
+    if _recorder is not None:
+        _recorder.save()
+    _recorder = None
+
+def record(method : str,
+           url : str,
+           body,
+           status : int,
+           content_type : str,
+           text : str):
+    '''
+    Adds a response to the active recording, if any
+    '''
+    if _recorder is not None:
+        _recorder.add(method, url, body, status, content_type, text)
+
+def set_target(server_url : str = None):
+    '''
+    Sends requests of all scrapers to a replay server (e.g.
+    'http://127.0.0.1:8765'); None to go back to the live sites
+    '''
+    global _target
+    _target = server_url.rstrip('/') if server_url else None
+    if _target:
+        logger.info(f'Replaying responses from {_target}')
+
+@contextmanager
+def targeting(server_url : str = None):
+    '''
+    Replay target for a block (see set_target); the previous target is
+    restored after. None keeps the current target.
+
+    >>> with targeting('http://127.0.0.1:8765'):
+    ...     url('https://tiremanila.com/')
+    'http://127.0.0.1:8765/tiremanila.com/'
+    >>> url('https://tiremanila.com/')
+    'https://tiremanila.com/'
+    '''
+    global _target
+    previous = _target
+    if server_url is not None:
+        set_target(server_url)
+    try:
+        yield
+    finally:
+        _target = previous
+
+def with_target(func):
+    '''
+    Runs func (e.g. a scraper main) against the replay server of its
+    replay_url argument, restoring the previous target when it returns
+    '''
+    signature = inspect.signature(func)
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        replay_url = signature.bind_partial(*args, **kwargs).arguments.get('replay_url')
+        with targeting(replay_url):
+            return func(*args, **kwargs)
+    return wrapper
+
+def active() -> bool:
+    '''
+    True while replaying or recording. Caches of live responses (e.g. the
+    GoGulong response cache) are bypassed then, so replayed responses are
+    not served from or mixed into live data and recordings are complete.
+    '''
+    return (_target is not None) or (_recorder is not None)
+
+def url(live_url : str) -> str:
+    '''
+    URL to request for a live site URL: unchanged, or on the replay server
+    if a target is set
+
+    >>> set_target('http://127.0.0.1:8765')
+    >>> url('https://tiremanila.com/?page=2')
+    'http://127.0.0.1:8765/tiremanila.com/?page=2'
+    >>> set_target(None)
+    '''
+    if _target is None:
+        return live_url
+    parts = urlsplit(live_url)
+    return f'{_target}/{parts.netloc}{parts.path or "/"}' + (f'?{parts.query}' if parts.query else '')
+
+def record_page(driver, live_url : str):
+    '''
+    Records the page rendered by Selenium as the response of live_url (call
+    once the content to scrape has rendered)
+    '''
+    if _recorder is not None:
+        record('GET', live_url, None, 200, 'text/html; charset=utf-8', driver.page_source)
+
+def get_page(driver, 
+             live_url : str,
+             record : bool = True):
+    '''
+    Loads a page in Selenium, from the replay server if set
+
+    Parameters
+    ----------
+        - driver : selenium
+        - live_url : str
+        - record : bool, default True
+            record the page as loaded; pass False and call record_page once
+            content rendered by scripts has appeared
+    '''
+    with metrics.span('fetch'):
+        driver.get(url(live_url))
+    metrics.count('requests')
+    if record:
+        record_page(driver, live_url)
+
+class ReplayServer:
+    '''
+    Serves an archive over HTTP. Requests look like the live ones with the
+    site host as first path segment (see url).
+
+    Parameters
+    ----------
+        - path : str
+            archive recorded with start_recording
+        - latency : float, default 0.0
+            seconds added to each response
+        - jitter : float, default 0.0
+            random extra seconds (uniform 0 to jitter) per response
+        - port : int, default 0
+            0 picks a free port
+    '''
+    def __init__(self,
+                 path : str,
+                 latency : float = 0.0,
+                 jitter : float = 0.0,
+                 port : int = 0):
+        self.archive = ResponseArchive(path)
+        self.latency = latency
+        self.jitter = jitter
+        self.misses = 0
+        self.served = 0
+        # requests per site host
+        self.hits = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self._server.server_address[1]}'
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _serve(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else None
+                # path is /<host>/<live path>
+                entry = server.archive.get(make_key(self.command, 'replay:/' + self.path, body))
+                time.sleep(server.latency + random.uniform(0, server.jitter))
+                with server._lock:
+                    host = self.path.split('/')[1]
+                    server.hits[host] = server.hits.get(host, 0) + 1
+                    if entry is None:
+                        server.misses += 1
+                    else:
+                        server.served += 1
+                if entry is None:
+                    status, content_type, text = 404, 'text/plain', 'not recorded'
+                else:
+                    status, content_type, text = entry['status'], entry['content_type'], entry['text']
+                data = text.encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', content_type or 'text/plain')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = _serve
+            do_POST = _serve
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def stats(self) -> dict:
+        '''
+        Responses served, requests not in the archive and requests per host
+        '''
+        with self._lock:
+            return {'served' : self.served,
+                    'misses' : self.misses,
+                    'hits' : dict(self.hits)}
+
+    def start(self) -> 'ReplayServer':
+        self._thread = threading.Thread(target = self._server.serve_forever, daemon = True)
+        self._thread.start()
+        logger.info(f'Replay server with {len(self.archive)} responses at {self.url}')
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('command', choices = ['serve'])
+    parser.add_argument('path')
+    parser.add_argument('--port', type = int, default = 8765)
+    parser.add_argument('--latency', type = float, default = 0.0)
+    parser.add_argument('--jitter', type = float, default = 0.0)
+    args = parser.parse_args()
+
+    server = ReplayServer(args.path, latency = args.latency,
+                          jitter = args.jitter, port = args.port).start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 10:02:15 2026
+
+@author: carlo
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+
+import metrics
+from base_logger import logger
+
+class ResponseCache:
+    '''
+    On-disk json response cache with time-to-live and size-bounded eviction
+    (least recently used entries are dropped first)
+
+    Parameters
+    ----------
+        - path : str
+            sqlite file to store cached responses
+        - ttl : float, default 6 hours
+            seconds before a cached response expires
+        - max_entries : int, default 5000
+            max number of responses kept on disk
+
+    '''
+    def __init__(self,
+                 path : str = 'cache/gogulong_cache.sqlite',
+                 ttl : float = 6*3600,
+                 max_entries : int = 5000):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = None
+
+    def _connect(self):
+        if self._conn is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok = True)
+            self._conn = sqlite3.connect(self.path, check_same_thread = False)
+            self._conn.execute('''CREATE TABLE IF NOT EXISTS responses
+                                  (key TEXT PRIMARY KEY,
+                                   data TEXT,
+                                   created_at REAL,
+                                   accessed_at REAL)''')
+        return self._conn
+
+    @staticmethod
+    def make_key(*args) -> str:
+        return '/'.join([str(a) for a in args])
+
+    def get(self, key : str):
+        '''
+        Returns cached response for key or None if missing/expired
+        '''
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            row = conn.execute('SELECT data, created_at FROM responses WHERE key = ?',
+                               (key,)).fetchone()
+
+            if (row is None) or (now - row[1] > self.ttl):
+                if row is not None:
+                    conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+                    conn.commit()
+                self.misses += 1
+                metrics.count('cache_misses')
+                return None
+
+            conn.execute('UPDATE responses SET accessed_at = ? WHERE key = ?',
+                         (now, key))
+            conn.commit()
+            self.hits += 1
+
+        metrics.count('cache_hits')
+        return json.loads(row[0])
+
+    def set(self, key : str, data):
+        '''
+        Stores response for key and evicts least recently used entries
+        beyond max_entries
+        '''
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.execute('INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)',
+                         (key, json.dumps(data), now, now))
+
+            excess = conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0] - self.max_entries
+            if excess > 0:
+                conn.execute('''DELETE FROM responses WHERE key IN
+                                (SELECT key FROM responses
+                                 ORDER BY accessed_at ASC LIMIT ?)''', (excess,))
+                self.evictions += excess
+            conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._connect().execute('DELETE FROM responses')
+            self._conn.commit()
+
+    def stats(self) -> dict:
+        '''
+        Returns hit/miss/eviction counters and number of stored entries
+        '''
+        with self._lock:
+            size = self._connect().execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+
+        total = self.hits + self.misses
+        return {'hits' : self.hits,
+                'misses' : self.misses,
+                'evictions' : self.evictions,
+                'hit_ratio' : round(self.hits / total, 4) if total else 0.0,
+                'entries' : size}
+
+    def reset_stats(self):
+        '''
+        Zeroes the hit/miss/eviction counters (e.g. at the start of a run);
+        stored entries are kept
+        '''
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def log_stats(self, name : str = 'response'):
+        logger.info(f'{name} cache stats: {self.stats()}')
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 13:10:22 2026
+
+@author: carlo
+"""
+
+from collections import deque
+
+class AhoCorasick:
+    '''
+    Multi-pattern substring matcher (Aho-Corasick automaton). Built once over
+    a list of literal patterns, finds all of them in a single pass over the
+    input string.
+
+    Parameters
+    ----------
+        - patterns : list of str
+            literal patterns; empty strings are ignored
+
+    DOCTESTS:
+    >>> ac = AhoCorasick(['DUELER H/T', 'DUELER H/T 684', 'H/T'])
+    >>> ac.find_all('DUELER H/T 684 II')
+    [0, 1, 2]
+    >>> ac.longest('DUELER H/T 684 II')
+    'DUELER H/T 684'
+    >>> ac.longest('OPEN COUNTRY') is None
+    True
+
+    '''
+    def __init__(self, patterns):
+        self.patterns = list(patterns)
+        # trie transitions, failure links and pattern ending at each node
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [None]
+        # nearest node on failure chain that ends a pattern
+        self._dict_link = [0]
+
+        for ndx, pattern in enumerate(self.patterns):
+            if not pattern:
+                continue
+            node = 0
+            for char in pattern:
+                nxt = self._goto[node].get(char)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(None)
+                    self._dict_link.append(0)
+                    self._goto[node][char] = nxt
+                node = nxt
+            # keep first occurrence of duplicate patterns
+            if self._out[node] is None:
+                self._out[node] = ndx
+
+        self._build_links()
+
+    def _build_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and (char not in self._goto[fail]):
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(char, 0)
+                self._fail[child] = fail if fail != child else 0
+                self._dict_link[child] = fail if self._out[fail] is not None \
+                                         else self._dict_link[fail]
+
+    def _iter_matches(self, text : str, longest_only : bool = False):
+        '''
+        Yields pattern index of every match, longest first at each position.
+        With longest_only, only the longest match per position is yielded.
+        '''
+        goto, fail, out, dict_link = self._goto, self._fail, self._out, self._dict_link
+        node = 0
+        for char in text:
+            while node and (char not in goto[node]):
+                node = fail[node]
+            node = goto[node].get(char, 0)
+
+            match = node if out[node] is not None else dict_link[node]
+            while match:
+                yield out[match]
+                match = 0 if longest_only else dict_link[match]
+
+    def find_all(self, text : str) -> list:
+        '''
+        Sorted indices of all patterns found in text
+        '''
+        return sorted(set(self._iter_matches(text)))
+
+    def first(self, text : str):
+        '''
+        Index of the earliest pattern (in input list order) found in text,
+        None if nothing matches
+        '''
+        return min(self._iter_matches(text), default = None)
+
+    def longest(self, text : str):
+        '''
+        Longest pattern found in text; ties go to the earliest pattern in the
+        input list. Returns None if nothing matches.
+        '''
+        best = None
+        patterns = self.patterns
+        for ndx in self._iter_matches(text, longest_only = True):
+            if (best is None) or (len(patterns[ndx]) > len(patterns[best])) or \
+                (len(patterns[ndx]) == len(patterns[best]) and ndx < best):
+                best = ndx
+
+        return None if best is None else patterns[best]
@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 16:05:39 2026
+
+@author: carlo
+"""
+
+import re
+import numpy as np
+import pandas as pd
+
+# incorrect parsing of decimal aspect ratios
+ASPECT_RATIO_ERRORS = {'.5' : '9.5',
+                       '0.': '10.5',
+                       '2.': '12.5',
+                       '3.': '13.5',
+                       '5.': '15.5',
+                       '70.5': '10.5'}
+
+# standard tire size, e.g. 265/65R17, LT235/75 R15C, 31X10.5R15, 185R14C, 215/55ZR17
+SIZE_PATTERN = re.compile('(?P<prefix>LT|P)?'
+                          '(?P<width>[1-9][0-9]{1,2})'
+                          '(?:(?P<sep>[/X])(?P<aspect_ratio>[1-9][0-9](?:\.[0-9]{1,2})?))?'
+                          '(?P<space> ?)(?P<construction>Z?R)'
+                          '(?P<diameter>[1-9][0-9])'
+                          '(?P<suffix>C|LT)?')
+
+_MATCH_WIDTH = re.compile('[^0-9.]')
+_MATCH_AR = re.compile('[^0-9.R]')
+
+def render_sku(w : str, ar : str, d : str) -> str:
+    '''
+    SKU format of tire size (see cleaner_functions.combine_specs)
+
+    >>> render_sku('33', '12.5', 'R15')
+    '33X12.5/R15'
+    '''
+    d = d if 'R' in d else 'R' + d
+    if ar != 'R':
+        if '.' in ar:
+            return w + 'X' + ar + '/' + d
+        else:
+            return '/'.join([w, ar, d])
+    else:
+        return w + '/' + d
+
+def render_match(w, ar, d) -> str:
+    '''
+    Matching format of tire size (see cleaner_functions.combine_specs)
+
+    >>> render_match('LT175', '65', 'R15C')
+    '175/65/15'
+    '''
+    return '/'.join([_MATCH_WIDTH.sub('', str(w)),
+                     _MATCH_AR.sub('', str(ar)),
+                     _MATCH_WIDTH.sub('', str(d))])
+
+def clean_decimal_aspect_ratio(ar : str) -> str:
+    '''
+    Same as cleaner_functions.clean_aspect_ratio for decimal aspect ratios
+    '''
+    return ASPECT_RATIO_ERRORS[ar] if ar in ASPECT_RATIO_ERRORS else ar.rstrip('0')
+
+def tokenize(s):
+    '''
+    Single match of a standard tire size string; None if s is not one
+    '''
+    return SIZE_PATTERN.fullmatch(s) if isinstance(s, str) else None
+
+class TireSize:
+    '''
+    Parsed tire size with cleaned width (without LT/P prefix), aspect ratio
+    ('R' if none) and diameter (e.g. R15C), plus light truck (LT) and
+    commercial (C) flags
+
+    DOCTESTS:
+    >>> size = TireSize.parse('LT235/75 R15C')
+    >>> size
+    TireSize('235', '75', 'R15C', lt=True, c=True)
+    >>> size.sku, size.match
+    ('235/75/R15C', '235/75/15')
+    >>> TireSize.parse('31X10.50R15').sku
+    '31X10.5/R15'
+    >>> TireSize.parse('185R14').match
+    '185/R/14'
+    >>> TireSize.parse('265/65-17') is None
+    True
+    '''
+    __slots__ = ('width', 'aspect_ratio', 'diameter', 'lt', 'c')
+
+    def __init__(self,
+                 width : str,
+                 aspect_ratio : str,
+                 diameter : str,
+                 lt : bool = False,
+                 c : bool = False):
+        self.width = width
+        self.aspect_ratio = aspect_ratio
+        self.diameter = diameter
+        self.lt = lt
+        self.c = c
+
+    @classmethod
+    def from_tokens(cls, m):
+        ar = m['aspect_ratio']
+        if ar is None:
+            ar = 'R'
+        elif '.' in ar:
+            ar = clean_decimal_aspect_ratio(ar)
+        suffix = m['suffix'] or ''
+        return cls(m['width'], ar, 'R' + m['diameter'] + suffix,
+                   lt = (m['prefix'] == 'LT') or (suffix == 'LT'),
+                   c = suffix == 'C')
+
+    @classmethod
+    def parse(cls, s):
+        '''
+        TireSize of a standard tire size string, None if s is not one
+        '''
+        m = tokenize(s)
+        return None if m is None else cls.from_tokens(m)
+
+    @property
+    def sku(self) -> str:
+        return render_sku(self.width, self.aspect_ratio, self.diameter)
+
+    @property
+    def match(self) -> str:
+        return render_match(self.width, self.aspect_ratio, self.diameter)
+
+    def astuple(self) -> tuple:
+        return self.width, self.aspect_ratio, self.diameter
+
+    def __eq__(self, other):
+        return isinstance(other, TireSize) and \
+            all(getattr(self, a) == getattr(other, a) for a in self.__slots__)
+
+    def __repr__(self):
+        return f'TireSize({self.width!r}, {self.aspect_ratio!r}, {self.diameter!r}, lt={self.lt}, c={self.c})'
+
+def parse_series(sizes : pd.Series) -> pd.DataFrame:
+    '''
+    Vectorized TireSize.parse over a column of tire size strings
+
+    Parameters
+    ----------
+        - sizes : pd.Series
+            tire size strings
+
+    Returns
+    -------
+        - df : pd.DataFrame
+            width, aspect_ratio, diameter, lt, c, sku and match columns with
+            the index of sizes; NaN rows where the size is not standard
+
+    DOCTESTS:
+    >>> parse_series(pd.Series(['215/65ZR17', '33X12.50R20LT', 'N/A'])).sku.tolist()
+    ['215/65/R17', '33X12.5/R20LT', nan]
+    '''
+    tokens = sizes.where(sizes.map(type) == str).astype(object).str.extract(f'^(?:{SIZE_PATTERN.pattern})$')
+    parsed = tokens['width'].notna()
+
+    ar = tokens['aspect_ratio']
+    is_decimal = ar.str.contains('.', regex = False, na = False)
+    ar = ar.mask(is_decimal, ar[is_decimal].map(clean_decimal_aspect_ratio))
+    ar = ar.fillna('R').where(parsed)
+
+    suffix = tokens['suffix'].fillna('')
+    width = tokens['width']
+    diameter = 'R' + tokens['diameter'] + suffix
+    sku_ar = pd.Series(np.where(ar == 'R', '/', 
+                                np.where(is_decimal, 'X' + ar + '/', '/' + ar + '/')),
+                       index = sizes.index)
+
+    return pd.DataFrame({'width' : width,
+                         'aspect_ratio' : ar,
+                         'diameter' : diameter,
+                         'lt' : ((tokens['prefix'] == 'LT') | (suffix == 'LT')).where(parsed),
+                         'c' : (suffix == 'C').where(parsed),
+                         'sku' : width + sku_ar + diameter,
+                         'match' : width + '/' + ar + '/' + tokens['diameter']},
+                        index = sizes.index)
@@ -13,6 +13,16 @@ from datetime import datetime as dt
 # custom modules
 import cleaner_functions
 import get_chromedriver
+import dom_extract
+import html_extract
+import rate_limiter
+import fetch_retry
+import metrics
+import profiling
+import replay
+from checkpoint import CheckpointStore
+from reference_catalog import ReferenceCatalog
+from driver_pool import DriverPool
 
 # selenium
 from selenium.webdriver.common.by import By
@@ -21,82 +31,294 @@ from selenium.webdriver.support import expected_conditions as EC
 
 from base_logger import logger
 
+PAGE_URL = 'https://tiremanila.com/?page={page}'
+
+TILE_XPATH = '//div[@class="sv-tile sv-list-view sv-size-big"]'
+
+PAGINATION_XPATH = '//a[@tabindex="0"]'
+
+# tile fields relative to each product tile
+TILE_FIELDS = {'name' : './/h3[@class="sv-tile__title sv-text-reset sv-link-reset"]',
+               'info' : './/div[@class="sv-badge-list"]',
+               'price' : './/p[@class="sv-tile__price sv-text-reset"]',
+               'table' : './/div[@class="sv-tile__table sv-no-border"]'}
+
+TABLE_COLS = {'Index:' : 'load_index',
+              'Style:': 'style',
+              'Qty:': 'qty'}
+
+def parse_tile_table(table : str) -> dict:
+    '''
+    Load index, style and qty from the text of a product tile's table
+    
+    DOCTESTS:
+    >>> parse_tile_table('Index:\\n91V\\nQty:\\n4')
+    {'load_index': '91V', 'style': None, 'qty': '4'}
+    '''
+    split_info = table.split('\n') if table else []
+    prod_dict = {}
+    for i in TABLE_COLS:
+        if (i in split_info) and (split_info.index(i) + 1 < len(split_info)):
+            prod_dict[TABLE_COLS[i]] = split_info[split_info.index(i)+1]
+        else:
+            prod_dict[TABLE_COLS[i]] = None
+    return prod_dict
+
+def get_tile_records(tiles : list) -> list:
+    '''
+    Raw product info of extracted tile texts (tiles without name, info or
+    price are skipped)
+    '''
+    page_records = []
+    for tile in tiles:
+        if any(tile[col] is None for col in ['name', 'info', 'price']):
+            metrics.count('rows_dropped')
+            continue
+        prod_dict = {col : tile[col] for col in ['name', 'info', 'price']}
+        prod_dict.update(parse_tile_table(tile['table']))
+        page_records.append(prod_dict)
+    
+    return page_records
+
+@metrics.span('parse')
+def extract_tiles(driver) -> list:
+    '''
+    Raw product info of all tiles on the loaded page in one round trip
+    '''
+    return get_tile_records(dom_extract.extract_tiles(driver, TILE_XPATH, TILE_FIELDS))
+
+@metrics.span('parse')
+def parse_page_html(tree) -> list:
+    '''
+    Raw product info of all tiles on a parsed static page
+    '''
+    return get_tile_records(html_extract.extract_tiles(tree, TILE_XPATH, TILE_FIELDS))
+
+def get_last_page_html(tree, default : int = 104) -> int:
+    '''
+    Number of TireManila product pages from a parsed static page
+    '''
+    pages = html_extract.extract_texts(tree, {'pages' : PAGINATION_XPATH})['pages']
+    pages = [int(page) for page in pages if page.isnumeric()]
+    return max(pages) if len(pages) else default
+
+def get_last_page(driver) -> int:
+    '''
+    Number of TireManila product pages (104 if not found)
+    '''
+    try:
+        url_page = PAGE_URL.format(page = 1)
+        with rate_limiter.LIMITER.request(rate_limiter.get_host(url_page)):
+            replay.get_page(driver, url_page, record = False)
+        
+        wait = WebDriverWait(driver, timeout = 5)
+        wait.until(EC.presence_of_element_located((By.XPATH, PAGINATION_XPATH)))
+        replay.record_page(driver, url_page)
+        pages = driver.find_elements(By.XPATH, PAGINATION_XPATH)
+        last_page = max([int(page.text) for page in pages if page.text.isnumeric()])
+    
+    except:
+        last_page = 104
+    
+    return last_page
+
+def scrape_tiremanila_page(driver, 
+                           page : int,
+                           extraction : str = 'script') -> list:
+    '''
+    Scrapes raw product info from one TireManila page
+    
+    Parameters:
+    ----------
+    driver : selenium
+        Chrome driver
+    page : int
+        page number
+    extraction : str, default 'script'
+        'script' reads all tiles with one execute_script call (falls back to
+        'elements' if it fails); 'elements' queries each tile element
+    
+    Returns:
+    -------
+    page_records : list
+        list of product dicts; None if the page failed to load
+    '''
+    try:
+        url_page = PAGE_URL.format(page = page)
+        with rate_limiter.LIMITER.request(rate_limiter.get_host(url_page)):
+            replay.get_page(driver, url_page, record = False)
+        logger.info("Extracting tires info from Tiremanila page: {}".format(page))
+        
+        # optional
+        driver.implicitly_wait(2)
+        wait = WebDriverWait(driver, 
+                             timeout = 5, 
+                             poll_frequency = 0.2)
+        wait.until(EC.presence_of_all_elements_located((By.XPATH, TILE_XPATH)))
+        replay.record_page(driver, url_page)
+        
+        if extraction == 'script':
+            try:
+                return extract_tiles(driver)
+            except Exception as e:
+                logger.debug(f'Script extraction failed on page {page}: {repr(e)}')
+        
+        products = driver.find_elements(By.XPATH, TILE_XPATH)
+    
+    except:
+        return None
+    
+    # fields are looked up relative to each tile, as in extract_tiles
+    tiles = []
+    for p in products:
+        try:
+            tile = {}
+            for col, xpath in TILE_FIELDS.items():
+                found = p.find_elements(By.XPATH, xpath)
+                tile[col] = found[0].text if len(found) else None
+            tiles.append(tile)
+        except:
+            metrics.count('rows_dropped')
+            continue
+    
+    return get_tile_records(tiles)
+
 def tiremanila_scraper(driver, 
-                       df_gulong : pd.DataFrame) -> dict:
+                       df_gulong : pd.DataFrame,
+                       checkpoint : CheckpointStore = None,
+                       pool : DriverPool = None,
+                       retrier : fetch_retry.Retrier = None) -> dict:
     '''
     TireManila price scraper
     
     Parameters:
     ----------
     driver : selenium
-        Chrome driver
+        Chrome driver (not used if pool is given)
     df_gulong : pd.DataFrame
         Dataframe of gulong ph data
+    checkpoint : CheckpointStore, optional
+        journal of completed pages; completed pages are not scraped again
+    pool : DriverPool, optional
+        spread pages across the pool's drivers
+    retrier : fetch_retry.Retrier, optional
+        retries failed pages; remaining pages are skipped once its breaker
+        trips
 
     Returns:
     -------
     tm_df_dict : dict
         dictionary of scraped raw data from tiremanila
     '''
+    retrier = fetch_retry.Retrier('tiremanila') if retrier is None else retrier
+    
     # 1. Extract number of pages
-    try:
-        url_page = 'https://tiremanila.com/?page=1'
-        driver.get(url_page)
-        
-        wait = WebDriverWait(driver, timeout = 5)
-        wait.until(EC.presence_of_element_located((By.XPATH, '//a[@tabindex="0"]')))
-        pages = driver.find_elements(By.XPATH, '//a[@tabindex="0"]')
-        last_page = max([int(page.text) for page in pages if page.text.isnumeric()])
+    if pool is not None:
+        with pool.driver() as pool_driver:
+            last_page = get_last_page(pool_driver)
+    else:
+        last_page = get_last_page(driver)
     
-    except:
-        last_page = 104
+    pages = list(range(1, last_page+1))
+    # pages completed in a previous run are rebuilt from the checkpoint
+    pending = [page for page in pages 
+               if (checkpoint is None) or not checkpoint.is_done(page)]
+    
+    def scrape_page(page_driver, page):
+        page_records = retrier.call(scrape_tiremanila_page, page_driver, page)
+        if (page_records is not None) and (checkpoint is not None):
+            checkpoint.add(page, page_records)
+        return page_records
     
+    if pool is not None:
+        scraped = dict(zip(pending, pool.map_pages(scrape_page, pending)))
+    else:
+        scraped = {page : scrape_page(driver, page) for page in pending}
     
+    # merge in page order
     tm_df_dict = {}
-    col_dict = {'Index:' : 'load_index',
-                'Style:': 'style',
-                'Qty:': 'qty'}
-    for page in range(1, last_page+1):
-        
-        try:
-            url_page = 'https://tiremanila.com/?page=' + str(page)
-            driver.get(url_page)
-            logger.info("Extracting tires info from Tiremanila page: {}".format(page))
-            
-            # optional
-            driver.implicitly_wait(2)
-            wait = WebDriverWait(driver, 
-                                 timeout = 5, 
-                                 poll_frequency = 0.2)
-            wait.until(EC.presence_of_all_elements_located((By.XPATH, 
-                                            '//div[@class="sv-tile sv-list-view sv-size-big"]')))
-            
-            products = driver.find_elements(By.XPATH, 
-                                            '//div[@class="sv-tile sv-list-view sv-size-big"]')
-        
-        except:
-            continue
-        
-        if len(products):
-            for ndx, p in enumerate(products):
-                try:
-                    prod_dict = {}
-                    prod_dict['name'] = p.find_elements(By.XPATH, '//h3[@class="sv-tile__title sv-text-reset sv-link-reset"]')[ndx].text
-                    prod_dict['info'] = p.find_elements(By.XPATH, '//div[@class="sv-badge-list"]')[ndx].text
-                    prod_dict['price'] = p.find_elements(By.XPATH, '//p[@class="sv-tile__price sv-text-reset"]')[ndx].text
-                    temp = driver.find_elements(By.XPATH, '//div[@class="sv-tile__table sv-no-border"]')
-                    
-                    for j in temp:
-                        split_info = j.text.split('\n')
-                        for index, i in enumerate(list(col_dict.keys())):
-                            if i in split_info:
-                                prod_dict[col_dict[i]] = split_info[split_info.index(i)+1]
-                            else:
-                                prod_dict[col_dict[i]] = None
-                    
-                    tm_df_dict[prod_dict['name']] = prod_dict
-                except:
-                    continue
+    for page in pages:
+        page_records = scraped[page] if page in scraped else checkpoint.get(page)
+        for prod_dict in (page_records or []):
+            tm_df_dict[prod_dict['name']] = prod_dict
+
+    return tm_df_dict
+
+def tiremanila_scraper_static(df_gulong : pd.DataFrame,
+                              checkpoint : CheckpointStore = None,
+                              concurrency : int = 4,
+                              rate_per_host : float = 2.0,
+                              retrier : fetch_retry.Retrier = None) -> dict:
+    '''
+    TireManila price scraper over plain HTTP (no browser). Pages are fetched
+    concurrently and parsed with lxml.
+    
+    Parameters:
+    ----------
+    df_gulong : pd.DataFrame
+        Dataframe of gulong ph data
+    checkpoint : CheckpointStore, optional
+        journal of completed pages; completed pages are not fetched again
+    concurrency : int, default 4
+        max number of pages fetched at the same time
+    rate_per_host : float, default 2.0
+        initial page requests per second (adapted by the shared rate limiter)
+    retrier : fetch_retry.Retrier, optional
+        refetches failed pages
+    
+    Returns:
+    -------
+    tm_df_dict : dict
+        same as tiremanila_scraper; empty if the first page has no products
+        in its static HTML (e.g. rendered by javascript)
+    '''
+    retrier = fetch_retry.Retrier('tiremanila_static') if retrier is None else retrier
+    
+    # 1. First page gives number of pages and whether static HTML has products
+    first = retrier.call(lambda: html_extract.fetch_pages([PAGE_URL.format(page = 1)])[0])
+    first_records = parse_page_html(first) if first is not None else []
+    if not len(first_records):
+        logger.info('No products in Tiremanila static HTML.')
+        return {}
+    
+    last_page = get_last_page_html(first)
+    pages = list(range(1, last_page+1))
+    # pages completed in a previous run are rebuilt from the checkpoint
+    pending = [page for page in pages[1:] 
+               if (checkpoint is None) or not checkpoint.is_done(page)]
+    
+    logger.info(f'Extracting tires info from {len(pending) + 1} Tiremanila pages (static).')
+    scraped = {1 : first_records}
+    if (checkpoint is not None) and not checkpoint.is_done(1):
+        checkpoint.add(1, first_records)
+    
+    def on_page(ndx, tree):
+        # parse and journal each page as it arrives
+        page = pending[ndx]
+        scraped[page] = parse_page_html(tree) if tree is not None else None
+        if (checkpoint is not None) and (scraped[page] is not None):
+            checkpoint.add(page, scraped[page])
+    
+    # one session for all pages; failed pages are retried as they fail
+    html_extract.fetch_pages([PAGE_URL.format(page = page) for page in pending],
+                             concurrency = concurrency,
+                             rate_per_host = rate_per_host,
+                             retrier = retrier,
+                             on_page = on_page)
+    # pages cancelled by the circuit breaker never reach on_page
+    for page in pending:
+        scraped.setdefault(page, None)
+    
+    failed = [page for page, page_records in scraped.items() if page_records is None]
+    if len(failed):
+        logger.warning(f'Failed to fetch Tiremanila pages: {failed}')
+    
+    # merge in page order
+    tm_df_dict = {}
+    for page in pages:
+        page_records = scraped[page] if page in scraped else checkpoint.get(page)
+        for prod_dict in (page_records or []):
+            tm_df_dict[prod_dict['name']] = prod_dict
 
     return tm_df_dict
 
@@ -187,7 +409,10 @@ def get_brand_model(sku_name):
     model = ' '.join(sku_minus_specs[1:]).strip()
     return brand, model
 
-def construct_tiremanila_df(tm_df_dict, df_gulong):
+@profiling.stage('construct_tiremanila_df')
+@metrics.span('clean')
+def construct_tiremanila_df(tm_df_dict, df_gulong, 
+                            catalog : ReferenceCatalog = None):
     '''
     
     Parameters
@@ -196,6 +421,8 @@ def construct_tiremanila_df(tm_df_dict, df_gulong):
             dictionary of dataframes containing scraped tire info with specs as keys
         - df_gulong : pd.DataFrame
             imported gulong dataframe
+        - catalog : ReferenceCatalog, optional
+            reference data built from df_gulong; built here if not given
     
     Returns
     -------
@@ -205,6 +432,8 @@ def construct_tiremanila_df(tm_df_dict, df_gulong):
     '''
     
     
+    catalog = ReferenceCatalog(df_gulong) if catalog is None else catalog
+    
     df_tiremanila = pd.DataFrame(tm_df_dict).T.reset_index(drop = True)
     df_tiremanila = df_tiremanila.rename(columns = {'name' : 'sku_name',
                                                     'qty' : 'qty_tiremanila'})
@@ -218,31 +447,36 @@ def construct_tiremanila_df(tm_df_dict, df_gulong):
         df_tiremanila.loc[:, 'raw_specs'] = df_tiremanila.apply(lambda x: x['sku_name'].split(' ')[0], axis=1)
         df_tiremanila['width'], df_tiremanila['aspect_ratio'], df_tiremanila['diameter'] = zip(*df_tiremanila.loc[:, 'raw_specs'].map(get_specs))
         df_tiremanila['brand'], df_tiremanila['model'] = zip(*df_tiremanila.loc[:, 'sku_name'].map(get_brand_model))
-        df_tiremanila.loc[:,'name'] = df_tiremanila.apply(lambda x: cleaner_functions.fix_names(x['model'], 
-                                                                                            comp = df_gulong[df_gulong.name.notna()].name.unique()), 
-                                                                                              axis=1)
-        df_tiremanila.loc[:,'width'] = df_tiremanila.apply(lambda x: cleaner_functions.clean_width(x['width'], model = x['name']), 
-                                                           axis=1)
-        df_tiremanila.loc[:,'aspect_ratio'] = df_tiremanila.apply(lambda x: cleaner_functions.clean_aspect_ratio(x['aspect_ratio'], 
-                                                                                                                 model = x['name']), 
-                                                                  axis=1)
-        df_tiremanila.loc[:,'diameter'] = df_tiremanila.apply(lambda x: cleaner_functions.clean_diameter(x['diameter']), axis=1)
-        df_tiremanila.loc[:, 'raw_specs'] = df_tiremanila.apply(lambda x: cleaner_functions.combine_specs(str(x['width']), 
-                                                                                                          str(x['aspect_ratio']), 
-                                                                                                          str(x['diameter']), mode = 'SKU'), 
-                                                                axis=1)
-        df_tiremanila.loc[:, 'correct_specs'] = df_tiremanila.apply(lambda x: cleaner_functions.combine_specs(x['width'], 
-                                                                                                              x['aspect_ratio'], 
-                                                                                                              x['diameter'], 
-                                                                                                              mode = 'MATCH'), 
-                                                                    axis=1)
-        df_tiremanila.loc[:, 'sku_name'] = df_tiremanila.apply(lambda x: cleaner_functions.combine_sku(str(x['brand']),
-                                                                                     str(x['width']),
-                                                                                     str(x['aspect_ratio']),
-                                                                                     str(x['diameter']),
-                                                                                     str(x['name']),
-                                                                                     np.NaN,
-                                                                                     np.NaN), axis=1)
+        df_tiremanila.loc[:,'name'] = cleaner_functions.map_unique(cleaner_functions.fix_names,
+                                                                   df_tiremanila['model'], 
+                                                                   comp = catalog)
+        df_tiremanila.loc[:,'width'] = cleaner_functions.map_unique(lambda w, model: cleaner_functions.clean_width(w, model = model),
+                                                                    df_tiremanila['width'], df_tiremanila['name'],
+                                                                    name = 'clean_width')
+        df_tiremanila.loc[:,'aspect_ratio'] = cleaner_functions.map_unique(lambda ar, model: cleaner_functions.clean_aspect_ratio(ar, 
+                                                                                                                                  model = model),
+                                                                           df_tiremanila['aspect_ratio'], df_tiremanila['name'],
+                                                                           name = 'clean_aspect_ratio')
+        df_tiremanila.loc[:,'diameter'] = cleaner_functions.map_unique(cleaner_functions.clean_diameter, 
+                                                                       df_tiremanila['diameter'])
+        df_tiremanila.loc[:, 'raw_specs'] = cleaner_functions.map_unique(lambda w, ar, d: cleaner_functions.combine_specs(str(w), 
+                                                                                                                           str(ar), 
+                                                                                                                           str(d), mode = 'SKU'),
+                                                                         df_tiremanila['width'], df_tiremanila['aspect_ratio'],
+                                                                         df_tiremanila['diameter'], name = 'combine_specs')
+        df_tiremanila.loc[:, 'correct_specs'] = cleaner_functions.map_unique(cleaner_functions.combine_specs,
+                                                                             df_tiremanila['width'], df_tiremanila['aspect_ratio'],
+                                                                             df_tiremanila['diameter'], mode = 'MATCH')
+        df_tiremanila.loc[:, 'sku_name'] = cleaner_functions.map_unique(lambda make, w, ar, d, model: cleaner_functions.combine_sku(str(make),
+                                                                                                      str(w),
+                                                                                                      str(ar),
+                                                                                                      str(d),
+                                                                                                      str(model),
+                                                                                                      np.NaN,
+                                                                                                      np.NaN),
+                                                                        df_tiremanila['brand'], df_tiremanila['width'],
+                                                                        df_tiremanila['aspect_ratio'], df_tiremanila['diameter'],
+                                                                        df_tiremanila['name'], name = 'combine_sku')
         df_tiremanila.drop(labels='info', axis=1, inplace=True)
         # reorder cols
         df_tiremanila = df_tiremanila[['sku_name', 'name', 'model', 'brand', 
@@ -255,92 +489,113 @@ def construct_tiremanila_df(tm_df_dict, df_gulong):
     
     return df_tiremanila
 
-def main(df_ref : None):
+@profiling.stage('tiremanila')
+@replay.with_target
+def main(df_ref : None,
+         resume : bool = False,
+         catalog : ReferenceCatalog = None,
+         pool : DriverPool = None,
+         engine : str = 'static',
+         replay_url : str = None,
+         driver_profile : str = 'scrape'):
     '''
     Parameters:
     ----------
         - df_ref : pd.DataFrame
             df_gulong from get_gulong_data function. Required.
+        - resume : bool, default False
+            skip pages completed by a previous (crashed) run today
+        - catalog : ReferenceCatalog, optional
+            shared reference data built from df_ref
+        - pool : DriverPool, optional
+            shared drivers to scrape pages in parallel; otherwise pages are
+            scraped in order with a single driver
+        - engine : str, default 'static'
+            'static' fetches pages over HTTP without a browser, with Selenium
+            as fallback if no products are found; 'selenium' always uses
+            Selenium
+        - replay_url : str, optional
+            address of a replay.ReplayServer to scrape instead of the live
+            site (e.g. 'http://127.0.0.1:8765')
+        - driver_profile : str, default 'scrape'
+            get_chromedriver.create_driver profile of the Selenium drivers
+            created here ('default' for a full browser)
     
     Returns:
     --------
         - dict
     '''
     
-    # 1. Create chromedriver instance
-    driver = get_chromedriver.create_driver()
-    
     time_start = dt.now()
-    # 2. Scrape raw data
-    tm_df_dict = tiremanila_scraper(driver, 
-                                    df_ref)
+    # 1. Scrape raw data
+    checkpoint = CheckpointStore('tiremanila', resume = resume)
+    retriers = {}
+    tm_df_dict = {}
+    if engine == 'static':
+        logger.info('Scraping Tiremanila via static HTML.')
+        retriers['static'] = fetch_retry.Retrier('tiremanila_static')
+        tm_df_dict = tiremanila_scraper_static(df_ref, 
+                                               checkpoint = checkpoint,
+                                               retrier = retriers['static'])
+    
+    # 2. Resort to selenium (chromedriver instance)
+    driver = None
+    if not len(tm_df_dict):
+        logger.info('Resorting to Selenium scraper.')
+        driver = get_chromedriver.create_driver(profile = driver_profile) if pool is None else None
+        retriers['selenium'] = fetch_retry.Retrier('tiremanila')
+        try:
+            tm_df_dict = tiremanila_scraper(driver, 
+                                            df_ref,
+                                            checkpoint = checkpoint,
+                                            pool = pool,
+                                            retrier = retriers['selenium'])
+        finally:
+            # pool drivers are closed by the pool owner
+            if driver is not None:
+                driver.quit()
     
     # 3. Construct cleaned dataframe
     df_tiremanila = construct_tiremanila_df(tm_df_dict, 
-                                            df_ref)
+                                            df_ref,
+                                            catalog = catalog)
     time_finish = dt.now()
     
-    # 4. Close chromedriver
-    driver.quit()
-    
-    # 5. Return scraping results and stats
+    # 4. Return scraping results and stats
     return {'source': 'tiremanila',
             'df' : df_tiremanila,
             'items': len(df_tiremanila),
             'time_start': time_start.strftime('%Y-%m-%d %H:%M:%S'),
             'time_end': time_finish.strftime('%Y-%m-%d %H:%M:%S'),
             'duration': f'{(time_finish-time_start).seconds} secs',
+            'fetch' : {path : retrier.stats() for path, retrier in retriers.items()},
             }
 
-def main_test(df_ref = None):
+@profiling.stage('tiremanila')
+@replay.with_target
+def main_test(df_ref = None,
+              catalog : ReferenceCatalog = None,
+              replay_url : str = None,
+              driver_profile : str = 'scrape'):
     
     time_start = dt.now()
     
     tm_df_dict = {}
-    col_dict = {'Index:' : 'load_index',
-                'Style:': 'style',
-                'Qty:': 'qty'}
-    
-    driver = get_chromedriver.create_driver()
-    page = 1
-    url_page = f'https://tiremanila.com/?page={page}'
-    driver.get(url_page)
-    logger.info("Extracting tires info from Tiremanila page: {}".format(page))
-    
-    # optional
-    wait = WebDriverWait(driver, timeout = 5, poll_frequency = 0.2)
-    wait.until(EC.presence_of_all_elements_located((By.XPATH, 
-                                    '//div[@class="sv-tile sv-list-view sv-size-big"]')))
-    
-    products = driver.find_elements(By.XPATH, 
-                                    '//div[@class="sv-tile sv-list-view sv-size-big"]')
-    
-    if len(products):
-        for ndx, p in enumerate(products):
-            prod_dict = {}
-            prod_dict['name'] = p.find_elements(By.XPATH, '//h3[@class="sv-tile__title sv-text-reset sv-link-reset"]')[ndx].text
-            prod_dict['info'] = p.find_elements(By.XPATH, '//div[@class="sv-badge-list"]')[ndx].text
-            prod_dict['price'] = p.find_elements(By.XPATH, '//p[@class="sv-tile__price sv-text-reset"]')[ndx].text
-            temp = driver.find_elements(By.XPATH, '//div[@class="sv-tile__table sv-no-border"]')
-            
-            for j in temp:
-                split_info = j.text.split('\n')
-                for index, i in enumerate(list(col_dict.keys())):
-                    if i in split_info:
-                        prod_dict[col_dict[i]] = split_info[split_info.index(i)+1]
-                    else:
-                        prod_dict[col_dict[i]] = None
-            
-            tm_df_dict[prod_dict['name']] = prod_dict
+    driver = get_chromedriver.create_driver(profile = driver_profile)
+    try:
+        page_records = scrape_tiremanila_page(driver, 1)
+    finally:
+        driver.quit()
+    for prod_dict in (page_records or []):
+        tm_df_dict[prod_dict['name']] = prod_dict
     
     df_tiremanila_test = construct_tiremanila_df(tm_df_dict, 
-                                                   df_ref)
+                                                   df_ref,
+                                                   catalog = catalog)
     
     time_finish = dt.now()
-    # 4. Close chromedriver
-    driver.quit()
     
-    # 5. Return scraping results and stats
+    # 4. Return scraping results and stats
     return {'source': 'tiremanila',
             'df' : df_tiremanila_test,
             'items': len(df_tiremanila_test),